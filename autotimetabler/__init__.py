@@ -0,0 +1,89 @@
+"""
+    Autotimetabler
+
+    The time and data handling is importable on its own, OR-Tools is only
+    imported once something building or solving a model is used.
+"""
+
+import importlib
+
+from autotimetabler.cache import TimetableCache, cached_timetables, normalise_request, request_key
+from autotimetabler.data import (canonicalise_classes, count_equivalent_timetables, expand_timetable,
+                                 first_equivalent_classes, original_timetables)
+from autotimetabler.distance import DistanceMatrix, load_distance_matrix
+from autotimetabler.index import (find_consecutive_period_pairs, find_independent_courses, find_part_week_class_clashes,
+                                  find_short_gap_class_pairs, greedy_timetable, index_class_days)
+from autotimetabler.metrics import SolveMetrics
+from autotimetabler.minute_interval import (ALL_WEEKS, DAY, END, END_TIME, FORCE_INCLUDE, LOCATION, START, START_TIME,
+                                            WEEKS, MinuteInterval, get_int_fp, period_weeks, to_week_mask)
+from autotimetabler.period_table import PeriodTable
+from autotimetabler.presolve import InfeasibleRequest, PresolvedRequest, find_class_clashes, presolve
+from autotimetabler.synthetic import synthetic_group, synthetic_term
+from autotimetabler.term import TermCourse, TermFile
+
+# The names depending on OR-Tools, by the module they are defined in.
+_SOLVER_ATTRIBUTES = {
+    'autotimetabler.model': [
+        'NO_OVERLAP_ENCODING', 'CLIQUE_ENCODING', 'CourseMetadata', 'populate_data_set',
+        'define_day_time_constraints_for_variables', 'define_max_one_class_per_course_constraint',
+        'define_no_overlap_constraint', 'define_clash_clique_constraint', 'define_min_gap_constraint',
+        'define_min_walking_constraint', 'define_day_used_variables', 'define_max_days_constraint',
+        'define_social_timetabling', 'define_timetable_constraints', 'build_timetable_model',
+    ],
+    'autotimetabler.search': [
+        'PossibleTimetableSchedules', 'reduce_request', 'reduced_class_ids', 'iter_timetables', 'collect_timetables',
+        'SolutionStream', 'stream_solutions', 'enumerate_independent_timetables',
+        'TermModel',
+    ],
+    'autotimetabler.optimise': [
+        'EARLY_HOUR', 'LATE_HOUR', 'DEFAULT_OBJECTIVE_WEIGHTS', 'OptimisedTimetable', 'infeasible_timetable',
+        'define_timetable_objective', 'build_optimisation_model', 'solve_for_best_timetable', 'optimise_timetable',
+        'top_k',
+    ],
+    'autotimetabler.batch': [
+        'BatchResult', 'request_periods', 'request_group', 'solve_batch', 'batch_stats',
+    ],
+    'autotimetabler.service': [
+        'TimetableService', 'solve',
+    ],
+    'autotimetabler.pages': [
+        'TimetablePage', 'request_hash', 'encode_cursor', 'decode_cursor', 'define_lexicographic_order',
+        'timetable_page',
+    ],
+    'autotimetabler.session': [
+        'TimetableSession',
+    ],
+    'autotimetabler.social': [
+        'GroupTimetables', 'MAX_JOINT_GROUP_SIZE', 'course_keys', 'social_timetables',
+    ],
+    'autotimetabler.sample': [
+        'search_optimal_timetable',
+    ],
+}
+_SOLVER_ATTRIBUTE_MODULES = {name: module for module, names in _SOLVER_ATTRIBUTES.items() for name in names}
+
+__all__ = [
+    'TimetableCache', 'cached_timetables', 'normalise_request', 'request_key',
+    'canonicalise_classes', 'count_equivalent_timetables', 'expand_timetable', 'first_equivalent_classes',
+    'original_timetables',
+    'DistanceMatrix', 'load_distance_matrix',
+    'find_consecutive_period_pairs', 'find_independent_courses', 'find_part_week_class_clashes',
+    'find_short_gap_class_pairs', 'greedy_timetable', 'index_class_days',
+    'SolveMetrics',
+    'ALL_WEEKS', 'DAY', 'END', 'END_TIME', 'FORCE_INCLUDE', 'LOCATION', 'START', 'START_TIME', 'WEEKS',
+    'MinuteInterval', 'get_int_fp', 'period_weeks', 'to_week_mask',
+    'PeriodTable',
+    'InfeasibleRequest', 'PresolvedRequest', 'find_class_clashes', 'presolve',
+    'synthetic_group', 'synthetic_term',
+    'TermCourse', 'TermFile',
+] + list(_SOLVER_ATTRIBUTE_MODULES)
+
+
+def __getattr__(name):
+    if name in _SOLVER_ATTRIBUTE_MODULES:
+        return getattr(importlib.import_module(_SOLVER_ATTRIBUTE_MODULES[name]), name)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_SOLVER_ATTRIBUTE_MODULES))
@@ -0,0 +1,5 @@
+import sys
+
+from autotimetabler.cli import main
+
+sys.exit(main())
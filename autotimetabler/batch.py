@@ -0,0 +1,164 @@
+"""
+    Solving many requests at once on a pool of processes.
+
+    A request either has its own periods or names the courses it takes from
+    the term, the periods of every course code, which every worker process
+    gets once when it starts. Requests over the same courses are solved on
+    one TermModel, so the model is only built once for all of them.
+"""
+
+import collections
+import concurrent.futures
+import itertools
+import json
+import math
+import statistics
+import time
+
+from ortools.sat.python import cp_model
+
+from autotimetabler.model import NO_OVERLAP_ENCODING
+from autotimetabler.search import TermModel
+
+BatchResult = collections.namedtuple('BatchResult', 'request_id timetables status solve_time latency error')
+
+# The term of a worker process, set once by _initialise_worker.
+_term = None
+# The term models a worker process has built, by the courses they are for.
+_term_models = collections.OrderedDict()
+_MAX_TERM_MODELS = 16
+
+
+def _initialise_worker(term: dict):
+    global _term
+    _term = term
+
+
+def request_periods(data: dict, term: dict = None) -> list:
+    """
+        The periods of a request, its own or those of the course codes it
+        names from the term.
+    """
+    if 'periods' in data:
+        return data['periods']
+    if term is None:
+        raise ValueError('The request names its courses but there is no term to take them from')
+    return [term[course_code] for course_code in data['courses']]
+
+
+def request_group(data: dict) -> str:
+    """
+        The key shared by the requests over the same courses, in the same order.
+    """
+    if 'periods' in data:
+        return json.dumps(data['periods'], separators=(',', ':'))
+    return '\n'.join(data['courses'])
+
+
+def _term_model(group: str, periods: list, clash_encoding: str):
+    key = (group, clash_encoding)
+    if key in _term_models:
+        _term_models.move_to_end(key)
+    else:
+        _term_models[key] = TermModel(periods, clash_encoding)
+        while len(_term_models) > _MAX_TERM_MODELS:
+            _term_models.popitem(last=False)
+    return _term_models[key]
+
+
+def _solve_group(group: str, requests: list, limit: int, max_time_in_seconds: float, clash_encoding: str) -> list:
+    """
+        Solve the (request_id, request) of one group on its term model, in a
+        worker process.
+    :return: A BatchResult per request, without their latency.
+    """
+    results = []
+    try:
+        term_model = _term_model(group, request_periods(requests[0][1], _term), clash_encoding)
+    except Exception as error:
+        return [BatchResult(request_id, None, None, 0.0, None, repr(error)) for request_id, _ in requests]
+    for request_id, data in requests:
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = max_time_in_seconds
+        solve_start = time.perf_counter()
+        try:
+            timetables = term_model.iter_timetables(data, solver=solver)
+            found_timetables = list(itertools.islice(timetables, limit))
+            timetables.close()
+            results.append(BatchResult(request_id, found_timetables, solver.StatusName(solver.ResponseProto().status),
+                                       time.perf_counter() - solve_start, None, None))
+        except Exception as error:
+            results.append(BatchResult(request_id, None, None, time.perf_counter() - solve_start, None,
+                                       repr(error)))
+    return results
+
+
+def solve_batch(requests, term: dict = None, workers: int = None, limit: int = None,
+                max_time_in_seconds: float = 10.0, clash_encoding: str = NO_OVERLAP_ENCODING, max_group_size: int = 32,
+                stats: dict = None):
+    """
+        Enumerate the timetables of many requests over a pool of worker
+        processes, yielding a BatchResult for every request as soon as it is
+        solved, in no particular order.
+
+        Requests over the same courses are grouped and every group is solved
+        on one term model in chunks of at most max_group_size requests, so
+        that a large group still spreads over the workers.
+    :param requests:                - The request json data, the ids of the results being their positions.
+    :param term:                    - The periods of every course code, for the requests that only have courses,
+                                      a dict or a TermFile.
+    :param workers:                 - The number of processes, the number of cpus when None.
+    :param limit:                   - The most timetables of every request, all of them when None.
+    :param max_time_in_seconds:     - The time limit of every request.
+    :param clash_encoding:          - NO_OVERLAP_ENCODING or CLIQUE_ENCODING.
+    :param max_group_size:          - The most requests solved by a worker in one go.
+    :param stats:                   - Filled with the throughput and latency stats once every request is solved.
+    :return:
+    """
+    batch_start = time.perf_counter()
+    groups = collections.defaultdict(list)
+    for request_id, data in enumerate(requests):
+        groups[request_group(data)].append((request_id, data))
+
+    latencies = []
+    solve_times = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_initialise_worker,
+                                                initargs=(term,)) as executor:
+        futures = [executor.submit(_solve_group, group, group_requests[chunk_start:chunk_start + max_group_size],
+                                   limit, max_time_in_seconds, clash_encoding)
+                   for group, group_requests in groups.items()
+                   for chunk_start in range(0, len(group_requests), max_group_size)]
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                latency = time.perf_counter() - batch_start
+                for result in future.result():
+                    latencies.append(latency)
+                    solve_times.append(result.solve_time)
+                    yield result._replace(latency=latency)
+        finally:
+            for future in futures:
+                future.cancel()
+
+    if stats is not None:
+        stats.update(batch_stats(latencies, solve_times, time.perf_counter() - batch_start))
+        stats['groups'] = len(groups)
+
+
+def batch_stats(latencies: list, solve_times: list, wall_time: float) -> dict:
+    """
+        The throughput in requests per second and the latency and solve time
+        percentiles of a batch, in seconds.
+    """
+    stats = {'requests': len(latencies), 'wall_time': wall_time,
+             'throughput': len(latencies) / wall_time if wall_time > 0 else 0.0}
+    for name, times in (('latency', latencies), ('solve_time', solve_times)):
+        times = sorted(times)
+        if not times:
+            continue
+        stats[name] = {
+            'mean': statistics.fmean(times),
+            'p50': times[(len(times) - 1) // 2],
+            'p95': times[math.ceil(0.95 * len(times)) - 1],
+            'max': times[-1],
+        }
+    return stats
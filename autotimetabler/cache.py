@@ -0,0 +1,177 @@
+"""
+    Caching of the timetables of requests, keyed by a hash of the normalised
+    request so that the same courses and preferences hit the cache however
+    they are written.
+"""
+
+import collections
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+def normalise_request(data: dict) -> tuple[dict, list, list]:
+    """
+        Write a request the one way all its equivalent requests are written:
+        the preferences as numbers and sorted days, the periods of every class
+        sorted, identical classes dropped, and the classes and courses sorted.
+
+        A timetable of the normalised request is mapped back with the returned
+        course_order[course_id], the course_id in the request, and
+        class_ids[course_id][classes_id], the classes_id in the request that
+        the normalised class stands for. The other fields of the request are
+        kept as they are.
+    :param data: (dict)         - The request json data.
+    :return: (normalised request, course_order, class_ids)
+    """
+    courses = []
+    for course_id, classes in enumerate(data['periods']):
+        unique_classes = collections.defaultdict(list)
+        for classes_id, periods in enumerate(classes):
+            unique_classes[tuple(sorted(tuple(period) for period in periods))].append(classes_id)
+        courses.append((sorted(unique_classes.items()), course_id))
+    courses.sort()
+
+    normalised_request = {
+        'start': int(data['start']),
+        'end': int(data['end']),
+        'days': sorted(set(map(lambda day: int(day), list(data['days'])))),
+        'gap': float(data.get('gap', 0)),
+        'max_days': int(data['max_days']),
+        'periods': [[[list(period) for period in periods] for periods, _ in classes] for classes, _ in courses],
+    }
+    if data.get('preferred'):
+        # The preferred classes need to follow the classes to their normalised ids.
+        normalised_classes = {}
+        for normalised_course_id, (classes, course_id) in enumerate(courses):
+            for normalised_classes_id, (_, classes_ids) in enumerate(classes):
+                for classes_id in classes_ids:
+                    normalised_classes[course_id, classes_id] = [normalised_course_id, normalised_classes_id]
+        normalised_request['preferred'] = sorted(normalised_classes[course_id, classes_id]
+                                                 for course_id, classes_id in data['preferred'])
+    if 'courses' in data:
+        normalised_request['courses'] = [data['courses'][course_id] for _, course_id in courses]
+    # Any other field, e.g. early and late, is kept as it is, both in the key and for the solve.
+    for field in sorted(set(data) - set(normalised_request) - {'preferred'}):
+        normalised_request[field] = data[field]
+    course_order = [course_id for _, course_id in courses]
+    class_ids = [[classes_ids for _, classes_ids in classes] for classes, _ in courses]
+    return normalised_request, course_order, class_ids
+
+
+def request_key(normalised_request: dict, solve_key: str = '') -> str:
+    """
+        The hash of a normalised request, and of whatever else the solution
+        depends on such as the mode and its parameters.
+    """
+    request_json = json.dumps([normalised_request, solve_key], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(request_json.encode()).hexdigest()
+
+
+class TimetableCache:
+    """
+        A least recently used cache of json values with a time to live, in
+        memory and optionally in an sqlite file which survives restarts.
+        Values found on disk are moved back into memory. Every write to disk
+        deletes the expired rows and the oldest written rows over its cap.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = None, path: str = None,
+                 max_disk_entries: int = 65536):
+        """
+        :param max_entries:     - The number of values kept in memory.
+        :param ttl:             - The seconds a value is kept for, forever when None.
+        :param path:            - The sqlite file of the on-disk tier, none when None.
+        :param max_disk_entries:- The number of values kept on disk.
+        """
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.__entries = collections.OrderedDict()
+        self.__lock = threading.Lock()
+        self.__database = None
+        if path is not None:
+            self.__database = sqlite3.connect(path, check_same_thread=False)
+            self.__database.execute('CREATE TABLE IF NOT EXISTS timetables '
+                                    '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL)')
+            self.__database.commit()
+
+    def get(self, key: str):
+        """
+            The value cached for the key, None when there is none.
+        """
+        now = time.time()
+        with self.__lock:
+            if key in self.__entries:
+                expires, value = self.__entries[key]
+                if expires is None or expires > now:
+                    self.__entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.__entries[key]
+            if self.__database is not None:
+                row = self.__database.execute('SELECT value, expires FROM timetables WHERE key = ?',
+                                              (key,)).fetchone()
+                if row is not None and (row[1] is None or row[1] > now):
+                    value = json.loads(row[0])
+                    self.__remember(key, row[1], value)
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value):
+        expires = None if self.ttl is None else time.time() + self.ttl
+        with self.__lock:
+            self.__remember(key, expires, value)
+            if self.__database is not None:
+                self.__database.execute('INSERT OR REPLACE INTO timetables VALUES (?, ?, ?)',
+                                        (key, json.dumps(value), expires))
+                self.__database.execute('DELETE FROM timetables WHERE expires <= ?', (time.time(),))
+                # INSERT OR REPLACE gives a rewritten key a new rowid, so the smallest rowids were written longest ago.
+                self.__database.execute('DELETE FROM timetables WHERE rowid NOT IN '
+                                        '(SELECT rowid FROM timetables ORDER BY rowid DESC LIMIT ?)',
+                                        (self.max_disk_entries,))
+                self.__database.commit()
+
+    def __remember(self, key: str, expires: float, value):
+        self.__entries[key] = (expires, value)
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.max_entries:
+            self.__entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.__entries)}
+
+    def close(self):
+        if self.__database is not None:
+            self.__database.close()
+            self.__database = None
+
+
+def cached_timetables(data: dict, solve, cache: TimetableCache, solve_key: str = '') -> list:
+    """
+        The timetables of a request, solving its normalised request only when
+        the cache has nothing for it.
+    :param data: (dict)         - The request json data.
+    :param solve:               - Called with the normalised request on a miss, returning its course_id -> classes_id
+                                  timetables, e.g. lambda request: itertools.islice(iter_timetables(request), 20).
+    :param cache:
+    :param solve_key:           - Whatever the timetables depend on besides the request, e.g. 'enumerate:20'.
+    :return: The course_id -> classes_id timetables in the ids of the request.
+    """
+    normalised_request, course_order, class_ids = normalise_request(data)
+    key = request_key(normalised_request, solve_key)
+    timetables = cache.get(key)
+    if timetables is None:
+        # Compact timetables are numpy arrays, whose integers json can't write.
+        timetables = [[int(timetable[course_id]) for course_id in range(len(course_order))]
+                      for timetable in solve(normalised_request)]
+        cache.put(key, timetables)
+    return [dict(sorted((course_order[course_id], class_ids[course_id][classes_id][0])
+                        for course_id, classes_id in enumerate(timetable)))
+            for timetable in timetables]
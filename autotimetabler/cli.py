@@ -0,0 +1,119 @@
+"""
+    The command line entry point, reading a request json from a file or stdin
+    and writing its timetables as json lines.
+
+    python -m autotimetabler request.json --mode optimise
+    python -m autotimetabler --mode enumerate --limit 20 < request.json
+    python -m autotimetabler request.json --term term.jsonl
+"""
+
+import argparse
+import itertools
+import json
+import sys
+
+from autotimetabler.metrics import SolveMetrics
+from autotimetabler.presolve import InfeasibleRequest
+from autotimetabler.term import TermFile
+
+ENUMERATE_MODE = 'enumerate'
+OPTIMISE_MODE = 'optimise'
+TOP_K_MODE = 'top-k'
+JSON_LINES_FORMAT = 'jsonl'
+PROMETHEUS_FORMAT = 'prometheus'
+
+
+def read_request(path: str) -> dict:
+    if path == '-':
+        return json.load(sys.stdin)
+    with open(path) as request_file:
+        return json.load(request_file)
+
+
+def timetable_to_json(timetable: dict, course_count: int) -> list:
+    """
+        A timetable as the list of the classes_id chosen for every course.
+    """
+    return [timetable[course_id] for course_id in range(course_count)]
+
+
+def optimised_timetable_to_json(result, course_count: int) -> dict:
+    return {
+        'status': result.status,
+        'timetable': None if result.timetable is None else timetable_to_json(result.timetable, course_count),
+        'objective': result.objective,
+        'bound': result.bound,
+        'relative_gap': result.relative_gap,
+        'infeasible_courses': result.infeasible_courses,
+    }
+
+
+def parse_arguments(argv: list) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='autotimetabler', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('request', nargs='?', default='-', help='the request json file, - or nothing for stdin')
+    parser.add_argument('--term', help='the term json or json lines file of the courses the request names')
+    parser.add_argument('--sample', action='store_true', help='print the timetables of the sample request')
+    parser.add_argument('--output', '-o', help='the file to write to instead of stdout')
+    parser.add_argument('--mode', choices=(ENUMERATE_MODE, OPTIMISE_MODE, TOP_K_MODE), default=ENUMERATE_MODE)
+    parser.add_argument('--limit', type=int, default=None, help='the most timetables to enumerate')
+    parser.add_argument('--expand-duplicates', action='store_true',
+                        help='enumerate every timetable that identical classes make up')
+    parser.add_argument('--enforce-gap', action='store_true', help='forbid gaps shorter than the request gap')
+    parser.add_argument('--clash-encoding', choices=('no_overlap', 'cliques'), default='no_overlap')
+    parser.add_argument('--k', type=int, default=10, help='the number of timetables of the top-k mode')
+    parser.add_argument('--min-hamming', type=int, default=1,
+                        help='the number of courses the top-k timetables differ in')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--time-limit', type=float, default=10.0, help='the time limit of every solve in seconds')
+    parser.add_argument('--metrics', help='the file to append the metrics of the enumerate and optimise modes to')
+    parser.add_argument('--metrics-format', choices=(JSON_LINES_FORMAT, PROMETHEUS_FORMAT), default=JSON_LINES_FORMAT)
+    return parser.parse_args(argv)
+
+
+def main(argv: list = None) -> int:
+    arguments = parse_arguments(argv)
+    if arguments.sample:
+        from autotimetabler.sample import search_optimal_timetable
+        search_optimal_timetable()
+        return 0
+
+    data = read_request(arguments.request)
+    if arguments.term and 'periods' not in data:
+        from autotimetabler.batch import request_periods
+        data['periods'] = request_periods(data, TermFile(arguments.term))
+    course_count = len(data['periods'])
+    output = open(arguments.output, 'w') if arguments.output else sys.stdout
+    metrics = SolveMetrics({'mode': arguments.mode}) if arguments.metrics else None
+    try:
+        if arguments.mode == ENUMERATE_MODE:
+            from autotimetabler.search import iter_timetables
+            timetables = iter_timetables(data, expand_duplicates=arguments.expand_duplicates,
+                                         clash_encoding=arguments.clash_encoding, enforce_gap=arguments.enforce_gap,
+                                         metrics=metrics)
+            for timetable in itertools.islice(timetables, arguments.limit):
+                output.write(json.dumps(timetable_to_json(timetable, course_count)) + '\n')
+            timetables.close()
+        elif arguments.mode == OPTIMISE_MODE:
+            from autotimetabler.optimise import optimise_timetable
+            result = optimise_timetable(data, num_workers=arguments.workers,
+                                        max_time_in_seconds=arguments.time_limit,
+                                        clash_encoding=arguments.clash_encoding, metrics=metrics)
+            output.write(json.dumps(optimised_timetable_to_json(result, course_count)) + '\n')
+        else:
+            from autotimetabler.optimise import top_k
+            for result in top_k(data, arguments.k, arguments.min_hamming, num_workers=arguments.workers,
+                                max_time_in_seconds=arguments.time_limit, clash_encoding=arguments.clash_encoding):
+                output.write(json.dumps(optimised_timetable_to_json(result, course_count)) + '\n')
+    except InfeasibleRequest as error:
+        for course_id in sorted(error.infeasible_courses):
+            print(error.infeasible_courses[course_id], file=sys.stderr)
+        return 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    if metrics is not None:
+        with open(arguments.metrics, 'a') as metrics_file:
+            metrics_file.write(metrics.to_json_line() if arguments.metrics_format == JSON_LINES_FORMAT
+                               else metrics.to_prometheus())
+    return 0
@@ -0,0 +1,85 @@
+"""
+    Normalisation of the request data, free of any solver.
+"""
+
+import itertools
+import math
+
+import numpy as np
+
+
+def canonicalise_classes(data: dict) -> tuple[dict, list]:
+    """
+        Collapse the classes of every course that are identical into a single
+        equivalence class so that the model only gets one variable for them.
+        Two classes are identical when they are made of the same
+        [day, start, end, location] periods, regardless of the order the
+        periods are listed in.
+
+        The returned equivalent_classes[course_id][classes_id] is the list of the
+        original classes_id that the reduced class classes_id stands for, its
+        length being the multiplicity of the class.
+    :param data: (dict)         - The request json data.
+    :return: (reduced data, equivalent_classes)
+    """
+    reduced_periods = []
+    equivalent_classes = []
+    for courses in data['periods']:
+        reduced_course = []
+        course_equivalent_classes = []
+        unique_classes = {}
+        for classes_id, classes in enumerate(courses):
+            class_key = tuple(sorted(tuple(period) for period in classes))
+            if class_key not in unique_classes:
+                unique_classes[class_key] = len(reduced_course)
+                reduced_course.append(classes)
+                course_equivalent_classes.append([])
+            course_equivalent_classes[unique_classes[class_key]].append(classes_id)
+        reduced_periods.append(reduced_course)
+        equivalent_classes.append(course_equivalent_classes)
+    reduced_data = dict(data)
+    reduced_data['periods'] = reduced_periods
+    return reduced_data, equivalent_classes
+
+
+def count_equivalent_timetables(timetable: dict, equivalent_classes: list) -> int:
+    """
+        Count the timetables of the original data that a timetable of the
+        reduced data (course_id -> reduced classes_id) stands for.
+    """
+    return math.prod(len(equivalent_classes[course_id][classes_id]) for course_id, classes_id in timetable.items())
+
+
+def expand_timetable(timetable: dict, equivalent_classes: list):
+    """
+        Lazily expand a timetable of the reduced data (course_id -> reduced classes_id)
+        into every timetable of the original data (course_id -> classes_id) it stands for.
+    """
+    course_ids = sorted(timetable)
+    original_classes = [equivalent_classes[course_id][timetable[course_id]] for course_id in course_ids]
+    for classes_ids in itertools.product(*original_classes):
+        yield dict(zip(course_ids, classes_ids))
+
+
+def original_timetables(timetable: dict, equivalent_classes: list, expand_duplicates: bool):
+    """
+        Turn a timetable of reduced classes back into the classes_id of the
+        request, see canonicalise_classes.
+    """
+    if expand_duplicates:
+        yield from expand_timetable(timetable, equivalent_classes)
+    else:
+        yield {course_id: equivalent_classes[course_id][classes_id][0] for course_id, classes_id in timetable.items()}
+
+
+def first_equivalent_classes(equivalent_classes: list) -> np.ndarray:
+    """
+        The array of the first original classes_id of every reduced class, by
+        course and reduced classes_id, -1 past the reduced classes of a course.
+    """
+    first_classes = np.full((len(equivalent_classes), max(map(len, equivalent_classes), default=0)), -1,
+                            dtype=np.int32)
+    for course_id, course_equivalent_classes in enumerate(equivalent_classes):
+        first_classes[course_id, :len(course_equivalent_classes)] = [classes_ids[0] for classes_ids
+                                                                     in course_equivalent_classes]
+    return first_classes
@@ -0,0 +1,77 @@
+"""
+    The walking distances between the locations of a campus.
+"""
+
+import functools
+import json
+
+import numpy as np
+
+
+class DistanceMatrix:
+    """
+        The distances between the locations of a campus as a dense matrix,
+        every location being interned to the index of its row and column.
+    """
+
+    def __init__(self, locations: list, distances):
+        """
+        :param locations:       - The names of the locations.
+        :param distances:       - The square matrix of the distances between them, rounded to integers.
+        """
+        self.locations = list(locations)
+        self.location_id = {location: location_id for location_id, location in enumerate(self.locations)}
+        self.distances = np.rint(np.asarray(distances, dtype=np.float64)).astype(np.int32)
+        if self.distances.shape != (len(self.locations), len(self.locations)):
+            raise ValueError('The distance matrix is %s for %i locations' % (self.distances.shape,
+                                                                             len(self.locations)))
+
+    @classmethod
+    def from_triples(cls, triples: list) -> 'DistanceMatrix':
+        """
+            The symmetric matrix of a list of (location, location, distance),
+            the distances not listed being 0.
+        """
+        locations = sorted({location for first, second, _ in triples for location in (first, second)})
+        location_id = {location: location_id for location_id, location in enumerate(locations)}
+        distances = np.zeros((len(locations), len(locations)))
+        for first, second, distance in triples:
+            distances[location_id[first], location_id[second]] = distance
+            distances[location_id[second], location_id[first]] = distance
+        return cls(locations, distances)
+
+    def location_ids(self, locations: list) -> np.ndarray:
+        """
+            The ids of the locations, -1 for the ones the campus doesn't have.
+        """
+        return np.array([self.location_id.get(location, -1) for location in locations], dtype=np.int32)
+
+    def distance(self, first: str, second: str) -> int:
+        """
+            The distance between two locations, 0 when either is unknown.
+        """
+        if first not in self.location_id or second not in self.location_id:
+            return 0
+        return int(self.distances[self.location_id[first], self.location_id[second]])
+
+    def period_distances(self, first_locations: np.ndarray, second_locations: np.ndarray) -> np.ndarray:
+        """
+            The distances between the location ids of pairs of periods, 0 when
+            either is unknown.
+        """
+        known = (first_locations >= 0) & (second_locations >= 0)
+        if not self.locations:
+            return np.zeros(len(known), dtype=np.int32)
+        return np.where(known, self.distances[first_locations, second_locations], 0)
+
+
+@functools.lru_cache(maxsize=None)
+def load_distance_matrix(path: str) -> DistanceMatrix:
+    """
+        The distance matrix of a campus, read from a json file of
+        {"locations": [...], "distances": [[...], ...]} the first time it is
+        asked for.
+    """
+    with open(path) as distance_file:
+        campus = json.load(distance_file)
+    return DistanceMatrix(campus['locations'], campus['distances'])
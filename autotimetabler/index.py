@@ -0,0 +1,186 @@
+"""
+    Time indexes over the candidate periods of a request, used to decide which
+    constraints the model needs.
+"""
+
+import bisect
+import collections
+import heapq
+
+from autotimetabler.minute_interval import ALL_WEEKS, MinuteInterval
+
+
+def find_independent_courses(global_solution_space: list, course_count: int) -> list:
+    """
+        Split the courses into the connected components of the time-conflict
+        graph of their classes, the courses of different components never
+        competing for the same time slot.
+
+        The periods are swept by start time: all the periods still running when
+        a period starts contain that instant, so they clash with each other and
+        are already in one component, and joining the new period to any one of
+        them is enough.
+    :param global_solution_space:
+    :param course_count:
+    :return: The course ids of every component.
+    """
+    parent = list(range(course_count))
+
+    def find(course_id):
+        while parent[course_id] != course_id:
+            parent[course_id] = parent[parent[course_id]]
+            course_id = parent[course_id]
+        return course_id
+
+    running_periods = []
+    for course_metadata in sorted(global_solution_space, key=lambda period: period.start):
+        while running_periods and running_periods[0][0] <= course_metadata.start:
+            heapq.heappop(running_periods)
+        if running_periods:
+            parent[find(course_metadata.course)] = find(running_periods[0][1])
+        heapq.heappush(running_periods, (course_metadata.end, course_metadata.course))
+
+    components = collections.defaultdict(list)
+    for course_id in range(course_count):
+        components[find(course_id)].append(course_id)
+    return list(components.values())
+
+
+def find_part_week_class_clashes(global_solution_space: list) -> tuple[list, set]:
+    """
+        Find the clashes involving periods that only run in some teaching
+        weeks: the pairs of periods overlapping in time, as in
+        find_independent_courses, whose teaching weeks bitmasks have a bitwise
+        and that isn't 0, for pairs where at least one period isn't weekly.
+    :param global_solution_space:
+    :return: (the sorted list of ((course_id, classes_id), (course_id, classes_id)) pairs of different courses, the
+             set of the (course_id, classes_id) with periods clashing with each other)
+    """
+    class_pairs = set()
+    self_clashes = set()
+    running_periods = []
+    for period_index in sorted(range(len(global_solution_space)),
+                               key=lambda period_index: global_solution_space[period_index].start):
+        period = global_solution_space[period_index]
+        while running_periods and running_periods[0][0] <= period.start:
+            heapq.heappop(running_periods)
+        for _, running_period_index in running_periods:
+            running_period = global_solution_space[running_period_index]
+            if (period.weeks == ALL_WEEKS and running_period.weeks == ALL_WEEKS) or \
+                    not period.weeks & running_period.weeks:
+                continue
+            if (period.course, period.classes) == (running_period.course, running_period.classes):
+                self_clashes.add((period.course, period.classes))
+            elif period.course != running_period.course:
+                class_pairs.add(tuple(sorted(((period.course, period.classes),
+                                              (running_period.course, running_period.classes)))))
+        heapq.heappush(running_periods, (period.end, period_index))
+    return sorted(class_pairs), self_clashes
+
+
+def index_class_days(global_solution_space: list) -> dict:
+    """
+        The days of the week every class has a period on.
+    :param global_solution_space:
+    :return: (course_id, classes_id) -> set of days
+    """
+    min_intervals = MinuteInterval()
+    period_days = min_intervals.to_day_array([[course_metadata.start, course_metadata.end]
+                                              for course_metadata in global_solution_space])
+    class_days = collections.defaultdict(set)
+    for course_metadata, day in zip(global_solution_space, period_days.tolist()):
+        class_days[course_metadata.course, course_metadata.classes].add(day)
+    return class_days
+
+
+def find_short_gap_class_pairs(global_solution_space: list, gap_minutes: float) -> list:
+    """
+        Find the pairs of classes of different courses with periods on the same
+        day separated by more than 0 but less than gap_minutes, in at least
+        one shared teaching week. The periods of
+        every day are sorted by start, so the periods starting within the gap
+        after the end of a period are found with a binary search and only the
+        pairs that are actually close together are looked at.
+    :param global_solution_space:
+    :param gap_minutes:
+    :return: The list of ((course_id, classes_id), (course_id, classes_id)) pairs.
+    """
+    day_periods = collections.defaultdict(list)
+    period_days = MinuteInterval().to_day_array([[course_metadata.start, course_metadata.end]
+                                                 for course_metadata in global_solution_space])
+    for course_metadata, day in zip(global_solution_space, period_days.tolist()):
+        day_periods[day].append(course_metadata)
+
+    class_pairs = set()
+    for periods in day_periods.values():
+        periods.sort(key=lambda period: period.start)
+        starts = [period.start for period in periods]
+        for period in periods:
+            first = bisect.bisect_right(starts, period.end)
+            last = bisect.bisect_left(starts, period.end + gap_minutes)
+            for next_period in periods[first:last]:
+                if next_period.course != period.course and next_period.weeks & period.weeks:
+                    class_pairs.add(tuple(sorted(((period.course, period.classes),
+                                                  (next_period.course, next_period.classes)))))
+    return sorted(class_pairs)
+
+
+def find_consecutive_period_pairs(global_solution_space: list, max_break_minutes: float = 0) -> list:
+    """
+        Find the pairs of periods of different courses on the same day where
+        the second starts at most max_break_minutes after the first ends in at
+        least one shared teaching week, the ones that could be walked between
+        one after the other. As in
+        find_short_gap_class_pairs the periods of every day are swept in order
+        of start and the periods following a period are found with a binary
+        search, so only the pairs that can be back to back are looked at.
+    :param global_solution_space:
+    :param max_break_minutes:
+    :return: The sorted list of (first period index, second period index) in global_solution_space.
+    """
+    day_periods = collections.defaultdict(list)
+    period_days = MinuteInterval().to_day_array([[course_metadata.start, course_metadata.end]
+                                                 for course_metadata in global_solution_space])
+    for period_index, day in enumerate(period_days.tolist()):
+        day_periods[day].append(period_index)
+
+    period_pairs = []
+    for period_indices in day_periods.values():
+        period_indices.sort(key=lambda period_index: global_solution_space[period_index].start)
+        starts = [global_solution_space[period_index].start for period_index in period_indices]
+        for period_index in period_indices:
+            period = global_solution_space[period_index]
+            first = bisect.bisect_left(starts, period.end)
+            last = bisect.bisect_right(starts, period.end + max_break_minutes)
+            for next_period_index in period_indices[first:last]:
+                next_period = global_solution_space[next_period_index]
+                if next_period.course != period.course and next_period.weeks & period.weeks:
+                    period_pairs.append((period_index, next_period_index))
+    return sorted(period_pairs)
+
+
+def greedy_timetable(global_solution_space: list, mapped_by_course_data_set: list) -> dict:
+    """
+        Quickly pick a class for as many courses as possible, going through the
+        courses with the fewest classes first and taking their first class
+        that doesn't clash with the classes already picked.
+    :return: course_id -> classes_id, without the courses no class could be picked for.
+    """
+    class_periods = collections.defaultdict(list)
+    for course_metadata in global_solution_space:
+        class_periods[course_metadata.course, course_metadata.classes].append((course_metadata.start,
+                                                                               course_metadata.end,
+                                                                               course_metadata.weeks))
+    timetable = {}
+    picked_periods = []
+    course_order = sorted(range(len(mapped_by_course_data_set)),
+                          key=lambda course_id: len(mapped_by_course_data_set[course_id]))
+    for course_id in course_order:
+        for course_metadata in mapped_by_course_data_set[course_id]:
+            periods = class_periods[course_id, course_metadata.classes]
+            if all(end <= picked_start or picked_end <= start or not weeks & picked_weeks
+                   for start, end, weeks in periods for picked_start, picked_end, picked_weeks in picked_periods):
+                timetable[course_id] = course_metadata.classes
+                picked_periods += periods
+                break
+    return timetable
@@ -0,0 +1,150 @@
+"""
+    Timings and sizes of the phases of building and solving a model, to find
+    the slow phases of requests and regressions in them.
+"""
+
+import collections
+import contextlib
+import json
+import threading
+import time
+
+# The types of constraint a model can have, the ones the timetable models use first.
+CONSTRAINT_TYPES = (
+    'bool_or', 'bool_and', 'at_most_one', 'exactly_one', 'linear', 'interval', 'no_overlap', 'bool_xor', 'lin_max',
+    'int_prod', 'int_div', 'int_mod', 'element', 'table', 'automaton', 'inverse', 'reservoir', 'cumulative',
+    'no_overlap_2d', 'circuit', 'routes', 'all_diff', 'dummy_constraint',
+)
+
+
+def _constraint_type(constraint) -> str:
+    # The protobuf messages of older OR-Tools name their oneof, the native ones of newer OR-Tools only have has_*.
+    if hasattr(constraint, 'WhichOneof'):
+        return constraint.WhichOneof('constraint')
+    for constraint_type in CONSTRAINT_TYPES:
+        if getattr(constraint, 'has_' + constraint_type)():
+            return constraint_type
+    return None
+
+
+class SolveMetrics:
+    """
+        The metrics of one request: the seconds spent in every phase, the size
+        of the model, the statistics of the solver response and the seconds
+        from the start of the solve to every solution.
+    """
+
+    def __init__(self, labels: dict = None):
+        """
+        :param labels:          - Identify the request in the exports, e.g. {'mode': 'enumerate'}.
+        """
+        self.labels = dict(labels or {})
+        self.phases = collections.OrderedDict()
+        self.model_size = {}
+        self.solver_stats = {}
+        self.solution_times = []
+        self.__solve_start = None
+        self.__lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """
+            Add the time spent in the with block to the phase.
+        """
+        phase_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self.__lock:
+                self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - phase_start
+
+    def record_model(self, model):
+        """
+            The number of variables, intervals and constraints of every type of
+            a CpModel.
+        """
+        proto = model.Proto()
+        constraint_types = collections.Counter(_constraint_type(constraint) for constraint in proto.constraints)
+        self.model_size = {
+            'variables': len(proto.variables),
+            'intervals': constraint_types.get('interval', 0),
+            'constraints': len(proto.constraints),
+            'constraint_types': dict(sorted(constraint_types.items())),
+        }
+
+    def start_solve(self):
+        self.__solve_start = time.perf_counter()
+
+    def record_solution(self):
+        with self.__lock:
+            self.solution_times.append(time.perf_counter() - self.__solve_start)
+
+    def record_solver(self, solver, has_objective: bool = False):
+        """
+            The statistics of the last response of a CpSolver, with its
+            objective and bound when the model has an objective.
+        """
+        response = solver.ResponseProto()
+        self.solver_stats = {
+            'status': solver.StatusName(response.status),
+            'conflicts': response.num_conflicts,
+            'branches': response.num_branches,
+            'booleans': response.num_booleans,
+            'wall_time': response.wall_time,
+            'user_time': response.user_time,
+            'deterministic_time': response.deterministic_time,
+        }
+        if has_objective:
+            self.solver_stats['objective'] = response.objective_value
+            self.solver_stats['bound'] = response.best_objective_bound
+
+    @property
+    def time_to_first_solution(self) -> float:
+        return self.solution_times[0] if self.solution_times else None
+
+    def to_dict(self) -> dict:
+        return {
+            'labels': self.labels,
+            'phases': dict(self.phases),
+            'model': self.model_size,
+            'solver': self.solver_stats,
+            'solutions': len(self.solution_times),
+            'time_to_first_solution': self.time_to_first_solution,
+            'solution_times': list(self.solution_times),
+        }
+
+    def to_json_line(self) -> str:
+        return json.dumps(self.to_dict(), separators=(',', ':')) + '\n'
+
+    def to_prometheus(self, prefix: str = 'autotimetabler') -> str:
+        """
+            The metrics in the Prometheus text exposition format, every sample
+            carrying the labels.
+        """
+        samples = collections.OrderedDict()
+
+        def add_sample(name: str, metric_type: str, value, labels: dict = None):
+            if value is None:
+                return
+            samples.setdefault((prefix + '_' + name, metric_type), []).append((dict(self.labels, **(labels or {})),
+                                                                              value))
+
+        for phase, seconds in self.phases.items():
+            add_sample('phase_seconds', 'gauge', seconds, {'phase': phase})
+        for name in ('variables', 'intervals', 'constraints'):
+            add_sample('model_' + name, 'gauge', self.model_size.get(name))
+        for name in ('conflicts', 'branches', 'booleans'):
+            add_sample('solver_' + name, 'gauge', self.solver_stats.get(name))
+        for name in ('wall_time', 'user_time', 'deterministic_time'):
+            add_sample('solver_%s_seconds' % name.replace('_time', ''), 'gauge', self.solver_stats.get(name))
+        add_sample('solutions', 'gauge', len(self.solution_times))
+        add_sample('time_to_first_solution_seconds', 'gauge', self.time_to_first_solution)
+
+        lines = []
+        for (name, metric_type), values in samples.items():
+            lines.append('# TYPE %s %s' % (name, metric_type))
+            for labels, value in values:
+                label_text = ','.join('%s="%s"' % (label, str(label_value).replace('\\', '\\\\').replace('"', '\\"'))
+                                      for label, label_value in sorted(labels.items()))
+                lines.append('%s%s %s' % (name, '{%s}' % label_text if label_text else '', repr(float(value))))
+        return '\n'.join(lines) + '\n'
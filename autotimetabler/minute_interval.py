@@ -0,0 +1,156 @@
+"""
+    The MinuteInterval format of the periods.
+"""
+
+import numpy as np
+
+DAY = 0
+START_TIME = 1
+END_TIME = 2
+LOCATION = 3
+# The optional teaching weeks of a period, a bitmask with bit w set when it runs in week w.
+WEEKS = 4
+START = 0
+END = 1
+FORCE_INCLUDE = 1
+# The teaching weeks of a period without any, every week. Its bitwise and with any other weeks is those weeks.
+ALL_WEEKS = -1
+
+
+def get_int_fp(floating_point):
+    """
+        Return the decimal value and the floating point values of a number respectively.
+    :param floating_point:
+    :return:
+    """
+    return int(floating_point), floating_point - int(floating_point)
+
+
+def period_weeks(period: list) -> int:
+    """
+        The teaching weeks bitmask of a [day, start, end, location, weeks] period, ALL_WEEKS when it has none.
+    """
+    return int(period[WEEKS]) if len(period) > WEEKS else ALL_WEEKS
+
+
+def to_week_mask(weeks: list) -> int:
+    """
+        The teaching weeks bitmask of a list of weeks, e.g. [1, 3, 5].
+    """
+    week_mask = 0
+    for week in weeks:
+        week_mask |= 1 << week
+    return week_mask
+
+
+class MinuteInterval:
+    MINUTES_IN_AN_HOUR = 60
+    HOURS_IN_A_DAY = 24
+    DAYS_IN_A_WORK_WEEK = 5
+
+    def __init__(self):
+        """
+            The MinuteInterval Format is basically a list containing the
+            interval start and end times in minutes from Monday 00:00 till Friday
+            23:59. Assuming that classes can start on the 0th, 15th, 30th, 45th
+            minute.
+
+            Furthermore, we can denote a WeekInterval  map as: (24*(n-1) + hour) * 60,
+            where n is the day of the week taking Monday as 1st index.
+        """
+        self._start = 0
+        # Effectively 7200 in the week interval and each day is treated in a
+        # 1440-minute period.
+        self._end = self.HOURS_IN_A_DAY * self.DAYS_IN_A_WORK_WEEK * self.MINUTES_IN_AN_HOUR
+
+    def to_hours(self, minutes: int) -> float:
+        return minutes / self.MINUTES_IN_AN_HOUR
+
+    def to_minutes(self, hour: float) -> float:
+        return hour * self.MINUTES_IN_AN_HOUR
+
+    def map_day_hour_to_minute_interval(self, day_hour_interval_list: list) -> list:
+        """
+            This function will take in a day_hour_interval_list list of schematic
+            [day, start, end] and return the corresponding time in MinuteInterval
+            format [start', end']
+        :param day_hour_interval_list:
+        :return:
+        """
+        day_of_the_week = (day_hour_interval_list[DAY] - 1)
+        offset_start = day_hour_interval_list[START_TIME]
+        offset_end = day_hour_interval_list[END_TIME]
+        interval_start = self.MINUTES_IN_AN_HOUR * (day_of_the_week * self.HOURS_IN_A_DAY + offset_start)
+        interval_end = self.MINUTES_IN_AN_HOUR * (day_of_the_week * self.HOURS_IN_A_DAY + offset_end)
+        return [interval_start, interval_end]
+
+    def map_minute_interval_to_day_hour(self, minute_interval_list: list) -> list:
+        """
+            This function will take in a week interval list of schematic
+            [start', end'] and return the corresponding time in Hour-interval
+            format [day, start, end]
+            :param minute_interval_list:
+            :return:
+        """
+        assert minute_interval_list[START_TIME - 1] >= 0  # Assumption that the start values are always greater than 0
+        assert minute_interval_list[END_TIME - 1] >= 0  # Assumption that the end values are always greater than 0
+        hour_interval = [0, 0, 0]  # Day, start_time, end_time
+        start_interval = ((minute_interval_list[START_TIME - 1]) / self.MINUTES_IN_AN_HOUR +
+                          self.HOURS_IN_A_DAY) / self.HOURS_IN_A_DAY
+        end_interval = ((minute_interval_list[END_TIME - 1]) / self.MINUTES_IN_AN_HOUR +
+                        self.HOURS_IN_A_DAY) / self.HOURS_IN_A_DAY
+        # Explanation:
+        #   The mapping is essentially that T: {week_interval_format} => {hour_interval_format}
+        #                                       week_interval = 60(24 * (n - 1) + offset)
+        #                                   G = 24n + offset  = (week_interval // 60) + 24
+        #                                       -> G / 24 = n + offset / 24
+        #                                       -> n      = (G - offset) / 24
+
+        day_of_class_start_time, hour_of_class_start_time = get_int_fp(start_interval)
+        day_of_class_end_time, hour_of_class_end_time = get_int_fp(end_interval)
+        # Assumption that the class starts and ends in the same day.
+        assert day_of_class_start_time == day_of_class_end_time
+        hour_interval = [day_of_class_start_time,
+                         round(hour_of_class_start_time * self.HOURS_IN_A_DAY, 2),
+                         round(hour_of_class_end_time * self.HOURS_IN_A_DAY, 2)]
+        return hour_interval
+
+    def to_minute_array(self, periods: list) -> np.ndarray:
+        """
+            The bulk version of map_day_hour_to_minute_interval, taking a list of
+            [day, start, end, ...] periods and returning the (N, 2) int32 array
+            of their [start', end'] MinuteInterval format. The hours are rounded
+            to the minute once and the rest is integer arithmetic.
+        :param periods:
+        :return:
+        """
+        day_hours = np.array([period[DAY:END_TIME + 1] for period in periods], dtype=np.float64).reshape(-1, 3)
+        minutes_in_a_day = self.HOURS_IN_A_DAY * self.MINUTES_IN_AN_HOUR
+        day_offsets = (day_hours[:, DAY].astype(np.int32) - 1) * minutes_in_a_day
+        minutes = np.rint(day_hours[:, START_TIME:END_TIME + 1] * self.MINUTES_IN_AN_HOUR).astype(np.int32)
+        return minutes + day_offsets[:, np.newaxis]
+
+    def to_day_array(self, minute_intervals: np.ndarray) -> np.ndarray:
+        """
+            The day of the week, taking Monday as 1, of every [start', end']
+            row of a MinuteInterval format array.
+        """
+        minute_intervals = np.asarray(minute_intervals, dtype=np.int32).reshape(-1, 2)
+        return minute_intervals[:, START] // (self.HOURS_IN_A_DAY * self.MINUTES_IN_AN_HOUR) + 1
+
+    def to_day_hour_array(self, minute_intervals: np.ndarray) -> np.ndarray:
+        """
+            The bulk version of map_minute_interval_to_day_hour, returning the
+            (N, 3) array of [day, start, end] rows. The day, hour and minute are
+            split off with integer division, and the minutes are only made a
+            fraction of the hour for the output.
+        :param minute_intervals:
+        :return:
+        """
+        minute_intervals = np.asarray(minute_intervals, dtype=np.int32).reshape(-1, 2)
+        minutes_in_a_day = self.HOURS_IN_A_DAY * self.MINUTES_IN_AN_HOUR
+        days = minute_intervals[:, START] // minutes_in_a_day
+        # The end is in the day of the start, a period ending at midnight ending at 24.
+        hours, minutes = np.divmod(minute_intervals - (days * minutes_in_a_day)[:, np.newaxis],
+                                   self.MINUTES_IN_AN_HOUR)
+        return np.column_stack((days + 1, hours + minutes / self.MINUTES_IN_AN_HOUR))
@@ -0,0 +1,466 @@
+"""
+    The CP-SAT model of a request.
+"""
+
+import collections
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from autotimetabler.distance import DistanceMatrix
+from autotimetabler.index import (find_consecutive_period_pairs, find_part_week_class_clashes,
+                                  find_short_gap_class_pairs, index_class_days)
+from autotimetabler.metrics import SolveMetrics
+from autotimetabler.minute_interval import ALL_WEEKS, END, LOCATION, START, MinuteInterval, period_weeks
+from autotimetabler.period_table import PeriodTable
+
+# The ways clashes between the classes of different courses can be encoded.
+NO_OVERLAP_ENCODING = 'no_overlap'
+CLIQUE_ENCODING = 'cliques'
+
+# The model data of a period.
+CourseMetadata = collections.namedtuple('course_metadata',
+                                        'course classes start end interval location assigned_bool_var weeks')
+
+
+def populate_data_set(model: cp_model, mapped_by_course_data_set: list, course_metadata: collections.namedtuple,
+                      global_solution_space: list,
+                      period_builder: list, course_id: int, classes_id: int,
+                      period_minutes: np.ndarray) -> tuple[list, list]:
+    """
+        The purpose of this function is to create variables using the
+
+    :param global_solution_space:
+    :param model:
+    :param mapped_by_course_data_set:
+    :param course_metadata:
+    :param period_builder:
+    :param course_id:
+    :param classes_id:
+    :param period_minutes:      - The MinuteInterval format of the periods in the period builder.
+    :return:
+    """
+    for period_id in range(len(period_builder)):
+        period = period_builder[period_id]
+        start = int(period_minutes[period_id, START])
+        end = int(period_minutes[period_id, END])
+        location = period[LOCATION]
+        # The data name for all the variables are going to be of the schematic
+        # period_(course id)_(class_id)_(period_id)
+        # assumption that the same location and same time classes are the same
+        # class and not unique.
+        data_name = 'period_%i_%i_%i_%s' % (course_id, classes_id, period_id, location)
+        bool_var = model.NewBoolVar(data_name + '_bool')
+        interval_var = model.NewOptionalIntervalVar(start, end - start, end, bool_var, data_name + '_' +
+                                                    location + '_interval')
+        # Mutate the list to use the period builder for the tuple containing the model data
+        # to save space.
+        period_builder[period_id] = course_metadata(course=course_id, classes=classes_id, start=start, end=end,
+                                                    interval=interval_var, location=period[LOCATION],
+                                                    assigned_bool_var=bool_var, weeks=period_weeks(period))
+        global_solution_space.append(period_builder[period_id])
+
+    # Conditional channeling, such that there is implication on the existence of
+    # all the periods in a given period list.
+
+    for period_id in range(len(period_builder)):
+        if period_id == START:
+            # Always point to the first period in any given data set since the
+            # rest that follows will be implied to always be true.
+            mapped_by_course_data_set[course_id].append(period_builder[period_id])
+        else:
+            # This is the conditional chaining such that if one period is included in the period set, then the rest
+            # follows to be included force fully.
+            model.AddImplication(period_builder[period_id].assigned_bool_var, period_builder[START].assigned_bool_var)
+            model.AddImplication(period_builder[START].assigned_bool_var, period_builder[period_id].assigned_bool_var)
+    return global_solution_space, mapped_by_course_data_set
+
+
+def define_day_time_constraints_for_variables(data: dict, model: cp_model, period_table: PeriodTable = None):
+    """
+        Create the variables that are going to be considered
+        for the constraint model.
+        :param model:
+        :param data: (dict)         - This is a json data which will be scraped for
+                                      predetermined fields which is documented.
+        :param period_table:        - The PeriodTable of the periods of the data, which gets the literal index of every
+                                      class created. A new one is made when None.
+        :return:
+    """
+    global_solution_space = []
+    # This will house all the course course_metadata variables.
+    mapped_by_course_data_set = [[] for _ in range(len(data['periods']))]
+    # define_data_schema = ('course_id', 'class_id', 'period_id', 'location') = IntervalDomainVar
+    # Data visualisation Tree
+    # Courses
+    #   -> Classes
+    #       -> Periods
+    # Merging consecutive classes.
+    days_allowed = list(data['days'])
+    days_allowed = list(map(lambda day: int(day), days_allowed))
+    if period_table is None:
+        period_table = PeriodTable(data['periods'])
+    # Checking whether any period falls in a day which the user does not want to
+    # attend university, or outside the hours they want to be there.
+    class_is_feasible = period_table.feasible_classes(days_allowed, int(data['start']), int(data['end']))
+    for class_index in np.flatnonzero(class_is_feasible).tolist():
+        course_id = int(period_table.class_course[class_index])
+        classes_id = int(period_table.class_classes[class_index])
+        # The given periods in the class constraints to a feasible day and time slot only.
+        # We could call the constraint model to constraint the variables but this is another alternative to that
+        # method.
+        period_builder = list(data['periods'][course_id][classes_id])
+        global_solution_space, mapped_by_course_data_set = populate_data_set(model, mapped_by_course_data_set,
+                                                                             CourseMetadata,
+                                                                             global_solution_space,
+                                                                             period_builder,
+                                                                             course_id, classes_id,
+                                                                             period_table.minute_intervals(
+                                                                                 class_index))
+        period_table.class_literals[class_index] = mapped_by_course_data_set[course_id][-1].assigned_bool_var.Index()
+
+    return global_solution_space, mapped_by_course_data_set
+
+
+def define_max_one_class_per_course_constraint(model: cp_model, global_solution_space: list,
+                                               mapped_by_course_data_set: list):
+    # All the courses need to have exactly one variable that is included in the data set.
+    for course_id in range(len(mapped_by_course_data_set)):
+        bool_vars = [course_metadata.assigned_bool_var for course_metadata in mapped_by_course_data_set[course_id]]
+        model.AddExactlyOne(bool_vars)
+
+
+def _class_literals(mapped_by_course_data_set: list) -> dict:
+    # The literal of every class, by (course_id, classes_id).
+    return {(course_metadata.course, course_metadata.classes): course_metadata.assigned_bool_var
+            for courses in mapped_by_course_data_set for course_metadata in courses}
+
+
+def define_no_overlap_constraint(model: cp_model, global_solution_space: list, mapped_by_course_data_set: list):
+    """
+        Keep the periods chosen from overlapping. The periods running every
+        week go in one AddNoOverlap, and the periods running only in some
+        teaching weeks only get a constraint with the classes they really
+        clash with, see find_part_week_class_clashes.
+    """
+    interval_list = []
+    for solutions in global_solution_space:
+        # Create an interval list which will ensure that none of the chosen
+        # variables are overlapping
+        if solutions.weeks == ALL_WEEKS:
+            interval_list.append(solutions.interval)
+    model.AddNoOverlap(interval_list)
+    if len(interval_list) == len(global_solution_space):
+        return
+
+    class_literals = _class_literals(mapped_by_course_data_set)
+    class_pairs, self_clashes = find_part_week_class_clashes(global_solution_space)
+    for classes_key in sorted(self_clashes):
+        model.AddBoolOr([class_literals[classes_key].Not()])
+    for first_classes_key, second_classes_key in class_pairs:
+        model.AddBoolOr([class_literals[first_classes_key].Not(), class_literals[second_classes_key].Not()])
+
+
+def define_clash_clique_constraint(model: cp_model, global_solution_space: list, mapped_by_course_data_set: list):
+    """
+        An alternative to define_no_overlap_constraint which encodes the clashes
+        directly over the class literals. The periods are swept by start time and
+        every maximal set of periods running at the same time gets an at most
+        one constraint over their classes. Sets with the classes of a single
+        course are skipped, AddExactlyOne already allows only one of them.
+        When some of the periods only run in some teaching weeks, the set is
+        split into the periods running in each of their weeks, the pairs not
+        sharing any week not clashing.
+    :param model:
+    :param global_solution_space:
+    :param mapped_by_course_data_set:
+    :return:
+    """
+    class_literals = _class_literals(mapped_by_course_data_set)
+
+    # Periods ending at a time are removed before the ones starting at that time are added,
+    # since back-to-back periods don't clash. Periods of no length don't clash with anything.
+    events = []
+    for period_id, course_metadata in enumerate(global_solution_space):
+        if course_metadata.start == course_metadata.end:
+            continue
+        events.append((course_metadata.start, 1, period_id))
+        events.append((course_metadata.end, 0, period_id))
+    events.sort()
+
+    running_periods = set()
+    added_since_clique = False
+    emitted_cliques = set()
+    for _, is_start, period_id in events:
+        if is_start:
+            running_periods.add(period_id)
+            added_since_clique = True
+            continue
+        if added_since_clique:
+            # The running periods can't grow any further, so they are a maximal clique.
+            added_since_clique = False
+            part_weeks = 0
+            for running_period in running_periods:
+                if global_solution_space[running_period].weeks != ALL_WEEKS:
+                    part_weeks |= global_solution_space[running_period].weeks
+            if not part_weeks:
+                week_cliques = [running_periods]
+            else:
+                week_cliques = [[running_period for running_period in running_periods
+                                 if global_solution_space[running_period].weeks & week_mask]
+                                for week_mask in _week_bits(part_weeks)]
+            for week_clique in week_cliques:
+                clique_classes = collections.Counter((global_solution_space[running_period].course,
+                                                      global_solution_space[running_period].classes)
+                                                     for running_period in week_clique)
+                for classes_key, period_count in clique_classes.items():
+                    if period_count > 1:
+                        # The class clashes with itself.
+                        model.AddBoolOr([class_literals[classes_key].Not()])
+                clique = frozenset(clique_classes)
+                if len({course_id for course_id, _ in clique}) > 1 and clique not in emitted_cliques:
+                    emitted_cliques.add(clique)
+                    literals = [class_literals[classes_key] for classes_key in sorted(clique)]
+                    if len(literals) == 2:
+                        model.AddBoolOr([literals[0].Not(), literals[1].Not()])
+                    else:
+                        model.AddAtMostOne(literals)
+        running_periods.remove(period_id)
+
+
+def _week_bits(week_mask: int):
+    # The single week masks of the weeks of a mask.
+    while week_mask:
+        week_bit = week_mask & -week_mask
+        yield week_bit
+        week_mask ^= week_bit
+
+
+def define_min_gap_constraint(model: cp_model, global_solution_space: list,
+                              mapped_by_course_data_set: list, gap: float, soft: bool = False) -> list:
+    """
+        Keep the classes of a day either back to back or at least gap hours
+        apart. Classes of the same course are never chosen together, so only
+        pairs of different courses are looked at.
+    :param model:
+    :param global_solution_space:
+    :param mapped_by_course_data_set:
+    :param gap:                 - The minimum gap in hours.
+    :param soft:                - Instead of forbidding the short gaps, create a penalty literal for every pair of
+                                  classes making one, for the caller to put in an objective.
+    :return: The penalty literals, empty unless soft.
+    """
+    class_literals = _class_literals(mapped_by_course_data_set)
+
+    penalty_literals = []
+    gap_minutes = MinuteInterval().to_minutes(gap)
+    for first_class, second_class in find_short_gap_class_pairs(global_solution_space, gap_minutes):
+        first_literal = class_literals[first_class]
+        second_literal = class_literals[second_class]
+        if not soft:
+            model.AddBoolOr([first_literal.Not(), second_literal.Not()])
+            continue
+        # The penalty is true exactly when both classes are chosen.
+        penalty_literal = model.NewBoolVar('gap_%i_%i_%i_%i' % (first_class + second_class))
+        model.AddBoolOr([first_literal.Not(), second_literal.Not(), penalty_literal])
+        model.AddImplication(penalty_literal, first_literal)
+        model.AddImplication(penalty_literal, second_literal)
+        penalty_literals.append(penalty_literal)
+    return penalty_literals
+
+
+def define_min_walking_constraint(model: cp_model, global_solution_space: list, mapped_by_course_data_set: list,
+                                  distance_matrix: DistanceMatrix, max_break: float = 0) -> list:
+    """
+        Create a walking literal for every pair of classes of different courses
+        with periods that can be back to back, true exactly when both classes
+        are chosen, weighted by the distance walked between them. Only the
+        pairs found by find_consecutive_period_pairs get one, so the encoding
+        grows with the periods that can follow each other instead of with all
+        the pairs of periods.
+    :param model:
+    :param global_solution_space:
+    :param mapped_by_course_data_set:
+    :param distance_matrix:     - The distances between the locations of the campus.
+    :param max_break:           - The longest break in hours between two periods that are still walked between.
+    :return: The (walking literal, distance) of every pair of classes, for the caller to put in an objective.
+    """
+    class_literals = _class_literals(mapped_by_course_data_set)
+
+    period_pairs = np.array(find_consecutive_period_pairs(global_solution_space,
+                                                          MinuteInterval().to_minutes(max_break)),
+                            dtype=np.int64).reshape(-1, 2)
+    # Every location is looked up once, the periods only keep the id of theirs.
+    locations, period_locations = np.unique([course_metadata.location for course_metadata in global_solution_space],
+                                            return_inverse=True)
+    period_location_ids = distance_matrix.location_ids(locations.tolist())[period_locations.reshape(-1)]
+    pair_distances = distance_matrix.period_distances(period_location_ids[period_pairs[:, 0]],
+                                                      period_location_ids[period_pairs[:, 1]])
+
+    class_pair_distances = collections.Counter()
+    for (first_period, second_period), distance in zip(period_pairs.tolist(), pair_distances.tolist()):
+        if distance:
+            first_class = global_solution_space[first_period].course, global_solution_space[first_period].classes
+            second_class = global_solution_space[second_period].course, global_solution_space[second_period].classes
+            class_pair_distances[tuple(sorted((first_class, second_class)))] += distance
+
+    walking_terms = []
+    for (first_class, second_class), distance in sorted(class_pair_distances.items()):
+        first_literal = class_literals[first_class]
+        second_literal = class_literals[second_class]
+        walking_literal = model.NewBoolVar('walk_%i_%i_%i_%i' % (first_class + second_class))
+        model.AddBoolOr([first_literal.Not(), second_literal.Not(), walking_literal])
+        model.AddImplication(walking_literal, first_literal)
+        model.AddImplication(walking_literal, second_literal)
+        walking_terms.append((walking_literal, distance))
+    return walking_terms
+
+
+def define_day_used_variables(model: cp_model, global_solution_space: list, mapped_by_course_data_set: list) -> dict:
+    """
+        Create a day_used literal for every day any class has a period on, true
+        exactly when one of the chosen classes has a period on that day. Both
+        directions are needed, a day_used literal left free would make the
+        enumeration give every timetable twice.
+    :return: day -> day_used literal
+    """
+    class_days = index_class_days(global_solution_space)
+    day_classes = collections.defaultdict(list)
+    for courses in mapped_by_course_data_set:
+        for course_metadata in courses:
+            for day in class_days[course_metadata.course, course_metadata.classes]:
+                day_classes[day].append(course_metadata.assigned_bool_var)
+    day_used = {}
+    for day in sorted(day_classes):
+        day_used[day] = model.NewBoolVar('day_%i_used' % day)
+        for assigned_bool_var in day_classes[day]:
+            model.AddImplication(assigned_bool_var, day_used[day])
+        model.AddBoolOr(day_classes[day]).OnlyEnforceIf(day_used[day])
+    return day_used
+
+
+def define_max_days_constraint(model: cp_model, global_solution_space: list, mapped_by_course_data_set: list,
+                               max_days: int, minimise_days: bool = False) -> dict:
+    """
+        Allow the chosen classes to be on at most max_days days of the week,
+        optionally making the number of days the objective to minimise.
+        Nothing is added when max_days allows every day any class is on and
+        the days are not minimised.
+    :return: day -> day_used literal, see define_day_used_variables.
+    """
+    candidate_days = np.unique(MinuteInterval().to_day_array([[course_metadata.start, course_metadata.end]
+                                                              for course_metadata in global_solution_space]))
+    if max_days >= len(candidate_days) and not minimise_days:
+        return {}
+    day_used = define_day_used_variables(model, global_solution_space, mapped_by_course_data_set)
+    model.Add(sum(day_used.values()) <= max_days)
+    if minimise_days:
+        model.Minimize(sum(day_used.values()))
+    return day_used
+
+
+def define_social_timetabling(model: cp_model, student_mapped_by_course_data_sets: list, student_course_keys: list,
+                              hard: bool = False) -> tuple[dict, list]:
+    """
+        Tie the classes of the students of a group taking the same course
+        together. Every course taken by more than one student gets one shared
+        literal per class, exactly one of them true for the class of the
+        group, and every student taking it gets a together literal which can
+        only be true when the student is in the class of the group, for the
+        caller to maximise. With hard the students are all in the class of the
+        group, their class literals being equal to the shared ones.
+
+        The classes_id of a course need to be the same for all the students,
+        i.e. the course is canonicalised the same way for all of them.
+    :param model:
+    :param student_mapped_by_course_data_sets:  - The mapped_by_course_data_set of every student.
+    :param student_course_keys:                 - The key of every course of every student, the same for the same
+                                                  course.
+    :param hard:                                - Put all the students taking a course in the same class.
+    :return: (course key -> classes_id -> shared literal, the together literals, empty when hard)
+    """
+    course_students = collections.defaultdict(list)
+    for student_id, course_keys in enumerate(student_course_keys):
+        for course_id, course_key in enumerate(course_keys):
+            course_students[course_key].append((student_id, course_id))
+
+    shared_literals = {}
+    together_literals = []
+    # The literals are named by the index of the course key, which can be as long as the json of the course.
+    for course_index, (course_key, students) in enumerate(course_students.items()):
+        if len(students) < 2:
+            continue
+        student_class_literals = [{course_metadata.classes: course_metadata.assigned_bool_var
+                                   for course_metadata in student_mapped_by_course_data_sets[student_id][course_id]}
+                                  for student_id, course_id in students]
+        classes_ids = sorted({classes_id for class_literals in student_class_literals for classes_id in class_literals})
+        shared_literals[course_key] = {classes_id: model.NewBoolVar('shared_%i_%i' % (course_index, classes_id))
+                                       for classes_id in classes_ids}
+        model.AddExactlyOne(shared_literals[course_key].values())
+        for (student_id, _), class_literals in zip(students, student_class_literals):
+            if hard:
+                for classes_id, shared_literal in shared_literals[course_key].items():
+                    if classes_id in class_literals:
+                        model.Add(class_literals[classes_id] == shared_literal)
+                    else:
+                        model.AddBoolOr([shared_literal.Not()])
+                continue
+            together_literal = model.NewBoolVar('together_%i_%i' % (course_index, student_id))
+            for classes_id, class_literal in class_literals.items():
+                model.AddBoolOr([together_literal.Not(), class_literal.Not(), shared_literals[course_key][classes_id]])
+            together_literals.append(together_literal)
+    return shared_literals, together_literals
+
+
+def define_timetable_constraints(model: cp_model, data: dict, clash_encoding: str = NO_OVERLAP_ENCODING,
+                                 minimise_days: bool = False, enforce_gap: bool = False,
+                                 metrics: SolveMetrics = None) -> tuple[list, list, dict]:
+    """
+        Add the variables and all the constraints of the request to the model,
+        which can hold the requests of other students too.
+    :return: (global_solution_space, mapped_by_course_data_set, day_used) of the request, day_used the day_used
+             literals of define_max_days_constraint, empty when it added none.
+    """
+    if metrics is None:
+        metrics = SolveMetrics()
+    if clash_encoding == NO_OVERLAP_ENCODING:
+        define_clash_constraint = define_no_overlap_constraint
+    elif clash_encoding == CLIQUE_ENCODING:
+        define_clash_constraint = define_clash_clique_constraint
+    else:
+        raise ValueError('Unknown clash encoding: %s' % clash_encoding)
+    with metrics.phase('period_table'):
+        period_table = PeriodTable(data['periods'])
+    with metrics.phase('define_day_time_constraints_for_variables'):
+        global_solution_space, mapped_by_course_data_set = define_day_time_constraints_for_variables(data, model,
+                                                                                                     period_table)
+    with metrics.phase('define_max_one_class_per_course_constraint'):
+        define_max_one_class_per_course_constraint(model, global_solution_space, mapped_by_course_data_set)
+    with metrics.phase(define_clash_constraint.__name__):
+        define_clash_constraint(model, global_solution_space, mapped_by_course_data_set)
+    with metrics.phase('define_max_days_constraint'):
+        day_used = define_max_days_constraint(model, global_solution_space, mapped_by_course_data_set,
+                                              int(data['max_days']), minimise_days)
+    if enforce_gap:
+        with metrics.phase('define_min_gap_constraint'):
+            define_min_gap_constraint(model, global_solution_space, mapped_by_course_data_set, float(data['gap']))
+    return global_solution_space, mapped_by_course_data_set, day_used
+
+
+def build_timetable_model(data: dict, clash_encoding: str = NO_OVERLAP_ENCODING,
+                          minimise_days: bool = False, enforce_gap: bool = False,
+                          metrics: SolveMetrics = None) -> tuple[cp_model.CpModel, list, list]:
+    """
+        Create the model with all the constraints of the request.
+    :param data: (dict)         - The request json data.
+    :param clash_encoding:      - NO_OVERLAP_ENCODING or CLIQUE_ENCODING.
+    :param minimise_days:       - Make the number of days on campus the objective.
+    :param enforce_gap:         - Forbid gaps shorter than the gap of the request between classes.
+    :param metrics:             - Gets the time spent in every phase and the size of the model.
+    :return: (model, global_solution_space, mapped_by_course_data_set)
+    """
+    model = cp_model.CpModel()
+    global_solution_space, mapped_by_course_data_set, _ = define_timetable_constraints(model, data, clash_encoding,
+                                                                                       minimise_days, enforce_gap,
+                                                                                       metrics)
+    return model, global_solution_space, mapped_by_course_data_set
@@ -0,0 +1,246 @@
+"""
+    Optimisation of the timetable of a request for its preferences.
+"""
+
+import collections
+
+from ortools.sat.python import cp_model
+
+from autotimetabler.distance import DistanceMatrix
+from autotimetabler.index import greedy_timetable
+from autotimetabler.metrics import SolveMetrics
+from autotimetabler.minute_interval import MinuteInterval
+from autotimetabler.model import (NO_OVERLAP_ENCODING, define_day_used_variables, define_min_gap_constraint,
+                                  define_min_walking_constraint, define_timetable_constraints)
+from autotimetabler.presolve import InfeasibleRequest
+from autotimetabler.search import reduce_request, reduced_class_ids
+
+# Classes starting before or ending after these hours are penalised when optimising.
+EARLY_HOUR = 10
+LATE_HOUR = 18
+# The weights of the terms of the objective when optimising.
+DEFAULT_OBJECTIVE_WEIGHTS = {
+    'days': 10,
+    'gaps': 3,
+    'early': 1,
+    'late': 1,
+    'preferred': 5,
+    'walking': 1,
+}
+
+
+# infeasible_courses is the course_id -> explanation of every course without classes when presolve finds some.
+OptimisedTimetable = collections.namedtuple('OptimisedTimetable',
+                                            'timetable status objective bound relative_gap infeasible_courses',
+                                            defaults=(None,))
+
+
+def infeasible_timetable(infeasible_courses: dict) -> OptimisedTimetable:
+    """
+        The result of a request presolve finds courses without classes in.
+    """
+    return OptimisedTimetable(timetable=None, status='INFEASIBLE', objective=None, bound=None, relative_gap=None,
+                              infeasible_courses=infeasible_courses)
+
+
+def define_timetable_objective(model: cp_model, global_solution_space: list, mapped_by_course_data_set: list,
+                               data: dict, weights: dict, preferred_classes: list,
+                               distance_matrix: DistanceMatrix = None, day_used: dict = None):
+    """
+        Minimise a weighted sum of the days on campus, the gaps shorter than the
+        gap of the request, the periods starting before the early hour or ending
+        after the late hour of the request, minus the preferred classes chosen,
+        plus the distance walked between back to back classes when there is a
+        distance matrix.
+    :param model:
+    :param global_solution_space:
+    :param mapped_by_course_data_set:
+    :param data: (dict)         - The request json data, with the optional 'early' and 'late' hours.
+    :param weights:             - The weight of every term, see DEFAULT_OBJECTIVE_WEIGHTS.
+    :param preferred_classes:   - The (course_id, classes_id) of the classes to prefer.
+    :param distance_matrix:     - The distances between the locations of the campus.
+    :param day_used:            - The day -> literal of every day the model already has, e.g. from
+                                  define_max_days_constraint, created when there are none.
+    :return:
+    """
+    if not day_used:
+        day_used = define_day_used_variables(model, global_solution_space, mapped_by_course_data_set)
+    gap_penalties = define_min_gap_constraint(model, global_solution_space, mapped_by_course_data_set,
+                                              float(data.get('gap', 0)), soft=True)
+
+    min_intervals = MinuteInterval()
+    minutes_in_a_day = MinuteInterval.HOURS_IN_A_DAY * MinuteInterval.MINUTES_IN_AN_HOUR
+    early_minutes = min_intervals.to_minutes(float(data.get('early', EARLY_HOUR)))
+    late_minutes = min_intervals.to_minutes(float(data.get('late', LATE_HOUR)))
+    class_penalties = collections.Counter()
+    for course_metadata in global_solution_space:
+        day_start = course_metadata.start - course_metadata.start % minutes_in_a_day
+        if course_metadata.start - day_start < early_minutes:
+            class_penalties[course_metadata.course, course_metadata.classes] += weights['early']
+        if course_metadata.end - day_start > late_minutes:
+            class_penalties[course_metadata.course, course_metadata.classes] += weights['late']
+    for course_id, classes_id in preferred_classes:
+        class_penalties[course_id, classes_id] -= weights['preferred']
+
+    objective_terms = [weights['days'] * day_literal for day_literal in day_used.values()]
+    objective_terms += [weights['gaps'] * penalty_literal for penalty_literal in gap_penalties]
+    if distance_matrix is not None:
+        walking_terms = define_min_walking_constraint(model, global_solution_space, mapped_by_course_data_set,
+                                                      distance_matrix)
+        objective_terms += [weights['walking'] * distance * walking_literal
+                            for walking_literal, distance in walking_terms]
+    for courses in mapped_by_course_data_set:
+        for course_metadata in courses:
+            penalty = class_penalties[course_metadata.course, course_metadata.classes]
+            if penalty:
+                objective_terms.append(penalty * course_metadata.assigned_bool_var)
+    model.Minimize(sum(objective_terms))
+
+
+def build_optimisation_model(data: dict, weights: dict = None, clash_encoding: str = NO_OVERLAP_ENCODING,
+                             distance_matrix: DistanceMatrix = None, metrics: SolveMetrics = None,
+                             presolve_request: bool = True):
+    """
+        Create the model of the request with the objective of
+        define_timetable_objective, over the classes reduced by
+        reduce_request. The preferred classes that can't be in any timetable
+        are left out.
+    :param data: (dict)                 - The request json data, with the optional 'preferred' list of
+                                          [course_id, classes_id].
+    :param weights:                     - The weights of the objective, see DEFAULT_OBJECTIVE_WEIGHTS.
+    :param clash_encoding:              - NO_OVERLAP_ENCODING or CLIQUE_ENCODING.
+    :param distance_matrix:             - The distances between the locations of the campus, to minimise walking.
+    :param metrics:                     - Gets the time spent in every phase.
+    :param presolve_request:            - Remove the classes that can't be in any timetable before building the model.
+    :return: (model, global_solution_space, mapped_by_course_data_set, equivalent_classes, reduced_classes) where
+             reduced_classes maps the (course_id, classes_id) of the request to the reduced classes_id.
+    :raise InfeasibleRequest: When presolving finds a course without classes.
+    """
+    if metrics is None:
+        metrics = SolveMetrics()
+    reduced_data, equivalent_classes = reduce_request(data, presolve_request, metrics)
+    reduced_classes = reduced_class_ids(equivalent_classes)
+
+    model = cp_model.CpModel()
+    global_solution_space, mapped_by_course_data_set, day_used = define_timetable_constraints(
+        model, reduced_data, clash_encoding, metrics=metrics)
+    objective_weights = dict(DEFAULT_OBJECTIVE_WEIGHTS)
+    objective_weights.update(weights or {})
+    preferred_classes = [(course_id, reduced_classes[course_id, classes_id])
+                         for course_id, classes_id in data.get('preferred', [])
+                         if (course_id, classes_id) in reduced_classes]
+    with metrics.phase('define_timetable_objective'):
+        define_timetable_objective(model, global_solution_space, mapped_by_course_data_set, reduced_data,
+                                   objective_weights, preferred_classes, distance_matrix, day_used)
+    return model, global_solution_space, mapped_by_course_data_set, equivalent_classes, reduced_classes
+
+
+def solve_for_best_timetable(model: cp_model.CpModel, mapped_by_course_data_set: list, equivalent_classes: list,
+                             solver: cp_model.CpSolver) -> tuple[OptimisedTimetable, list]:
+    """
+        Solve an optimisation model and read the best timetable back in the
+        classes_id of the request.
+    :return: (the result, the literals of the chosen classes)
+    """
+    status = solver.Solve(model)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return OptimisedTimetable(timetable=None, status=solver.StatusName(status), objective=None, bound=None,
+                                  relative_gap=None), []
+    timetable = {}
+    chosen_literals = []
+    for courses in mapped_by_course_data_set:
+        for course_metadata in courses:
+            if solver.Value(course_metadata.assigned_bool_var):
+                timetable[course_metadata.course] = equivalent_classes[course_metadata.course][
+                    course_metadata.classes][0]
+                chosen_literals.append(course_metadata.assigned_bool_var)
+    objective = solver.ObjectiveValue()
+    bound = solver.BestObjectiveBound()
+    return OptimisedTimetable(timetable=timetable, status=solver.StatusName(status), objective=objective, bound=bound,
+                              relative_gap=abs(objective - bound) / max(1.0, abs(objective))), chosen_literals
+
+
+def optimise_timetable(data: dict, weights: dict = None, num_workers: int = 8, max_time_in_seconds: float = 10.0,
+                       hint: dict = None, clash_encoding: str = NO_OVERLAP_ENCODING,
+                       distance_matrix: DistanceMatrix = None, metrics: SolveMetrics = None) -> OptimisedTimetable:
+    """
+        Find the best timetable of the request for the objective of
+        define_timetable_objective, instead of enumerating all of them.
+        The search is seeded with the hint, typically the previous answer for
+        the request, or else with greedy_timetable.
+    :param data: (dict)                 - The request json data, with the optional 'preferred' list of
+                                          [course_id, classes_id].
+    :param weights:                     - The weights of the objective, see DEFAULT_OBJECTIVE_WEIGHTS.
+    :param num_workers:
+    :param max_time_in_seconds:
+    :param hint:                        - A course_id -> classes_id timetable to start the search from.
+    :param clash_encoding:              - NO_OVERLAP_ENCODING or CLIQUE_ENCODING.
+    :param distance_matrix:             - The distances between the locations of the campus, to minimise walking.
+    :param metrics:                     - Gets the time spent in every phase, the size of the model and the
+                                          statistics of the solver.
+    :return: The best timetable found (None if there is none) and how far from optimal it can be, with the
+             infeasible_courses when presolving finds courses without classes.
+    """
+    # Counting the constraints of the model takes a pass over it, which is only done when the metrics are wanted.
+    count_model = metrics is not None
+    if metrics is None:
+        metrics = SolveMetrics()
+    try:
+        model, global_solution_space, mapped_by_course_data_set, equivalent_classes, reduced_classes = \
+            build_optimisation_model(data, weights, clash_encoding, distance_matrix, metrics)
+    except InfeasibleRequest as error:
+        return infeasible_timetable(error.infeasible_courses)
+    if hint is None:
+        hinted_timetable = greedy_timetable(global_solution_space, mapped_by_course_data_set)
+    else:
+        # The classes presolve removed can't be hinted.
+        hinted_timetable = {course_id: reduced_classes[course_id, classes_id]
+                            for course_id, classes_id in hint.items() if (course_id, classes_id) in reduced_classes}
+    for course_id, classes_id in hinted_timetable.items():
+        for course_metadata in mapped_by_course_data_set[course_id]:
+            model.AddHint(course_metadata.assigned_bool_var, course_metadata.classes == classes_id)
+
+    solver = cp_model.CpSolver()
+    solver.parameters.num_workers = num_workers
+    solver.parameters.max_time_in_seconds = max_time_in_seconds
+    if count_model:
+        metrics.record_model(model)
+    with metrics.phase('solve'):
+        result, _ = solve_for_best_timetable(model, mapped_by_course_data_set, equivalent_classes, solver)
+    metrics.record_solver(solver, has_objective=True)
+    return result
+
+
+def top_k(data: dict, k: int, min_hamming: int = 1, weights: dict = None, num_workers: int = 8,
+          max_time_in_seconds: float = 1.0, clash_encoding: str = NO_OVERLAP_ENCODING,
+          distance_matrix: DistanceMatrix = None):
+    """
+        Yield up to k of the best timetables of the request, best first, each
+        one choosing a different class than every previous one for at least
+        min_hamming courses. After every solve the courses of the timetable just
+        found are constrained to agree with it on fewer than
+        len(courses) - min_hamming + 1 courses and the same model is solved
+        again, which is k small solves instead of enumerating everything.
+    :param data: (dict)                 - The request json data.
+    :param k:                           - The number of timetables wanted.
+    :param min_hamming:                 - The number of courses any two timetables must differ in.
+    :param weights:                     - The weights of the objective, see DEFAULT_OBJECTIVE_WEIGHTS.
+    :param num_workers:
+    :param max_time_in_seconds:         - The time limit of every solve.
+    :param clash_encoding:              - NO_OVERLAP_ENCODING or CLIQUE_ENCODING.
+    :param distance_matrix:             - The distances between the locations of the campus, to minimise walking.
+    :return: A generator of OptimisedTimetable, ending early when there are no more timetables.
+    :raise InfeasibleRequest: When presolving finds a course without classes.
+    """
+    model, global_solution_space, mapped_by_course_data_set, equivalent_classes, _ = \
+        build_optimisation_model(data, weights, clash_encoding, distance_matrix)
+    solver = cp_model.CpSolver()
+    solver.parameters.num_workers = num_workers
+    solver.parameters.max_time_in_seconds = max_time_in_seconds
+    for _ in range(k):
+        result, chosen_literals = solve_for_best_timetable(model, mapped_by_course_data_set, equivalent_classes,
+                                                           solver)
+        if result.timetable is None:
+            return
+        yield result
+        model.Add(sum(chosen_literals) <= len(chosen_literals) - min_hamming)
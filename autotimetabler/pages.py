@@ -0,0 +1,164 @@
+"""
+    Enumeration of the timetables of a request one page at a time, resumed
+    from an opaque cursor by any process.
+
+    The timetables are enumerated in lexicographic order of the classes_id of
+    every course, so the cursor only has to hold the last timetable given and
+    the next page is the timetables lexicographically after it.
+"""
+
+import base64
+import collections
+import hashlib
+import itertools
+import json
+import struct
+
+from ortools.sat.python import cp_model
+
+from autotimetabler.data import original_timetables
+from autotimetabler.model import NO_OVERLAP_ENCODING, build_timetable_model
+from autotimetabler.search import reduce_request, stream_solutions
+
+TimetablePage = collections.namedtuple('TimetablePage', 'timetables cursor')
+
+_CURSOR_VERSION = 1
+_REQUEST_HASH_BYTES = 8
+
+
+def request_hash(data: dict, *options) -> bytes:
+    """
+        The hash of everything the order of the timetables depends on: the
+        request as written and the options of the enumeration.
+    """
+    request_json = json.dumps([data, options], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(request_json.encode()).digest()[:_REQUEST_HASH_BYTES]
+
+
+def encode_cursor(model_hash: bytes, bound: list) -> str:
+    """
+        The url safe cursor of the last timetable of a page, the version, the
+        hash and two bytes for the classes_id of every course.
+    """
+    cursor = struct.pack('<B%isH%iH' % (len(model_hash), len(bound)), _CURSOR_VERSION, model_hash, len(bound), *bound)
+    return base64.urlsafe_b64encode(cursor).rstrip(b'=').decode()
+
+
+def decode_cursor(cursor: str, model_hash: bytes) -> list:
+    """
+        The last timetable given of a cursor of encode_cursor.
+    :raise ValueError: When the cursor is malformed or was given for another request.
+    """
+    try:
+        cursor_bytes = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        version, cursor_hash, course_count = struct.unpack_from('<B%isH' % len(model_hash), cursor_bytes)
+        bound = struct.unpack_from('<%iH' % course_count, cursor_bytes, 1 + len(model_hash) + 2)
+    except (ValueError, struct.error) as error:
+        raise ValueError('Malformed cursor') from error
+    if version != _CURSOR_VERSION or cursor_hash != model_hash:
+        raise ValueError('The cursor was not given for this request')
+    return list(bound)
+
+
+def define_lexicographic_order(model: cp_model.CpModel, mapped_by_course_data_set: list, bound: list = None) -> list:
+    """
+        Create the classes_id variable of every course, search them in order
+        from their smallest value so that the solutions are found in
+        lexicographic order, and only allow the solutions lexicographically
+        after the bound.
+
+        The literals expressing the order are all defined by the class
+        literals, so that the enumeration gives every timetable once.
+    :return: The classes_id variables.
+    """
+    classes_variables = []
+    for course_id, courses in enumerate(mapped_by_course_data_set):
+        classes_ids = [course_metadata.classes for course_metadata in courses]
+        classes_variable = model.NewIntVarFromDomain(cp_model.Domain.FromValues(classes_ids), 'classes_%i' % course_id)
+        model.Add(classes_variable == sum(course_metadata.classes * course_metadata.assigned_bool_var
+                                          for course_metadata in courses))
+        classes_variables.append(classes_variable)
+    model.AddDecisionStrategy(classes_variables, cp_model.CHOOSE_FIRST, cp_model.SELECT_MIN_VALUE)
+    if bound is None:
+        return classes_variables
+
+    # prefix_equal is true when the courses before are on the classes of the bound (None for always), after when
+    # this course is on a later class, and the timetable is after the bound when both are for any course.
+    prefix_equal = None
+    greater_literals = []
+    for course_id, courses in enumerate(mapped_by_course_data_set):
+        after_literals = [course_metadata.assigned_bool_var for course_metadata in courses
+                          if course_metadata.classes > bound[course_id]]
+        equal_literals = [course_metadata.assigned_bool_var for course_metadata in courses
+                          if course_metadata.classes == bound[course_id]]
+        if after_literals:
+            after = model.NewBoolVar('after_%i' % course_id)
+            model.AddBoolOr(after_literals).OnlyEnforceIf(after)
+            for after_literal in after_literals:
+                model.AddImplication(after_literal, after)
+            greater_literals.append(define_and_literal(model, prefix_equal, after, 'greater_%i' % course_id))
+        if not equal_literals:
+            break
+        prefix_equal = define_and_literal(model, prefix_equal, equal_literals[0], 'prefix_equal_%i' % course_id)
+    model.AddBoolOr(greater_literals)
+    return classes_variables
+
+
+def define_and_literal(model: cp_model.CpModel, first_literal, second_literal, name: str):
+    """
+        A literal true exactly when both literals are, the second one itself
+        when the first is None.
+    """
+    if first_literal is None:
+        return second_literal
+    and_literal = model.NewBoolVar(name)
+    model.AddBoolAnd([first_literal, second_literal]).OnlyEnforceIf(and_literal)
+    model.AddBoolOr([first_literal.Not(), second_literal.Not(), and_literal])
+    return and_literal
+
+
+def timetable_page(data: dict, cursor: str = None, page_size: int = 20, expand_duplicates: bool = False,
+                   clash_encoding: str = NO_OVERLAP_ENCODING, enforce_gap: bool = False) -> TimetablePage:
+    """
+        The page of timetables of the request after the cursor, the first page
+        when it is None, with the cursor of the next page. Identical classes
+        are collapsed as in iter_timetables, page_size counting the timetables
+        before they are expanded.
+    :param data: (dict)                 - The request json data.
+    :param cursor:                      - The cursor of the page before.
+    :param page_size:                   - The number of timetables of every page.
+    :param expand_duplicates:           - Give every timetable that identical classes make up.
+    :param clash_encoding:              - NO_OVERLAP_ENCODING or CLIQUE_ENCODING.
+    :param enforce_gap:                 - Forbid gaps shorter than the gap of the request between classes.
+    :return: The timetables and the cursor of the next page, None on the last page.
+    :raise ValueError: When the cursor was not given for this request.
+    :raise InfeasibleRequest: When presolving finds a course without classes.
+    """
+    model_hash = request_hash(data, clash_encoding, enforce_gap)
+    bound = None if cursor is None else decode_cursor(cursor, model_hash)
+    reduced_data, equivalent_classes = reduce_request(data)
+    model, _, mapped_by_course_data_set = build_timetable_model(reduced_data, clash_encoding,
+                                                                enforce_gap=enforce_gap)
+    define_lexicographic_order(model, mapped_by_course_data_set, bound)
+
+    solver = cp_model.CpSolver()
+    # The order of the solutions is the order of the fixed search, which only one worker follows.
+    solver.parameters.search_branching = cp_model.FIXED_SEARCH
+    solver.parameters.num_workers = 1
+    course_count = len(mapped_by_course_data_set)
+    solutions = stream_solutions(model, mapped_by_course_data_set, solver, page_size + 1)
+    # One more timetable than the page tells whether there is a next page.
+    reduced_timetables = [[timetable[course_id] for course_id in range(course_count)]
+                          for timetable in itertools.islice(solutions, page_size + 1)]
+    solutions.close()
+    if reduced_timetables != sorted(reduced_timetables):
+        raise RuntimeError('The solver did not follow the lexicographic order of the timetables')
+
+    timetables = []
+    for reduced_timetable in reduced_timetables[:page_size]:
+        timetables.extend(original_timetables(dict(enumerate(reduced_timetable)), equivalent_classes,
+                                              expand_duplicates))
+    next_cursor = None
+    if len(reduced_timetables) > page_size:
+        next_cursor = encode_cursor(model_hash, reduced_timetables[page_size - 1])
+    return TimetablePage(timetables, next_cursor)
@@ -0,0 +1,81 @@
+"""
+    The periods of a request as a table of arrays.
+"""
+
+import numpy as np
+
+from autotimetabler.minute_interval import END, LOCATION, START, MinuteInterval, period_weeks
+
+
+class PeriodTable:
+    """
+        The periods of a request as a struct of arrays with one row per period,
+        the periods of a class being consecutive rows and the classes of a
+        course consecutive classes.
+
+        Every period has its course, classes, start and end in MinuteInterval
+        format, location, the index of its name in locations, and weeks, its
+        teaching weeks bitmask (ALL_WEEKS when it runs every week). Every class
+        has its class_course, class_classes, the rows of its periods from
+        class_offsets[i] to class_offsets[i + 1] and class_literals[i], the
+        index of the literal of the class in the model or -1 when it has none.
+    """
+
+    def __init__(self, periods: list):
+        """
+        :param periods:         - The periods of the request json data.
+        """
+        class_lengths = [len(classes) for courses in periods for classes in courses]
+        self.class_course = np.array([course_id for course_id, courses in enumerate(periods) for _ in courses],
+                                     dtype=np.int32)
+        self.class_classes = np.array([classes_id for courses in periods for classes_id in range(len(courses))],
+                                      dtype=np.int32)
+        self.class_offsets = np.concatenate(([0], np.cumsum(class_lengths, dtype=np.int64)))
+        self.class_literals = [-1] * len(class_lengths)
+
+        period_rows = [period for courses in periods for classes in courses for period in classes]
+        period_classes = np.repeat(np.arange(len(class_lengths)), class_lengths)
+        self.course = self.class_course[period_classes]
+        self.classes = self.class_classes[period_classes]
+        minute_table = MinuteInterval().to_minute_array(period_rows)
+        self.start = np.ascontiguousarray(minute_table[:, START])
+        self.end = np.ascontiguousarray(minute_table[:, END])
+        # Locations are interned, the same name always getting the same code.
+        self.locations = sorted({period[LOCATION] for period in period_rows})
+        location_codes = {location: code for code, location in enumerate(self.locations)}
+        self.location = np.array([location_codes[period[LOCATION]] for period in period_rows], dtype=np.int32)
+        self.weeks = np.array([period_weeks(period) for period in period_rows], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.start)
+
+    def class_count(self) -> int:
+        return len(self.class_course)
+
+    def minute_intervals(self, class_index: int) -> np.ndarray:
+        """
+            The (N, 2) [start', end'] array of the periods of a class.
+        """
+        rows = slice(self.class_offsets[class_index], self.class_offsets[class_index + 1])
+        return np.column_stack((self.start[rows], self.end[rows]))
+
+    def feasible_classes(self, days_allowed: list, start: float, end: float) -> np.ndarray:
+        """
+            Whether every class has periods, all of them on the days allowed and
+            between the start and end hours.
+        :param days_allowed:    - The days of the week, taking Monday as 1.
+        :param start:
+        :param end:
+        :return: A boolean per class.
+        """
+        min_interval_instance = MinuteInterval()
+        minutes_in_a_day = MinuteInterval.HOURS_IN_A_DAY * MinuteInterval.MINUTES_IN_AN_HOUR
+        day_starts = (self.start // minutes_in_a_day) * minutes_in_a_day
+        period_is_feasible = (np.isin(self.start // minutes_in_a_day + 1, days_allowed) &
+                              (self.start - day_starts >= min_interval_instance.to_minutes(start)) &
+                              (self.end - day_starts <= min_interval_instance.to_minutes(end)))
+        # The number of infeasible periods before every row, so that a class is feasible when its rows add none.
+        infeasible_periods_before = np.concatenate(([0], np.cumsum(~period_is_feasible)))
+        class_infeasible_periods = infeasible_periods_before[self.class_offsets[1:]] - \
+            infeasible_periods_before[self.class_offsets[:-1]]
+        return (class_infeasible_periods == 0) & (self.class_offsets[1:] > self.class_offsets[:-1])
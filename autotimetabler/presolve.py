@@ -0,0 +1,141 @@
+"""
+    Pruning of the classes of a request that can't be in any timetable, before
+    a model is built for it.
+"""
+
+import collections
+import heapq
+
+import numpy as np
+
+from autotimetabler.period_table import PeriodTable
+
+PresolvedRequest = collections.namedtuple('PresolvedRequest', 'data class_ids infeasible_courses')
+
+
+class InfeasibleRequest(ValueError):
+    """
+        A request presolve finds a course without classes in, with the
+        course_id -> explanation of every such course in infeasible_courses.
+    """
+
+    def __init__(self, infeasible_courses: dict):
+        super().__init__(infeasible_courses)
+        self.infeasible_courses = infeasible_courses
+
+    def __str__(self):
+        return '; '.join(self.infeasible_courses[course_id] for course_id in sorted(self.infeasible_courses))
+
+
+# Why a class was removed, when it wasn't because of the class of another course.
+_OUTSIDE_REQUEST = -1
+_CLASHES_WITH_ITSELF = -2
+
+
+def find_class_clashes(period_table: PeriodTable, feasible_classes: np.ndarray) -> tuple[dict, set]:
+    """
+        The clash graph of the feasible classes, built by sweeping the periods
+        in order of start: the periods still running when a period starts are
+        exactly the ones it overlaps, and the ones also sharing a teaching week
+        with it clash with it.
+    :param period_table:
+    :param feasible_classes:    - Whether every class is to be looked at.
+    :return: (class index -> the class indices of other courses it clashes with, the classes clashing with themselves)
+    """
+    period_classes = np.repeat(np.arange(period_table.class_count()), np.diff(period_table.class_offsets))
+    period_weeks = period_table.weeks.tolist()
+    clashes = collections.defaultdict(set)
+    self_clashes = set()
+    running_periods = []
+    for period_index in np.argsort(period_table.start, kind='stable').tolist():
+        class_index = int(period_classes[period_index])
+        if not feasible_classes[class_index]:
+            continue
+        start = int(period_table.start[period_index])
+        while running_periods and running_periods[0][0] <= start:
+            heapq.heappop(running_periods)
+        for _, running_class_index, running_period_index in running_periods:
+            if not period_weeks[running_period_index] & period_weeks[period_index]:
+                continue
+            if running_class_index == class_index:
+                self_clashes.add(class_index)
+            elif period_table.class_course[running_class_index] != period_table.class_course[class_index]:
+                clashes[class_index].add(running_class_index)
+                clashes[running_class_index].add(class_index)
+        heapq.heappush(running_periods, (int(period_table.end[period_index]), class_index, period_index))
+    return clashes, self_clashes
+
+
+def presolve(data: dict) -> PresolvedRequest:
+    """
+        Remove the classes that can't be in any timetable of the request: the
+        ones outside its days and hours, the ones whose periods clash with each
+        other, and, by unit propagation over the clash graph until nothing
+        changes, the ones clashing with the only class left for another
+        course. A course left without classes makes the request infeasible,
+        which is reported with the reasons its classes were removed instead
+        of being found by a solve.
+    :param data: (dict)         - The request json data.
+    :return: The reduced request with the classes left, class_ids[course_id][classes_id] the classes_id in the
+             request of every class left, and course_id -> the explanation of every infeasible course.
+    """
+    period_table = PeriodTable(data['periods'])
+    days_allowed = list(map(lambda day: int(day), list(data['days'])))
+    feasible_classes = period_table.feasible_classes(days_allowed, float(data['start']), float(data['end']))
+    clashes, self_clashes = find_class_clashes(period_table, feasible_classes)
+
+    remaining_classes = [set() for _ in data['periods']]
+    removed_because = {}
+    for class_index, course_id in enumerate(period_table.class_course.tolist()):
+        if not feasible_classes[class_index]:
+            removed_because[class_index] = _OUTSIDE_REQUEST
+        elif class_index in self_clashes:
+            removed_because[class_index] = _CLASHES_WITH_ITSELF
+        else:
+            remaining_classes[course_id].add(class_index)
+
+    forced_courses = collections.deque(course_id for course_id, classes in enumerate(remaining_classes)
+                                       if len(classes) == 1)
+    propagated_courses = set()
+    while forced_courses:
+        course_id = forced_courses.popleft()
+        if course_id in propagated_courses or len(remaining_classes[course_id]) != 1:
+            continue
+        propagated_courses.add(course_id)
+        forced_class = next(iter(remaining_classes[course_id]))
+        for class_index in clashes[forced_class]:
+            clashing_course_id = int(period_table.class_course[class_index])
+            if class_index in remaining_classes[clashing_course_id]:
+                remaining_classes[clashing_course_id].discard(class_index)
+                removed_because[class_index] = course_id
+                if len(remaining_classes[clashing_course_id]) == 1:
+                    forced_courses.append(clashing_course_id)
+
+    infeasible_courses = {}
+    for course_id, classes in enumerate(remaining_classes):
+        if not classes:
+            infeasible_courses[course_id] = explain_infeasible_course(period_table, course_id, removed_because)
+
+    class_ids = [sorted(int(period_table.class_classes[class_index]) for class_index in classes)
+                 for classes in remaining_classes]
+    reduced_data = dict(data)
+    reduced_data['periods'] = [[data['periods'][course_id][classes_id] for classes_id in course_class_ids]
+                               for course_id, course_class_ids in enumerate(class_ids)]
+    return PresolvedRequest(reduced_data, class_ids, infeasible_courses)
+
+
+def explain_infeasible_course(period_table: PeriodTable, course_id: int, removed_because: dict) -> str:
+    class_indices = np.flatnonzero(period_table.class_course == course_id).tolist()
+    if not class_indices:
+        return 'course %i has no classes' % course_id
+    reasons = collections.Counter(removed_because[class_index] for class_index in class_indices)
+    explanations = []
+    if reasons[_OUTSIDE_REQUEST]:
+        explanations.append('%i outside the days and hours of the request' % reasons.pop(_OUTSIDE_REQUEST))
+    if reasons[_CLASHES_WITH_ITSELF]:
+        explanations.append('%i with periods clashing with each other' % reasons.pop(_CLASHES_WITH_ITSELF))
+    for clashing_course_id, class_count in sorted(reasons.items()):
+        if class_count:
+            explanations.append('%i clashing with the only class left for course %i' % (class_count,
+                                                                                        clashing_course_id))
+    return 'course %i has no class left: %s' % (course_id, ', '.join(explanations))
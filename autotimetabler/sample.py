@@ -0,0 +1,271 @@
+"""
+    The sample request used to try the solver out.
+"""
+
+from autotimetabler.data import canonicalise_classes, count_equivalent_timetables
+from autotimetabler.metrics import SolveMetrics
+from autotimetabler.search import iter_timetables
+
+
+def search_optimal_timetable():
+    """
+        Creating a new model for CP SAT. Using this over
+        SCP.
+    """
+    data = {
+        "start": "9",
+        "end": "19",
+        "days": "12345",
+        "gap": "3",
+        "max_days": "5",
+        "minimum_distance": "True",
+        "periods":
+            [
+                [
+                    [[4, 11, 12, 'a']],
+                    [[4, 11, 12, 'b']],
+                    [[4, 10, 11, 'b']],
+                    [[4, 14, 15, 'c']],
+                    [[2, 9, 10, 'b']],
+                    [[2, 15, 16, 'a']],
+                    [[3, 12, 13, 'b']]
+                ],
+                [
+                    [
+                        [1, 17, 18, 'a'],
+                        [2, 17, 18, 'a']
+                    ],
+                    [
+                        [1, 17, 18, 'b'],
+                        [2, 17, 18, 'b']
+                    ],
+                    [
+                        [1, 17, 18, 'b'],
+                        [4, 17, 18, 'b']
+                    ],
+                    [
+                        [1, 18, 19, 'a'],
+                        [4, 18, 19, 'a']
+                    ],
+                    [
+                        [2, 9, 10, 'a'],
+                        [4, 9, 10, 'a']
+                    ],
+                    [
+                        [2, 9, 10, 'a'],
+                        [4, 9, 10, 'a']
+                    ],
+                    [
+                        [2, 9, 10, 'a'],
+                        [4, 9, 10, 'a']
+                    ],
+                    [
+                        [2, 12, 13, 'a'],
+                        [4, 12, 13, 'a']
+                    ],
+                    [
+                        [2, 12, 13, 'b'],
+                        [4, 12, 13, 'b']
+                    ],
+                    [
+                        [2, 12, 13, 'c'],
+                        [4, 12, 13, 'c']
+                    ],
+                    [
+                        [2, 15, 16, 'a'],
+                        [4, 15, 16, 'b']
+                    ],
+                    [
+                        [2, 15, 16, 'c'],
+                        [4, 15, 16, 'c']
+                    ],
+                    [
+                        [2, 15, 16, 'a'],
+                        [4, 15, 16, 'a']
+                    ],
+                    [
+                        [3, 11, 12, 'a'],
+                        [5, 11, 12, 'a']
+                    ],
+                    [
+                        [3, 11, 12, 'a'],
+                        [5, 11, 12, 'a']
+                    ],
+                    [
+                        [3, 11, 12, 'a'],
+                        [5, 11, 12, 'a']
+                    ],
+                    [
+                        [3, 14, 15, 'a'],
+                        [5, 14, 15, 'a']
+                    ],
+                    [
+                        [3, 14, 15, 'b'],
+                        [5, 14, 15, 'b']
+                    ],
+                    [
+                        [3, 14, 15, 'b'],
+                        [5, 14, 15, 'b']
+                    ],
+                    [[4, 10, 11, 'c']],
+                    [[4, 10, 11, 'c']],
+                    [[2, 9, 10, 'c']],
+                    [[2, 9, 10, 'b']],
+                    [[2, 9, 10, 'a']],
+                    [[2, 9, 10, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 16, 17, 'c']],
+
+                ],
+                [
+                    [[4, 10, 11, 'c']],
+                    [[4, 10, 11, 'c']],
+                    [[4, 10, 11, 'c']],
+                    [[4, 10, 11, 'c']],
+                    [[2, 9, 10, 'c']],
+                    [[2, 9, 10, 'b']],
+                    [[2, 9, 10, 'a']],
+                    [[2, 9, 10, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 16, 17, 'c']],
+                    [[4, 10, 11, 'c']],
+                    [[4, 10, 11, 'c']],
+                    [[2, 9, 10, 'c']],
+                    [[2, 9, 10, 'b']],
+                    [[2, 9, 10, 'a']],
+                    [[2, 9, 10, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 16, 17, 'c']],
+                    [[4, 10, 11, 'c']],
+                    [[4, 10, 11, 'c']],
+                    [[2, 9, 10, 'c']],
+                    [[2, 9, 10, 'b']],
+                    [[2, 9, 10, 'a']],
+                    [[2, 9, 10, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 16, 17, 'c']],
+                    [[4, 10, 11, 'c']],
+                    [[4, 10, 11, 'c']],
+                    [[2, 9, 10, 'c']],
+                    [[2, 9, 10, 'b']],
+                    [[2, 9, 10, 'a']],
+                    [[2, 9, 10, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 16, 17, 'c']],
+                    [[2, 9, 10, 'c']],
+                    [[2, 9, 10, 'b']],
+                    [[2, 9, 10, 'a']],
+                    [[2, 9, 10, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[2, 13, 14, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 11, 12, 'c']],
+                    [[3, 16, 17, 'c']],
+                    [[3, 16, 17, 'c']],
+                    [[3, 16, 17, 'c']],
+                    [[3, 16, 17, 'c']]
+                ]
+            ]
+    }
+
+    '''
+        Possible new constraints: 
+            * Implementing the gaps
+            * Implementing the min distance 
+            * implementing online periods 
+            * Implementing periods which the user prefers (?)
+    '''
+    #
+    # data = {
+    #     "start": "9",
+    #     "end": "19",
+    #     "days": "1234",
+    #     "gap": "1",
+    #     "max_days": "8",
+    #     "minimum_distance": "True",
+    #     "periods":
+    #         [
+    #             [
+    #                 [[3, 14, 15, 'a']],
+    #                 [[3, 19, 20, 'b']],
+    #             ],
+    #             [
+    #                 [
+    #                     [2, 12, 15, 'a'],
+    #                     [4, 15, 18, 'a']
+    #                 ],
+    #
+    #                 # [
+    #                 #     [4, 17, 18, 'b'],
+    #                 #     [5, 16, 18, 'b']
+    #                 # ],
+    #             ],
+    #             [
+    #                 [[4, 12, 15, 'c']],
+    #             ]
+    #         ]
+    # }
+
+    # The same class is very often listed several times for a course, so the model is
+    # built over the unique classes only and the duplicates are put back in afterwards.
+    data, equivalent_classes = canonicalise_classes(data)
+    metrics = SolveMetrics()
+    solution_count = 0
+    timetable_count = 0
+    for timetable in iter_timetables(data, metrics=metrics):
+        solution_count += 1
+        timetable_count += count_equivalent_timetables(timetable, equivalent_classes)
+        print('=====================================================')
+        print('Timetable: %i' % solution_count)
+        for course_id, classes_id in sorted(timetable.items()):
+            print('course %i: classes %s' % (course_id, equivalent_classes[course_id][classes_id]))
+        print('=====================================================')
+        print()
+    print(metrics.solver_stats['status'])
+    print('\nStatistics')
+    print('  - conflicts: %i' % metrics.solver_stats['conflicts'])
+    print('  - branches : %i' % metrics.solver_stats['branches'])
+    print('  - wall time: %f s' % metrics.solver_stats['wall_time'])
+    print('  - solutions: %i' % solution_count)
+    print('  - timetables: %i' % timetable_count)
+    for phase, seconds in metrics.phases.items():
+        print('  - %s: %f s' % (phase, seconds))
@@ -0,0 +1,407 @@
+"""
+    Enumeration of the timetables of a request.
+"""
+
+import itertools
+import math
+import queue
+import threading
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from autotimetabler.data import canonicalise_classes, expand_timetable, first_equivalent_classes, original_timetables
+from autotimetabler.index import find_independent_courses
+from autotimetabler.minute_interval import DAY, END_TIME, START_TIME, MinuteInterval
+from autotimetabler.metrics import SolveMetrics
+from autotimetabler.model import (NO_OVERLAP_ENCODING, build_timetable_model, define_day_time_constraints_for_variables,
+                                  define_day_used_variables)
+from autotimetabler.presolve import InfeasibleRequest, presolve
+
+
+class PossibleTimetableSchedules(cp_model.CpSolverSolutionCallback):
+    """Hand every solution over as a course_id -> classes_id timetable."""
+
+    def __init__(self, variables, on_timetable, course_count: int = None):
+        """
+        :param variables:       - The course_metadata of the model, the assigned ones give the timetable.
+        :param on_timetable:    - Called with every timetable found, the search is stopped as soon as it
+                                  returns False.
+        :param course_count:    - When given, the timetables are int32 arrays of the classes_id of every course
+                                  instead of dicts.
+        """
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self.__variables = variables
+        self.__on_timetable = on_timetable
+        self.__course_count = course_count
+        self.__solution_count = 0
+
+    def on_solution_callback(self):
+        self.__solution_count += 1
+        if self.__course_count is None:
+            timetable = {}
+        else:
+            timetable = np.full(self.__course_count, -1, dtype=np.int32)
+        for v in self.__variables:
+            if self.Value(v.assigned_bool_var):
+                timetable[v.course] = v.classes
+        if self.__on_timetable(timetable) is False:
+            self.StopSearch()
+
+    def solution_count(self):
+        return self.__solution_count
+
+
+_SEARCH_DONE = object()
+
+
+def reduce_request(data: dict, presolve_request: bool = True, metrics: SolveMetrics = None) -> tuple[dict, list]:
+    """
+        The request to build the model of, its classes presolved (see presolve)
+        and the identical ones collapsed (see canonicalise_classes).
+    :return: (reduced_data, equivalent_classes) with the equivalent classes in the classes_id of the request.
+    :raise InfeasibleRequest: When presolving finds a course without classes.
+    """
+    if metrics is None:
+        metrics = SolveMetrics()
+    if not presolve_request:
+        with metrics.phase('canonicalise_classes'):
+            return canonicalise_classes(data)
+    with metrics.phase('presolve'):
+        presolved_request = presolve(data)
+    if presolved_request.infeasible_courses:
+        raise InfeasibleRequest(presolved_request.infeasible_courses)
+    with metrics.phase('canonicalise_classes'):
+        reduced_data, equivalent_classes = canonicalise_classes(presolved_request.data)
+    # The equivalent classes are given in the classes_id of the request rather than of the presolved request.
+    equivalent_classes = [[[class_ids[classes_id] for classes_id in classes_ids]
+                           for classes_ids in course_equivalent_classes]
+                          for class_ids, course_equivalent_classes in zip(presolved_request.class_ids,
+                                                                          equivalent_classes)]
+    return reduced_data, equivalent_classes
+
+
+def reduced_class_ids(equivalent_classes: list) -> dict:
+    """
+        Map the (course_id, classes_id) of every class of the request left in
+        the equivalent classes to the classes_id of its reduced class.
+    """
+    reduced_classes = {}
+    for course_id, course_equivalent_classes in enumerate(equivalent_classes):
+        for reduced_classes_id, classes_ids in enumerate(course_equivalent_classes):
+            for classes_id in classes_ids:
+                reduced_classes[course_id, classes_id] = reduced_classes_id
+    return reduced_classes
+
+
+def iter_timetables(data: dict, max_queued_timetables: int = 64, expand_duplicates: bool = False,
+                    solver: cp_model.CpSolver = None, clash_encoding: str = NO_OVERLAP_ENCODING,
+                    enforce_gap: bool = False, compact: bool = False, presolve_request: bool = True,
+                    metrics: SolveMetrics = None):
+    """
+        Enumerate the timetables of the request as the solver finds them.
+        Each timetable is a dict of course_id -> classes_id in the request
+        data, or with compact an int32 array of the classes_id of every course.
+        The classes that can't be in any timetable are removed first (see
+        presolve), which raises InfeasibleRequest straight away when a course
+        has none left. Identical classes are collapsed before solving (see
+        canonicalise_classes), so a timetable is given once with the first of
+        its identical classes unless expand_duplicates is set.
+
+        The solver runs on a worker thread which blocks once
+        max_queued_timetables are waiting to be consumed, and the search is
+        stopped as soon as the generator is closed.
+    :param data: (dict)                 - The request json data.
+    :param max_queued_timetables:       - The number of timetables the solver can get ahead of the consumer.
+    :param expand_duplicates:           - Yield every timetable that identical classes make up.
+    :param solver:                      - The solver to run, for the caller to read its statistics afterwards.
+    :param clash_encoding:              - NO_OVERLAP_ENCODING or CLIQUE_ENCODING.
+    :param enforce_gap:                 - Forbid gaps shorter than the gap of the request between classes.
+    :param compact:                     - Yield the timetables as arrays.
+    :param presolve_request:            - Remove the classes that can't be in any timetable before solving.
+    :param metrics:                     - Gets the time spent in every phase, the size of the model, the statistics
+                                          of the solver and the time to every solution.
+    :return:
+    """
+    # Counting the constraints of the model takes a pass over it, which is only done when the metrics are wanted.
+    count_model = metrics is not None
+    if metrics is None:
+        metrics = SolveMetrics()
+    reduced_data, equivalent_classes = reduce_request(data, presolve_request, metrics)
+    model, global_solution_space, mapped_by_course_data_set = build_timetable_model(reduced_data, clash_encoding,
+                                                                                    enforce_gap=enforce_gap,
+                                                                                    metrics=metrics)
+    if count_model:
+        metrics.record_model(model)
+    if solver is None:
+        solver = cp_model.CpSolver()
+    if not compact:
+        for timetable in stream_solutions(model, mapped_by_course_data_set, solver, max_queued_timetables,
+                                          metrics=metrics):
+            yield from original_timetables(timetable, equivalent_classes, expand_duplicates)
+        return
+    first_classes = first_equivalent_classes(equivalent_classes)
+    course_ids = np.arange(len(equivalent_classes))
+    for timetable in stream_solutions(model, mapped_by_course_data_set, solver, max_queued_timetables, compact=True,
+                                      metrics=metrics):
+        if expand_duplicates:
+            for expanded_timetable in expand_timetable(dict(enumerate(timetable.tolist())), equivalent_classes):
+                yield np.array(list(expanded_timetable.values()), dtype=np.int32)
+        else:
+            yield first_classes[course_ids, timetable]
+
+
+def collect_timetables(data: dict, limit: int = None, **kwargs) -> np.ndarray:
+    """
+        Enumerate the timetables of the request into a single array with one
+        row per timetable and the classes_id of every course as columns, using
+        two bytes per course whenever the class ids fit.
+    :param data: (dict)                 - The request json data.
+    :param limit:                       - The most timetables to enumerate, all of them when None.
+    :param kwargs:                      - The options of iter_timetables.
+    :return:
+    """
+    course_count = len(data['periods'])
+    class_count = max((len(courses) for courses in data['periods']), default=0)
+    dtype = np.uint16 if class_count <= np.iinfo(np.uint16).max else np.int32
+    collected = np.empty((64, course_count), dtype=dtype)
+    timetable_count = 0
+    timetables = iter_timetables(data, compact=True, **kwargs)
+    for timetable in itertools.islice(timetables, limit):
+        if timetable_count == len(collected):
+            collected = np.concatenate((collected, np.empty_like(collected)))
+        collected[timetable_count] = timetable
+        timetable_count += 1
+    timetables.close()
+    return collected[:timetable_count].copy()
+
+
+class SolutionStream:
+    """
+        Hands the solutions of a search running on a worker thread over to a
+        consumer, at most max_queued_timetables of them ahead of it: the
+        consumer gives a slot back with taken() for every timetable it takes.
+        stop() ends the search, between solutions too.
+    """
+
+    def __init__(self, solver: cp_model.CpSolver, max_queued_timetables: int, hand_over,
+                 metrics: SolveMetrics = None):
+        """
+        :param solver:
+        :param max_queued_timetables:   - The number of timetables the search can get ahead of the consumer.
+        :param hand_over:               - Called on the worker thread with every timetable.
+        :param metrics:                 - Gets the solve phase, the time to every solution and the statistics of
+                                          the solver.
+        """
+        if metrics is None:
+            metrics = SolveMetrics()
+        self.solver = solver
+        self.metrics = metrics
+        self.stopped = threading.Event()
+        self.__hand_over = hand_over
+        self.__queue_slots = threading.Semaphore(max_queued_timetables)
+
+    def put_timetable(self, timetable) -> bool:
+        self.metrics.record_solution()
+        # Only block for short periods so that the search notices when the consumer has gone away.
+        while not self.stopped.is_set():
+            if self.__queue_slots.acquire(timeout=0.1):
+                self.__hand_over(timetable)
+                return True
+        return False
+
+    def taken(self):
+        self.__queue_slots.release()
+
+    def solve(self, model: cp_model.CpModel, mapped_by_course_data_set: list, compact: bool = False):
+        """
+            Enumerate the solutions of the model, on the worker thread.
+        """
+        if self.stopped.is_set():
+            return
+        class_variables = [course_metadata for courses in mapped_by_course_data_set for course_metadata in courses]
+        self.solver.parameters.enumerate_all_solutions = True
+        self.metrics.start_solve()
+        with self.metrics.phase('solve'):
+            self.solver.Solve(model, PossibleTimetableSchedules(class_variables, self.put_timetable,
+                                                                len(mapped_by_course_data_set) if compact else None))
+        self.metrics.record_solver(self.solver)
+
+    def stop(self):
+        """
+            Stop the search. StopSearch does nothing before Solve has
+            started, so this is called until the worker is done.
+        """
+        self.stopped.set()
+        self.solver.StopSearch()
+
+
+def stream_solutions(model: cp_model.CpModel, mapped_by_course_data_set: list, solver: cp_model.CpSolver,
+                     max_queued_timetables: int, compact: bool = False, metrics: SolveMetrics = None):
+    """
+        Enumerate the solutions of the model as course_id -> classes_id
+        timetables, or arrays of the classes_id of every course with compact,
+        with the solver running on a worker thread which blocks once
+        max_queued_timetables are waiting to be consumed. The search is stopped
+        as soon as the generator is closed. The metrics get the solve phase,
+        the time to every solution and the statistics of the solver.
+    """
+    timetables = queue.Queue()
+    stream = SolutionStream(solver, max_queued_timetables, timetables.put, metrics)
+    search_errors = []
+
+    def search():
+        try:
+            stream.solve(model, mapped_by_course_data_set, compact)
+        except Exception as error:
+            search_errors.append(error)
+        timetables.put(_SEARCH_DONE)
+
+    worker = threading.Thread(target=search, daemon=True)
+    worker.start()
+    try:
+        while True:
+            timetable = timetables.get()
+            if timetable is _SEARCH_DONE:
+                break
+            stream.taken()
+            yield timetable
+    finally:
+        while worker.is_alive():
+            stream.stop()
+            worker.join(timeout=0.1)
+    if search_errors:
+        raise search_errors[0]
+
+
+def enumerate_independent_timetables(data: dict, expand_duplicates: bool = False) -> tuple[int, object]:
+    """
+        Enumerate every component of find_independent_courses on its own and
+        combine their timetables, which is a handful of small searches instead
+        of one search over the product of all of them.
+
+        max_days ties all the courses together even when they never clash, so
+        the courses are only split while it can't bind, i.e. when it allows
+        every day of the request.
+    :param data: (dict)         - The request json data.
+    :param expand_duplicates:   - Yield every timetable that identical classes make up.
+    :return: (the exact number of timetables, a generator of the timetables)
+    :raise InfeasibleRequest: When presolving finds a course without classes.
+    """
+    # Presolving the components instead would explain the courses in the course_id of their component.
+    presolved_request = presolve(data)
+    if presolved_request.infeasible_courses:
+        raise InfeasibleRequest(presolved_request.infeasible_courses)
+    course_count = len(data['periods'])
+    if int(data['max_days']) < len(set(data['days'])):
+        components = [list(range(course_count))]
+    else:
+        global_solution_space, _ = define_day_time_constraints_for_variables(data, cp_model.CpModel())
+        components = find_independent_courses(global_solution_space, course_count)
+
+    component_timetables = []
+    for component in components:
+        component_data = dict(data)
+        component_data['periods'] = [data['periods'][course_id] for course_id in component]
+        component_timetables.append([
+            {component[course_id]: classes_id for course_id, classes_id in timetable.items()}
+            for timetable in iter_timetables(component_data, expand_duplicates=expand_duplicates)
+        ])
+
+    def combine_timetables():
+        for timetables in itertools.product(*component_timetables):
+            timetable = {}
+            for component_timetable in timetables:
+                timetable.update(component_timetable)
+            yield {course_id: timetable[course_id] for course_id in sorted(timetable)}
+
+    return math.prod(len(timetables) for timetables in component_timetables), combine_timetables()
+
+
+class TermModel:
+    """
+        The variables and the structural constraints of a set of courses, built
+        once and then solved for the preferences of any number of requests.
+
+        Instead of filtering the classes by the start, end and days of a
+        request in Python, every class implies one literal for each of its days,
+        one for the start time of its first period and one for the end time
+        of its last period, and sum(day_used) <= max_days is enforced by one
+        literal for every max_days short of all the days. A request then only
+        fixes these literals with assumptions on a copy of the model.
+    """
+
+    def __init__(self, periods: list, clash_encoding: str = NO_OVERLAP_ENCODING):
+        """
+        :param periods:             - The periods of the request json data.
+        :param clash_encoding:      - NO_OVERLAP_ENCODING or CLIQUE_ENCODING.
+        """
+        reduced_data, self.equivalent_classes = canonicalise_classes({'periods': periods})
+        # Build every class, the preferences are left to the assumptions.
+        reduced_data['start'] = 0
+        reduced_data['end'] = MinuteInterval.HOURS_IN_A_DAY
+        reduced_data['days'] = sorted({period[DAY] for courses in periods for classes in courses
+                                       for period in classes})
+        reduced_data['max_days'] = len(reduced_data['days'])
+        self.model, self.global_solution_space, self.mapped_by_course_data_set = build_timetable_model(
+            reduced_data, clash_encoding)
+
+        self.day_allowed = {day: self.model.NewBoolVar('day_%i_allowed' % day) for day in reduced_data['days']}
+        self.day_used = define_day_used_variables(self.model, self.global_solution_space,
+                                                  self.mapped_by_course_data_set)
+        self.max_days_allowed = {}
+        for max_days in range(len(self.day_used)):
+            self.max_days_allowed[max_days] = self.model.NewBoolVar('max_days_%i_allowed' % max_days)
+            self.model.Add(sum(self.day_used.values()) <= max_days).OnlyEnforceIf(self.max_days_allowed[max_days])
+        self.start_allowed = {}
+        self.end_allowed = {}
+        for courses in self.mapped_by_course_data_set:
+            for course_metadata in courses:
+                classes = reduced_data['periods'][course_metadata.course][course_metadata.classes]
+                for day in {period[DAY] for period in classes}:
+                    self.model.AddImplication(course_metadata.assigned_bool_var, self.day_allowed[day])
+                start = min(period[START_TIME] for period in classes)
+                if start not in self.start_allowed:
+                    self.start_allowed[start] = self.model.NewBoolVar('start_%s_allowed' % start)
+                self.model.AddImplication(course_metadata.assigned_bool_var, self.start_allowed[start])
+                end = max(period[END_TIME] for period in classes)
+                if end not in self.end_allowed:
+                    self.end_allowed[end] = self.model.NewBoolVar('end_%s_allowed' % end)
+                self.model.AddImplication(course_metadata.assigned_bool_var, self.end_allowed[end])
+
+    def preference_assumptions(self, data: dict) -> list:
+        """
+            The literals fixing the start, end, days and max_days preferences of a request.
+            All of them are fixed, leaving one free would make the enumeration
+            give every timetable once for each of its values.
+        """
+        days_allowed = set(map(lambda day: int(day), list(data['days'])))
+        assumptions = []
+        for day, day_allowed in self.day_allowed.items():
+            assumptions.append(day_allowed if day in days_allowed else day_allowed.Not())
+        for start, start_allowed in self.start_allowed.items():
+            assumptions.append(start_allowed if start >= int(data['start']) else start_allowed.Not())
+        for end, end_allowed in self.end_allowed.items():
+            assumptions.append(end_allowed if end <= int(data['end']) else end_allowed.Not())
+        for max_days, max_days_allowed in self.max_days_allowed.items():
+            assumptions.append(max_days_allowed if max_days >= int(data['max_days']) else max_days_allowed.Not())
+        return assumptions
+
+    def iter_timetables(self, data: dict, max_queued_timetables: int = 64, expand_duplicates: bool = False,
+                        solver: cp_model.CpSolver = None):
+        """
+            The same as iter_timetables for a request over the courses of the
+            term model, without building a model for it.
+        :param data: (dict)                 - The request json data, its periods are ignored.
+        :param max_queued_timetables:       - The number of timetables the solver can get ahead of the consumer.
+        :param expand_duplicates:           - Yield every timetable that identical classes make up.
+        :param solver:                      - The solver to run, for the caller to read its statistics afterwards.
+        :return:
+        """
+        # The model is shared between requests, the assumptions go on a copy of it.
+        model = self.model.Clone()
+        model.AddAssumptions(self.preference_assumptions(data))
+        if solver is None:
+            solver = cp_model.CpSolver()
+        for timetable in stream_solutions(model, self.mapped_by_course_data_set, solver, max_queued_timetables):
+            yield from original_timetables(timetable, self.equivalent_classes, expand_duplicates)
@@ -0,0 +1,125 @@
+"""
+    An asyncio front-end to the solver for the event loop of a web service.
+
+    The model is built and solved on a thread of an executor, a limited
+    number of them at a time, and the timetables are handed over to the event
+    loop as the solver finds them. Cancelling the task awaiting them, or
+    closing the async iterator, stops the search.
+"""
+
+import asyncio
+import concurrent.futures
+import weakref
+
+from ortools.sat.python import cp_model
+
+from autotimetabler.data import original_timetables
+from autotimetabler.model import NO_OVERLAP_ENCODING, build_timetable_model
+from autotimetabler.search import SolutionStream, reduce_request
+
+_SEARCH_DONE = object()
+
+
+class TimetableService:
+    """
+        Solves requests for the event loop, at most max_in_flight of them at a
+        time, the others waiting for their turn.
+    """
+
+    def __init__(self, max_in_flight: int = 4, max_queued_timetables: int = 64):
+        """
+        :param max_in_flight:           - The number of requests being solved at once.
+        :param max_queued_timetables:   - The number of timetables a solver can get ahead of its consumer.
+        """
+        self.max_in_flight = max_in_flight
+        self.max_queued_timetables = max_queued_timetables
+        # An asyncio semaphore belongs to one event loop.
+        self.__in_flight = weakref.WeakKeyDictionary()
+        self.__executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_in_flight,
+                                                                thread_name_prefix='autotimetabler')
+
+    async def stream(self, data: dict, timeout: float = None, expand_duplicates: bool = False,
+                     clash_encoding: str = NO_OVERLAP_ENCODING):
+        """
+            Enumerate the course_id -> classes_id timetables of the request as
+            the solver finds them, the request reduced first as by
+            iter_timetables (see reduce_request).
+        :param data: (dict)             - The request json data.
+        :param timeout:                 - The seconds the search runs for, until it is done when None.
+        :param expand_duplicates:       - Yield every timetable that identical classes make up.
+        :param clash_encoding:          - NO_OVERLAP_ENCODING or CLIQUE_ENCODING.
+        :return:
+        :raise InfeasibleRequest: When presolving finds a course without classes.
+        """
+        loop = asyncio.get_running_loop()
+        if loop not in self.__in_flight:
+            self.__in_flight[loop] = asyncio.Semaphore(self.max_in_flight)
+        async with self.__in_flight[loop]:
+            timetables = asyncio.Queue()
+            stream = SolutionStream(cp_model.CpSolver(), self.max_queued_timetables,
+                                    lambda timetable: loop.call_soon_threadsafe(timetables.put_nowait, timetable))
+            if timeout is not None:
+                stream.solver.parameters.max_time_in_seconds = timeout
+            equivalent_classes = []
+
+            def search():
+                try:
+                    reduced_data, reduced_classes = reduce_request(data)
+                    equivalent_classes.extend(reduced_classes)
+                    model, _, mapped_by_course_data_set = build_timetable_model(reduced_data, clash_encoding)
+                    stream.solve(model, mapped_by_course_data_set)
+                finally:
+                    loop.call_soon_threadsafe(timetables.put_nowait, _SEARCH_DONE)
+
+            search_future = loop.run_in_executor(self.__executor, search)
+            try:
+                while True:
+                    timetable = await timetables.get()
+                    if timetable is _SEARCH_DONE:
+                        break
+                    stream.taken()
+                    for original_timetable in original_timetables(timetable, equivalent_classes, expand_duplicates):
+                        yield original_timetable
+            finally:
+                # The slot is only given back once the solver thread is done with it, raising whatever went wrong.
+                while not search_future.done():
+                    stream.stop()
+                    await asyncio.wait({search_future}, timeout=0.1)
+                await search_future
+
+    async def solve(self, data: dict, timeout: float = None, limit: int = None, **kwargs) -> list:
+        """
+            The timetables of the request found within the timeout, at most
+            limit of them.
+        :param data: (dict)             - The request json data.
+        :param timeout:                 - The seconds the search runs for, until it is done when None.
+        :param limit:                   - The most timetables to enumerate, all of them when None.
+        :param kwargs:                  - The options of stream.
+        :return:
+        """
+        found_timetables = []
+        timetables = self.stream(data, timeout, **kwargs)
+        try:
+            async for timetable in timetables:
+                found_timetables.append(timetable)
+                if limit is not None and len(found_timetables) >= limit:
+                    break
+        finally:
+            await timetables.aclose()
+        return found_timetables
+
+    def close(self):
+        self.__executor.shutdown(wait=True)
+
+
+_default_service = None
+
+
+async def solve(data: dict, timeout: float = None, limit: int = None, **kwargs) -> list:
+    """
+        TimetableService.solve on a service shared by the whole process.
+    """
+    global _default_service
+    if _default_service is None:
+        _default_service = TimetableService()
+    return await _default_service.solve(data, timeout, limit, **kwargs)
@@ -0,0 +1,163 @@
+"""
+    Re-solving the best timetable of a request as its preferences are changed
+    one at a time.
+"""
+
+import json
+
+from ortools.sat.python import cp_model
+
+from autotimetabler.minute_interval import DAY, END_TIME, START_TIME
+from autotimetabler.model import NO_OVERLAP_ENCODING
+from autotimetabler.optimise import (DEFAULT_OBJECTIVE_WEIGHTS, define_timetable_objective, infeasible_timetable,
+                                     solve_for_best_timetable)
+from autotimetabler.presolve import presolve
+from autotimetabler.search import TermModel, reduced_class_ids
+
+# The fields of a request the model is built for, the others only change the assumptions of a solve.
+MODEL_FIELDS = ('periods', 'gap', 'early', 'late', 'preferred')
+
+# How the last timetable of a session was found.
+BUILT = 'built'
+HINTED = 'hinted'
+KEPT = 'kept'
+
+
+class TimetableSession:
+    """
+        The best timetable of a request (see optimise_timetable) kept up to
+        date as the request is changed.
+
+        The model is a TermModel over the courses of the request with the
+        objective of define_timetable_objective, so a change of the start, end,
+        days or max_days is only a change of the assumptions of the next
+        solve, which starts from the last timetable as a hint and assumes the
+        classes presolve removes aren't chosen. When the change only takes
+        timetables away and the last timetable was optimal and is
+        still allowed, it is kept without solving at all. A change of the
+        courses or of the objective builds a new model, still hinted with the
+        classes of the courses that were kept.
+    """
+
+    def __init__(self, data: dict, weights: dict = None, clash_encoding: str = NO_OVERLAP_ENCODING,
+                 num_workers: int = 8, max_time_in_seconds: float = 10.0):
+        """
+        :param data: (dict)                 - The request json data.
+        :param weights:                     - The weights of the objective, see DEFAULT_OBJECTIVE_WEIGHTS.
+        :param clash_encoding:              - NO_OVERLAP_ENCODING or CLIQUE_ENCODING.
+        :param num_workers:
+        :param max_time_in_seconds:         - The time limit of every solve.
+        """
+        self.weights = dict(DEFAULT_OBJECTIVE_WEIGHTS)
+        self.weights.update(weights or {})
+        self.clash_encoding = clash_encoding
+        self.num_workers = num_workers
+        self.max_time_in_seconds = max_time_in_seconds
+        self.data = dict(data)
+        self.solve_count = 0
+        self.__build_model()
+        self.result = self.__solve({})
+        self.last_action = BUILT
+
+    def __build_model(self):
+        self.term_model = TermModel(self.data['periods'], self.clash_encoding)
+        self.reduced_classes = reduced_class_ids(self.term_model.equivalent_classes)
+        preferred_classes = [(course_id, self.reduced_classes[course_id, classes_id])
+                             for course_id, classes_id in self.data.get('preferred', [])]
+        # The days on campus are the ones of the term model, whose max_days is left to the assumptions.
+        define_timetable_objective(self.term_model.model, self.term_model.global_solution_space,
+                                   self.term_model.mapped_by_course_data_set, self.data, self.weights,
+                                   preferred_classes, day_used=self.term_model.day_used)
+
+    def __solve(self, hint: dict):
+        """
+            Solve a copy of the model under the preferences of the request,
+            starting from the course_id -> classes_id hint.
+        """
+        presolved_request = presolve(self.data)
+        if presolved_request.infeasible_courses:
+            return infeasible_timetable(presolved_request.infeasible_courses)
+        model = self.term_model.model.Clone()
+        model.AddAssumptions(self.term_model.preference_assumptions(self.data))
+        # Identical classes are presolved alike, so the first of them tells whether a reduced class is left.
+        model.AddAssumptions([course_metadata.assigned_bool_var.Not()
+                              for courses, course_equivalent_classes, class_ids in zip(
+                                  self.term_model.mapped_by_course_data_set, self.term_model.equivalent_classes,
+                                  presolved_request.class_ids)
+                              for course_metadata in courses
+                              if course_equivalent_classes[course_metadata.classes][0] not in class_ids])
+        for course_id, classes_id in hint.items():
+            reduced_classes_id = self.reduced_classes[course_id, classes_id]
+            for course_metadata in self.term_model.mapped_by_course_data_set[course_id]:
+                model.AddHint(course_metadata.assigned_bool_var, course_metadata.classes == reduced_classes_id)
+        solver = cp_model.CpSolver()
+        solver.parameters.num_workers = self.num_workers
+        solver.parameters.max_time_in_seconds = self.max_time_in_seconds
+        self.solve_count += 1
+        result, _ = solve_for_best_timetable(model, self.term_model.mapped_by_course_data_set,
+                                             self.term_model.equivalent_classes, solver)
+        return result
+
+    def is_allowed(self, timetable: dict) -> bool:
+        """
+            Whether the classes of a course_id -> classes_id timetable are all on
+            the days and between the hours of the request, on at most max_days
+            days.
+        """
+        days_allowed = set(map(lambda day: int(day), list(self.data['days'])))
+        days = set()
+        for course_id, classes_id in timetable.items():
+            for period in self.data['periods'][course_id][classes_id]:
+                if period[DAY] not in days_allowed or period[START_TIME] < int(self.data['start']) or \
+                        period[END_TIME] > int(self.data['end']):
+                    return False
+                days.add(period[DAY])
+        return len(days) <= int(self.data['max_days'])
+
+    def update(self, **changes):
+        """
+            Change fields of the request, e.g. update(start=10) or
+            update(days='1234'), and find its best timetable again.
+        :return: The OptimisedTimetable of the changed request.
+        """
+        previous_data = self.data
+        previous_result = self.result
+        self.data = dict(previous_data, **changes)
+        if any(json.dumps(self.data.get(field)) != json.dumps(previous_data.get(field)) for field in MODEL_FIELDS):
+            self.__build_model()
+            self.result = self.__solve(_kept_course_classes(previous_data, previous_result, self.data))
+            self.last_action = BUILT
+        elif previous_result.status == 'OPTIMAL' and _only_takes_away(previous_data, self.data) and \
+                self.is_allowed(previous_result.timetable):
+            self.last_action = KEPT
+        else:
+            self.result = self.__solve(previous_result.timetable or {})
+            self.last_action = HINTED
+        return self.result
+
+
+def _only_takes_away(previous_data: dict, data: dict) -> bool:
+    """
+        Whether the timetables allowed by the request are a subset of the ones
+        allowed before.
+    """
+    return set(map(lambda day: int(day), list(data['days']))) <= \
+        set(map(lambda day: int(day), list(previous_data['days']))) and \
+        int(data['start']) >= int(previous_data['start']) and int(data['end']) <= int(previous_data['end']) and \
+        int(data['max_days']) <= int(previous_data['max_days'])
+
+
+def _kept_course_classes(previous_data: dict, previous_result, data: dict) -> dict:
+    """
+        The classes of the previous timetable for the courses of the request
+        that were already there with the same classes, by their new course_id.
+    """
+    if previous_result.timetable is None:
+        return {}
+    previous_course_ids = {json.dumps(classes): course_id for course_id, classes in enumerate(previous_data['periods'])}
+    hint = {}
+    for course_id, classes in enumerate(data['periods']):
+        previous_course_id = previous_course_ids.get(json.dumps(classes))
+        if previous_course_id is not None and previous_course_id in previous_result.timetable:
+            hint[course_id] = previous_result.timetable[previous_course_id]
+    return hint
@@ -0,0 +1,282 @@
+"""
+    Timetabling a group of students who want to be in the same classes.
+
+    Every course taken by more than one student of the group has one class of
+    the group, and a student is together with the group in a course when they
+    are in its class. The timetables maximise the number of times students are
+    together, either on one joint model of the whole group or, for larger
+    groups, by solving every student alone for the classes of the group and
+    moving the classes of the group to where most of its students are.
+"""
+
+import collections
+import json
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from autotimetabler.batch import request_periods
+from autotimetabler.data import canonicalise_classes
+from autotimetabler.model import NO_OVERLAP_ENCODING, define_social_timetabling, define_timetable_constraints
+from autotimetabler.optimise import optimise_timetable
+from autotimetabler.period_table import PeriodTable
+from autotimetabler.presolve import find_class_clashes
+
+GroupTimetables = collections.namedtuple('GroupTimetables', 'timetables status together shared_classes')
+
+# Groups larger than this are decomposed unless told otherwise, the joint model being slower past it.
+MAX_JOINT_GROUP_SIZE = 20
+# Solving a student alone only counts the classes of the group they are in.
+TOGETHER_WEIGHTS = {
+    'days': 0,
+    'gaps': 0,
+    'early': 0,
+    'late': 0,
+    'preferred': 1,
+    'walking': 0,
+}
+
+
+def course_keys(data: dict) -> list:
+    """
+        The key of every course of a request, its course code when it names
+        its courses from the term, else its classes, so that the students
+        taking the same course have the same key.
+    """
+    if 'courses' in data:
+        return list(data['courses'])
+    return [json.dumps(classes, separators=(',', ':')) for classes in data['periods']]
+
+
+def social_timetables(requests: list, term: dict = None, hard_together: bool = False, decompose: bool = None,
+                      max_rounds: int = 10, clash_encoding: str = NO_OVERLAP_ENCODING, num_workers: int = 8,
+                      max_time_in_seconds: float = 10.0) -> GroupTimetables:
+    """
+        The timetables of a group of students with the most times students
+        are in the class of the group of a course.
+    :param requests:                    - The request json data of every student, with its own periods or naming
+                                          its courses from the term as in solve_batch.
+    :param term:                        - The periods of every course code, a dict or a TermFile.
+    :param hard_together:               - Put all the students taking a course in the same class, which is only
+                                          done on the joint model.
+    :param decompose:                   - Solve every student alone instead of one joint model, by default when
+                                          the group is larger than MAX_JOINT_GROUP_SIZE.
+    :param max_rounds:                  - The most times the classes of the group are moved when decomposing.
+    :param clash_encoding:              - NO_OVERLAP_ENCODING or CLIQUE_ENCODING.
+    :param num_workers:
+    :param max_time_in_seconds:         - The time limit of the joint solve, or of every solve of a student.
+    :return: The course_id -> classes_id timetable of every student (all None when there is none), the status, the
+             number of times students are together and the classes_id of the class of the group of every course
+             key taken by more than one student.
+    """
+    if decompose is None:
+        decompose = len(requests) > MAX_JOINT_GROUP_SIZE
+    if decompose and hard_together:
+        raise ValueError('Putting all the students taking a course in the same class needs the joint model')
+    student_data = [dict(data, periods=request_periods(data, term)) for data in requests]
+    student_course_keys = [course_keys(data) for data in requests]
+    if decompose:
+        return _decomposed_timetables(student_data, student_course_keys, max_rounds, clash_encoding, num_workers,
+                                      max_time_in_seconds)
+    return _joint_timetables(student_data, student_course_keys, hard_together, clash_encoding, num_workers,
+                             max_time_in_seconds)
+
+
+def _joint_timetables(student_data: list, student_course_keys: list, hard_together: bool, clash_encoding: str,
+                      num_workers: int, max_time_in_seconds: float) -> GroupTimetables:
+    """
+        Solve the requests of all the students on one model, sharing the
+        literals of the classes of the group.
+    """
+    model = cp_model.CpModel()
+    student_equivalent_classes = []
+    student_mapped_by_course_data_sets = []
+    for data in student_data:
+        # Canonicalising is the same for every student taking a course, so its reduced classes_id are shared.
+        reduced_data, equivalent_classes = canonicalise_classes(data)
+        _, mapped_by_course_data_set, _ = define_timetable_constraints(model, reduced_data, clash_encoding)
+        student_equivalent_classes.append(equivalent_classes)
+        student_mapped_by_course_data_sets.append(mapped_by_course_data_set)
+    shared_literals, together_literals = define_social_timetabling(model, student_mapped_by_course_data_sets,
+                                                                   student_course_keys, hard_together)
+    model.Maximize(sum(together_literals))
+
+    solver = cp_model.CpSolver()
+    solver.parameters.num_workers = num_workers
+    solver.parameters.max_time_in_seconds = max_time_in_seconds
+    status = solver.Solve(model)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return GroupTimetables([None] * len(student_data), solver.StatusName(status), 0, {})
+
+    reduced_timetables = []
+    for mapped_by_course_data_set in student_mapped_by_course_data_sets:
+        reduced_timetables.append({course_metadata.course: course_metadata.classes
+                                   for courses in mapped_by_course_data_set for course_metadata in courses
+                                   if solver.Value(course_metadata.assigned_bool_var)})
+    shared_classes = {course_key: next(classes_id for classes_id, shared_literal in classes_literals.items()
+                                       if solver.Value(shared_literal))
+                      for course_key, classes_literals in shared_literals.items()}
+    return _group_timetables(reduced_timetables, student_equivalent_classes, student_course_keys, shared_classes,
+                             solver.StatusName(status))
+
+
+def _decomposed_timetables(student_data: list, student_course_keys: list, max_rounds: int, clash_encoding: str,
+                           num_workers: int, max_time_in_seconds: float) -> GroupTimetables:
+    """
+        Choose the classes of the group first, on a model of the shared
+        courses alone with the most students allowed in them and the fewest
+        students in two of them clashing, then solve every student alone for
+        the most classes of the group. Repair by moving the class of the group
+        of every course to the class most of its students are in and solving
+        again the students taking the courses that moved, until none moves.
+        Neither step takes students out of the class of the group, so the
+        number of times they are together never decreases.
+    """
+    student_equivalent_classes = [canonicalise_classes(data)[1] for data in student_data]
+    course_students = collections.defaultdict(list)
+    course_periods = {}
+    allowed_counts = collections.defaultdict(collections.Counter)
+    for student_id, data in enumerate(student_data):
+        for course_id, course_key in enumerate(student_course_keys[student_id]):
+            course_students[course_key].append((student_id, course_id))
+        reduced_periods = [[classes[classes_ids[0]] for classes_ids in course_equivalent_classes]
+                           for classes, course_equivalent_classes in zip(data['periods'],
+                                                                         student_equivalent_classes[student_id])]
+        course_periods.update(zip(student_course_keys[student_id], reduced_periods))
+        period_table = PeriodTable(reduced_periods)
+        feasible_classes = period_table.feasible_classes(list(map(lambda day: int(day), list(data['days']))),
+                                                         float(data['start']), float(data['end']))
+        for class_index in feasible_classes.nonzero()[0]:
+            course_key = student_course_keys[student_id][period_table.class_course[class_index]]
+            allowed_counts[course_key][int(period_table.class_classes[class_index])] += 1
+    shared_course_keys = [course_key for course_key, students in course_students.items() if len(students) > 1]
+    shared_classes = _choose_shared_classes(shared_course_keys, course_periods, allowed_counts, student_course_keys,
+                                            num_workers, max_time_in_seconds)
+
+    def solve_student(student_id: int) -> dict:
+        equivalent_classes = student_equivalent_classes[student_id]
+        preferred = [[course_id, equivalent_classes[course_id][shared_classes[course_key]][0]]
+                     for course_id, course_key in enumerate(student_course_keys[student_id])
+                     if course_key in shared_classes]
+        data = dict(student_data[student_id], preferred=preferred)
+        hint = None
+        if reduced_timetables[student_id] is not None:
+            hint = {course_id: equivalent_classes[course_id][classes_id][0]
+                    for course_id, classes_id in reduced_timetables[student_id].items()}
+        result = optimise_timetable(data, TOGETHER_WEIGHTS, num_workers, max_time_in_seconds, hint,
+                                    clash_encoding)
+        if result.timetable is None:
+            return None
+        return {course_id: _reduced_classes_id(equivalent_classes[course_id], classes_id)
+                for course_id, classes_id in result.timetable.items()}
+
+    reduced_timetables = [None] * len(student_data)
+    students_to_solve = range(len(student_data))
+    for _ in range(max_rounds):
+        for student_id in students_to_solve:
+            reduced_timetables[student_id] = solve_student(student_id)
+            if reduced_timetables[student_id] is None:
+                return GroupTimetables([None] * len(student_data), 'INFEASIBLE', 0, {})
+        moved_course_keys = set()
+        for course_key in shared_course_keys:
+            class_counts = collections.Counter(reduced_timetables[student_id][course_id]
+                                               for student_id, course_id in course_students[course_key])
+            # The class of the group only moves to a class with strictly more of its students.
+            if class_counts.most_common(1)[0][1] > class_counts[shared_classes[course_key]]:
+                shared_classes[course_key] = class_counts.most_common(1)[0][0]
+                moved_course_keys.add(course_key)
+        if not moved_course_keys:
+            break
+        students_to_solve = sorted({student_id for course_key in moved_course_keys
+                                    for student_id, _ in course_students[course_key]})
+    return _group_timetables(reduced_timetables, student_equivalent_classes, student_course_keys, shared_classes,
+                             'FEASIBLE')
+
+
+def _choose_shared_classes(shared_course_keys: list, course_periods: dict, allowed_counts: dict,
+                           student_course_keys: list, num_workers: int, max_time_in_seconds: float) -> dict:
+    """
+        The class of the group of every shared course maximising the number
+        of students allowed in it less the number of students taking two
+        courses whose classes of the group clash, the class allowed for the
+        most students when the model isn't solved in time.
+    :return: course key -> classes_id
+    """
+    shared_classes = {course_key: allowed_counts[course_key].most_common(1)[0][0] if allowed_counts[course_key] else 0
+                      for course_key in shared_course_keys}
+    if not shared_course_keys:
+        return shared_classes
+    period_table = PeriodTable([course_periods[course_key] for course_key in shared_course_keys])
+    course_pair_students = collections.Counter()
+    shared_course_ids = {course_key: course_id for course_id, course_key in enumerate(shared_course_keys)}
+    for keys in student_course_keys:
+        course_ids = sorted(shared_course_ids[course_key] for course_key in keys if course_key in shared_course_ids)
+        course_pair_students.update((first, second) for first_index, first in enumerate(course_ids)
+                                    for second in course_ids[first_index + 1:])
+    feasible_classes = np.array([allowed_counts[shared_course_keys[course_id]][classes_id] > 0
+                                 for course_id, classes_id in zip(period_table.class_course,
+                                                                  period_table.class_classes)], dtype=bool)
+    clashes, self_clashes = find_class_clashes(period_table, feasible_classes)
+
+    model = cp_model.CpModel()
+    class_literals = {}
+    for class_index in range(period_table.class_count()):
+        if feasible_classes[class_index] and class_index not in self_clashes:
+            class_literals[class_index] = model.NewBoolVar('shared_class_%i' % class_index)
+    for course_id in range(len(shared_course_keys)):
+        course_literals = [class_literal for class_index, class_literal in class_literals.items()
+                           if period_table.class_course[class_index] == course_id]
+        if not course_literals:
+            return shared_classes
+        model.AddExactlyOne(course_literals)
+    objective_terms = []
+    for class_index, class_literal in class_literals.items():
+        course_key = shared_course_keys[period_table.class_course[class_index]]
+        objective_terms.append(allowed_counts[course_key][int(period_table.class_classes[class_index])] *
+                               class_literal)
+        for clashing_class_index in clashes.get(class_index, ()):
+            course_pair = tuple(sorted((int(period_table.class_course[class_index]),
+                                        int(period_table.class_course[clashing_class_index]))))
+            if clashing_class_index > class_index and clashing_class_index in class_literals and \
+                    course_pair_students[course_pair]:
+                clash_literal = model.NewBoolVar('shared_clash_%i_%i' % (class_index, clashing_class_index))
+                model.AddBoolOr([class_literal.Not(), class_literals[clashing_class_index].Not(), clash_literal])
+                objective_terms.append(-course_pair_students[course_pair] * clash_literal)
+    model.Maximize(sum(objective_terms))
+
+    solver = cp_model.CpSolver()
+    solver.parameters.num_workers = num_workers
+    solver.parameters.max_time_in_seconds = max_time_in_seconds
+    if solver.Solve(model) in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        for class_index, class_literal in class_literals.items():
+            if solver.Value(class_literal):
+                shared_classes[shared_course_keys[period_table.class_course[class_index]]] = \
+                    int(period_table.class_classes[class_index])
+    return shared_classes
+
+
+def _reduced_classes_id(course_equivalent_classes: list, classes_id: int) -> int:
+    return next(reduced_classes_id for reduced_classes_id, classes_ids in enumerate(course_equivalent_classes)
+                if classes_id in classes_ids)
+
+
+def _group_timetables(reduced_timetables: list, student_equivalent_classes: list, student_course_keys: list,
+                      shared_classes: dict, status: str) -> GroupTimetables:
+    """
+        Count the times students are in the class of the group and read the
+        timetables back in the classes_id of the requests.
+    """
+    together = 0
+    timetables = []
+    original_shared_classes = {}
+    for reduced_timetable, equivalent_classes, keys in zip(reduced_timetables, student_equivalent_classes,
+                                                           student_course_keys):
+        for course_id, classes_id in reduced_timetable.items():
+            if keys[course_id] in shared_classes and classes_id == shared_classes[keys[course_id]]:
+                together += 1
+        for course_id, course_key in enumerate(keys):
+            if course_key in shared_classes:
+                original_shared_classes[course_key] = equivalent_classes[course_id][shared_classes[course_key]][0]
+        timetables.append({course_id: equivalent_classes[course_id][classes_id][0]
+                           for course_id, classes_id in reduced_timetable.items()})
+    return GroupTimetables(timetables, status, together, original_shared_classes)
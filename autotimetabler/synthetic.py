@@ -0,0 +1,102 @@
+"""
+    Reproducible synthetic terms for tests and benchmarks.
+"""
+
+import random
+
+from autotimetabler.minute_interval import MinuteInterval, to_week_mask
+
+# The hours classes are generated in.
+FIRST_HOUR = 8
+LAST_HOUR = 20
+# The number of teaching weeks of a term.
+TEACHING_WEEKS = 12
+
+
+def synthetic_term(courses: int, classes: int, periods: int, duplicate_ratio: float = 0.0,
+                   clash_density: float = 0.0, locations: int = 6, part_week_ratio: float = 0.0,
+                   seed: int = 0) -> dict:
+    """
+        A request over randomly generated courses, the same for the same
+        arguments.
+    :param courses:             - The number of courses.
+    :param classes:             - The number of classes of every course.
+    :param periods:             - The number of periods of every class, lasting one or two hours.
+    :param duplicate_ratio:     - The share of the classes that are copies of an earlier class of their course,
+                                  with their periods listed in a different order.
+    :param clash_density:       - From 0, the periods starting at any hour of the week, to 1, all of them
+                                  starting at the same hour.
+    :param locations:           - The number of locations the periods are at.
+    :param part_week_ratio:     - The share of the periods only running in some of the TEACHING_WEEKS, in their
+                                  odd or even weeks or their first or second half.
+    :param seed:
+    :return: The request json data, allowing every day and hour.
+    """
+    generator = random.Random(seed)
+    start_hours = [(day, hour) for day in range(1, MinuteInterval.DAYS_IN_A_WORK_WEEK + 1)
+                   for hour in range(FIRST_HOUR, LAST_HOUR - 1)]
+    generator.shuffle(start_hours)
+    start_hours = start_hours[:max(1, round(len(start_hours) * (1 - clash_density)))]
+    location_names = ['location_%i' % location for location in range(locations)]
+    part_week_masks = [to_week_mask(range(1, TEACHING_WEEKS + 1, 2)), to_week_mask(range(2, TEACHING_WEEKS + 1, 2)),
+                       to_week_mask(range(1, TEACHING_WEEKS // 2 + 1)),
+                       to_week_mask(range(TEACHING_WEEKS // 2 + 1, TEACHING_WEEKS + 1))]
+
+    term_periods = []
+    for _ in range(courses):
+        course_classes = []
+        for _ in range(classes):
+            if course_classes and generator.random() < duplicate_ratio:
+                duplicate_class = list(generator.choice(course_classes))
+                generator.shuffle(duplicate_class)
+                course_classes.append(duplicate_class)
+                continue
+            class_periods = []
+            for _ in range(periods):
+                day, start = generator.choice(start_hours)
+                class_periods.append([day, start, start + generator.randint(1, 2), generator.choice(location_names)])
+                # Only drawn for part weeks, so that the terms without them stay the same.
+                if part_week_ratio and generator.random() < part_week_ratio:
+                    class_periods[-1].append(generator.choice(part_week_masks))
+            course_classes.append(class_periods)
+        term_periods.append(course_classes)
+    return {
+        "start": str(FIRST_HOUR),
+        "end": str(LAST_HOUR),
+        "days": "12345",
+        "gap": "0",
+        "max_days": "5",
+        "periods": term_periods,
+    }
+
+
+def synthetic_group(students: int, courses: int, courses_per_student: int, classes: int, periods: int,
+                    duplicate_ratio: float = 0.0, seed: int = 0) -> tuple[dict, list]:
+    """
+        A term of randomly generated courses and the requests of a group of
+        students taking some of them, the same for the same arguments.
+    :param students:            - The number of students of the group.
+    :param courses:             - The number of courses of the term, coded COURSE0, COURSE1, ...
+    :param courses_per_student: - The number of courses every student takes.
+    :param classes:             - See synthetic_term.
+    :param periods:             - See synthetic_term.
+    :param duplicate_ratio:     - See synthetic_term.
+    :param seed:
+    :return: (the periods of every course code, the request json data of every student naming its courses, on
+             four or five days, starting up to an hour late and ending up to an hour early)
+    """
+    term_data = synthetic_term(courses, classes, periods, duplicate_ratio, seed=seed)
+    term = {'COURSE%i' % course_id: course_classes for course_id, course_classes in enumerate(term_data['periods'])}
+    generator = random.Random(seed)
+    requests = []
+    for _ in range(students):
+        days = sorted(generator.sample(range(1, MinuteInterval.DAYS_IN_A_WORK_WEEK + 1), generator.randint(4, 5)))
+        requests.append({
+            "start": str(generator.randint(FIRST_HOUR, FIRST_HOUR + 1)),
+            "end": str(generator.randint(LAST_HOUR - 1, LAST_HOUR)),
+            "days": ''.join(map(str, days)),
+            "gap": "0",
+            "max_days": str(len(days)),
+            "courses": sorted(generator.sample(sorted(term), min(courses_per_student, courses))),
+        })
+    return term, requests
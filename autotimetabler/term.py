@@ -0,0 +1,236 @@
+"""
+    The periods of the courses of a term read from a json file one course at
+    a time, so that only the courses the requests take are ever in memory.
+
+    The term file is either a json object of the classes of every course code,
+    {"COMP1511": [[[1, 9, 10, "a"]], ...], ...}, or json lines of one course
+    each, {"course": "COMP1511", "classes": [[[1, 9, 10, "a"]], ...]}.
+"""
+
+import codecs
+import collections
+import collections.abc
+import json
+import re
+import threading
+
+import numpy as np
+
+from autotimetabler.minute_interval import ALL_WEEKS, LOCATION, MinuteInterval, period_weeks
+
+# The periods of a course as arrays: the periods of class classes_id are the rows class_offsets[classes_id] to
+# class_offsets[classes_id + 1] of minutes, the [start', end'] MinuteInterval format, location, the codes of the names
+# of their locations in the locations of the term, and weeks, their teaching weeks bitmasks.
+TermCourse = collections.namedtuple('TermCourse', 'class_offsets minutes location weeks')
+
+_CHUNK_SIZE = 1 << 20
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class _JsonScanner:
+    """
+        Reads the json values of a binary file one after the other, with the
+        byte offset and length of every value in the file, holding no more of
+        the file than the value being read.
+    """
+
+    def __init__(self, binary_file):
+        self.__file = binary_file
+        self.__text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.__json_decoder = json.JSONDecoder()
+        self.__buffer = ''
+        self.__position = 0
+        # The byte offset of the position in the buffer.
+        self.__offset = 0
+        self.__at_end = False
+
+    def __read_more(self) -> bool:
+        if self.__at_end:
+            return False
+        chunk = self.__file.read(_CHUNK_SIZE)
+        self.__at_end = not chunk
+        self.__buffer = self.__buffer[self.__position:] + self.__text_decoder.decode(chunk, final=self.__at_end)
+        self.__position = 0
+        return True
+
+    def __advance(self, position: int):
+        self.__offset += len(self.__buffer[self.__position:position].encode())
+        self.__position = position
+
+    def peek_char(self) -> str:
+        """
+            The next character after whitespace, which is left to read, or '' at the end of the file.
+        """
+        while True:
+            self.__advance(_WHITESPACE.match(self.__buffer, self.__position).end())
+            if self.__position < len(self.__buffer):
+                return self.__buffer[self.__position]
+            if not self.__read_more():
+                return ''
+
+    def next_char(self) -> str:
+        """
+            The next character after whitespace, which is consumed, or '' at the end of the file.
+        """
+        char = self.peek_char()
+        if char:
+            self.__advance(self.__position + 1)
+        return char
+
+    def expect(self, char: str):
+        found_char = self.next_char()
+        if found_char != char:
+            raise ValueError('Expected %r at byte %i of the term, found %r' % (char, self.__offset, found_char))
+
+    def decode(self) -> tuple:
+        """
+            The next json value after whitespace.
+        :return: (value, byte offset, byte length)
+        """
+        while True:
+            self.__advance(_WHITESPACE.match(self.__buffer, self.__position).end())
+            try:
+                value, end = self.__json_decoder.raw_decode(self.__buffer, self.__position)
+            except json.JSONDecodeError as error:
+                if not self.__read_more():
+                    raise ValueError('Malformed term at byte %i' % self.__offset) from error
+                continue
+            # A number at the end of the buffer could go on in the next chunk.
+            if end == len(self.__buffer) and self.__read_more():
+                continue
+            offset = self.__offset
+            self.__advance(end)
+            return value, offset, self.__offset - offset
+
+
+def _index_json_object(binary_file):
+    """
+        The course code and (byte offset, byte length) of the classes of every
+        course of a term json object.
+    """
+    scanner = _JsonScanner(binary_file)
+    scanner.expect('{')
+    separator = ',' if scanner.peek_char() != '}' else scanner.next_char()
+    while separator == ',':
+        course_code, _, _ = scanner.decode()
+        scanner.expect(':')
+        _, offset, length = scanner.decode()
+        yield course_code, (offset, length)
+        separator = scanner.next_char()
+        if separator not in (',', '}'):
+            raise ValueError('Expected , or } in the term, found %r' % separator)
+
+
+def _index_json_lines(binary_file):
+    """
+        The course code and (byte offset, byte length) of every line of a term
+        in json lines.
+    """
+    offset = 0
+    for line in binary_file:
+        if line.strip():
+            yield json.loads(line)['course'], (offset, len(line))
+        offset += len(line)
+
+
+class TermFile(collections.abc.Mapping):
+    """
+        The periods of every course code of a term file, read from the file
+        when a course is first looked up.
+
+        Opening the term only indexes the byte range of every course in the
+        file, reading it in chunks. A course looked up is converted to a
+        TermCourse, its locations interned over the whole term, and the last
+        max_courses of them are kept. Looking up a course code gives its
+        periods as in the request json data, so a TermFile can be the term of
+        solve_batch or request_periods, and a pickled TermFile, e.g. for a
+        worker process, only holds the index.
+    """
+
+    def __init__(self, path: str, json_lines: bool = None, max_courses: int = 256):
+        """
+        :param path:                - The term json file.
+        :param json_lines:          - Whether the term is in json lines, by default when the file is .jsonl or .ndjson.
+        :param max_courses:         - The most courses kept in memory.
+        """
+        self.path = path
+        self.json_lines = path.endswith(('.jsonl', '.ndjson')) if json_lines is None else json_lines
+        self.max_courses = max_courses
+        with open(path, 'rb') as term_file:
+            self.index = dict(_index_json_lines(term_file) if self.json_lines else _index_json_object(term_file))
+        self.locations = []
+        self._location_codes = {}
+        self._courses = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {'path': self.path, 'json_lines': self.json_lines, 'max_courses': self.max_courses,
+                'index': self.index}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.locations = []
+        self._location_codes = {}
+        self._courses = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __contains__(self, course_code):
+        return course_code in self.index
+
+    def __getitem__(self, course_code: str) -> list:
+        """
+            The classes of a course, every period a [day, start, end, location] list with its teaching weeks
+            bitmask after it when it doesn't run every week.
+        """
+        course = self.course(course_code)
+        day_hours = MinuteInterval().to_day_hour_array(course.minutes)
+        periods = [[int(day), _hour(start), _hour(end), self.locations[location]]
+                   for (day, start, end), location in zip(day_hours.tolist(), course.location.tolist())]
+        for period, weeks in zip(periods, course.weeks.tolist()):
+            if weeks != ALL_WEEKS:
+                period.append(weeks)
+        return [periods[course.class_offsets[classes_id]:course.class_offsets[classes_id + 1]]
+                for classes_id in range(len(course.class_offsets) - 1)]
+
+    def course(self, course_code: str) -> TermCourse:
+        """
+            The TermCourse of a course, read from the file when it isn't kept.
+        :raise KeyError: When the term has no such course.
+        """
+        with self._lock:
+            if course_code in self._courses:
+                self._courses.move_to_end(course_code)
+                return self._courses[course_code]
+        offset, length = self.index[course_code]
+        with open(self.path, 'rb') as term_file:
+            term_file.seek(offset)
+            value = json.loads(term_file.read(length))
+        classes = value['classes'] if self.json_lines else value
+        period_rows = [period for periods in classes for period in periods]
+        with self._lock:
+            location = np.array([self.__location_code(period[LOCATION]) for period in period_rows], dtype=np.int32)
+            course = TermCourse(class_offsets=np.concatenate(([0], np.cumsum([len(periods) for periods in classes],
+                                                                             dtype=np.int64))).tolist(),
+                                minutes=MinuteInterval().to_minute_array(period_rows), location=location,
+                                weeks=np.array([period_weeks(period) for period in period_rows], dtype=np.int64))
+            self._courses[course_code] = course
+            while len(self._courses) > self.max_courses:
+                self._courses.popitem(last=False)
+        return course
+
+    def __location_code(self, location: str) -> int:
+        if location not in self._location_codes:
+            self._location_codes[location] = len(self.locations)
+            self.locations.append(location)
+        return self._location_codes[location]
+
+
+def _hour(hour: float):
+    # The hours of the term are written as integers when they are.
+    return int(hour) if float(hour).is_integer() else hour
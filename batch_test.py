@@ -0,0 +1,57 @@
+from autotimetabler import batch_stats, iter_timetables, request_group, solve_batch
+from conftest import request_data
+
+TERM = {
+    'COMP1511': [
+        [[1, 9, 10, 'a']],
+        [[1, 10, 11, 'a'], [3, 10, 11, 'a']],
+    ],
+    'MATH1131': [
+        [[1, 9, 10, 'b']],
+        [[2, 9, 10, 'b']],
+    ],
+    'PHYS1121': [
+        [[3, 10, 12, 'c']],
+        [[4, 14, 15, 'c']],
+    ],
+}
+
+
+def test_solve_batch():
+    requests = [
+        request_data(courses=['COMP1511', 'MATH1131']),
+        request_data(courses=['COMP1511', 'PHYS1121']),
+        request_data(courses=['COMP1511', 'MATH1131'], days='1'),
+        request_data([TERM['MATH1131'], TERM['PHYS1121']], courses=[]),
+    ]
+    stats = {}
+    results = list(solve_batch(requests, term=TERM, workers=2, max_time_in_seconds=5.0, stats=stats))
+    assert sorted(result.request_id for result in results) == [0, 1, 2, 3]
+    for result in sorted(results):
+        data = dict(requests[result.request_id])
+        data['periods'] = [TERM[course_code] for course_code in data.pop('courses')] \
+            if 'periods' not in data else data['periods']
+        assert result.error is None
+        assert result.status == ('OPTIMAL' if result.timetables else 'INFEASIBLE')
+        assert sorted(result.timetables, key=str) == sorted(iter_timetables(data, presolve_request=False), key=str)
+        assert result.latency >= result.solve_time
+    assert stats['requests'] == 4
+    assert stats['groups'] == 3
+    assert stats['throughput'] > 0
+    assert stats['latency']['p50'] <= stats['latency']['max']
+
+
+def test_solve_batch_reports_errors():
+    results = list(solve_batch([request_data(courses=['COMP1511', 'COMP9999'])], term=TERM, workers=1))
+    assert results[0].timetables is None
+    assert 'COMP9999' in results[0].error
+
+
+def test_request_group_and_stats():
+    assert request_group(request_data(courses=['COMP1511', 'MATH1131'])) == \
+        request_group(request_data(courses=['COMP1511', 'MATH1131'], days='1'))
+    assert request_group(request_data(courses=['COMP1511', 'MATH1131'])) != \
+        request_group(request_data(courses=['MATH1131']))
+    stats = batch_stats([1.0, 2.0, 3.0, 4.0], [0.5, 0.5, 0.5, 0.5], 2.0)
+    assert stats['throughput'] == 2.0
+    assert stats['latency'] == {'mean': 2.5, 'p50': 2.0, 'p95': 4.0, 'max': 4.0}
@@ -0,0 +1,124 @@
+import itertools
+import sqlite3
+
+import autotimetabler.cache
+from autotimetabler import TimetableCache, cached_timetables, iter_timetables, normalise_request, request_key
+from conftest import REQUEST
+
+# The same request written differently.
+SHUFFLED_REQUEST = {
+    "start": 9,
+    "end": "19",
+    "days": "54321",
+    "gap": "0",
+    "max_days": 5,
+    "periods": [
+        [
+            [[2, 9, 10, 'b']],
+            [[1, 9, 10, 'b']],
+        ],
+        [
+            [[3, 10, 11, 'a'], [1, 10, 11, 'a']],
+            [[1, 9, 10, 'a']],
+        ]
+    ]
+}
+
+
+def enumerate_all(request):
+    return iter_timetables(request)
+
+
+def test_equivalent_requests_have_the_same_key():
+    normalised_request, course_order, class_ids = normalise_request(REQUEST)
+    shuffled_normalised_request, shuffled_course_order, shuffled_class_ids = normalise_request(SHUFFLED_REQUEST)
+    assert request_key(normalised_request) == request_key(shuffled_normalised_request)
+    assert request_key(normalised_request) != request_key(normalised_request, 'optimise')
+    assert normalised_request['days'] == [1, 2, 3, 4, 5]
+    assert course_order == [0, 1] and shuffled_course_order == [1, 0]
+    assert class_ids == [[[0, 2], [1]], [[0], [1]]]
+    assert shuffled_class_ids == [[[1], [0]], [[1], [0]]]
+
+
+def test_cached_timetables_are_mapped_back_to_the_request():
+    cache = TimetableCache()
+    timetables = cached_timetables(REQUEST, enumerate_all, cache)
+    assert sorted(map(str, timetables)) == sorted(map(str, iter_timetables(REQUEST)))
+    assert cache.stats() == {'hits': 0, 'misses': 1, 'entries': 1}
+
+    shuffled_timetables = cached_timetables(SHUFFLED_REQUEST, enumerate_all, cache)
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'entries': 1}
+    assert sorted(map(str, shuffled_timetables)) == sorted(map(str, iter_timetables(SHUFFLED_REQUEST)))
+
+    cached_timetables(REQUEST, lambda request: itertools.islice(iter_timetables(request), 1), cache, 'first')
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'entries': 2}
+
+
+def test_other_fields_are_kept_in_the_key_and_the_solve():
+    solved_requests = []
+
+    def solve(request):
+        solved_requests.append(request)
+        return iter_timetables(request)
+
+    cache = TimetableCache()
+    cached_timetables(REQUEST, solve, cache)
+    cached_timetables(dict(REQUEST, early=10, late=16), solve, cache)
+    assert cache.stats() == {'hits': 0, 'misses': 2, 'entries': 2}
+    assert 'early' not in solved_requests[0]
+    assert (solved_requests[1]['early'], solved_requests[1]['late']) == (10, 16)
+
+
+def test_compact_timetables_can_be_cached_on_disk(tmp_path):
+    cache = TimetableCache(path=str(tmp_path / 'timetables.sqlite'))
+    timetables = cached_timetables(REQUEST, lambda request: iter_timetables(request, compact=True), cache, 'compact')
+    assert sorted(map(str, timetables)) == sorted(map(str, iter_timetables(REQUEST)))
+    cache.close()
+
+
+def test_least_recently_used_and_expired_entries_are_evicted(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(autotimetabler.cache.time, 'time', lambda: now[0])
+    cache = TimetableCache(max_entries=2, ttl=60)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    now[0] += 61
+    assert cache.get('a') is None
+    assert cache.stats() == {'hits': 2, 'misses': 2, 'entries': 1}
+
+
+def test_old_and_expired_rows_are_deleted_from_disk(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(autotimetabler.cache.time, 'time', lambda: now[0])
+    cache_path = str(tmp_path / 'timetables.sqlite')
+    cache = TimetableCache(max_entries=1, ttl=60, path=cache_path, max_disk_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.put('a', 1)
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+
+    now[0] += 30
+    cache.put('d', 4)
+    now[0] += 31
+    cache.put('e', 5)
+    cache.close()
+    with sqlite3.connect(cache_path) as database:
+        assert sorted(key for key, in database.execute('SELECT key FROM timetables')) == ['d', 'e']
+
+
+def test_the_disk_tier_survives_a_restart(tmp_path):
+    cache_path = str(tmp_path / 'timetables.sqlite')
+    cache = TimetableCache(path=cache_path)
+    cached_timetables(REQUEST, enumerate_all, cache)
+    cache.close()
+
+    restarted_cache = TimetableCache(path=cache_path)
+    assert sorted(map(str, cached_timetables(REQUEST, enumerate_all, restarted_cache))) == \
+        sorted(map(str, iter_timetables(REQUEST)))
+    assert restarted_cache.stats() == {'hits': 1, 'misses': 0, 'entries': 1}
@@ -0,0 +1,44 @@
+from autotimetabler import canonicalise_classes, count_equivalent_timetables, expand_timetable
+
+
+def test_identical_classes_are_collapsed():
+    """
+        Identical classes of a course share one equivalence class no matter the
+        order their periods are listed in, but identical classes of different
+        courses are kept apart.
+    """
+    data = {
+        "periods": [
+            [
+                [[3, 11, 12, 'c']],
+                [[2, 9, 10, 'a']],
+                [[3, 11, 12, 'c']],
+                [[2, 9, 10, 'a'], [4, 9, 10, 'a']],
+                [[4, 9, 10, 'a'], [2, 9, 10, 'a']],
+            ],
+            [
+                [[3, 11, 12, 'c']],
+            ]
+        ]
+    }
+    reduced_data, equivalent_classes = canonicalise_classes(data)
+    assert reduced_data['periods'] == [
+        [
+            [[3, 11, 12, 'c']],
+            [[2, 9, 10, 'a']],
+            [[2, 9, 10, 'a'], [4, 9, 10, 'a']],
+        ],
+        [
+            [[3, 11, 12, 'c']],
+        ]
+    ]
+    assert equivalent_classes == [[[0, 2], [1], [3, 4]], [[0]]]
+    # The request data itself is left untouched.
+    assert len(data['periods'][0]) == 5
+
+
+def test_expand_timetable():
+    equivalent_classes = [[[0, 2], [1], [3, 4]], [[0]]]
+    timetable = {0: 2, 1: 0}
+    assert count_equivalent_timetables(timetable, equivalent_classes) == 2
+    assert list(expand_timetable(timetable, equivalent_classes)) == [{0: 3, 1: 0}, {0: 4, 1: 0}]
@@ -0,0 +1,75 @@
+"""
+    Compare the model build and solve times of the clash encodings on
+    large synthetic terms.
+
+    python clash_encoding_benchmark.py --courses 8 --classes 300 --periods 2
+"""
+
+import argparse
+import time
+
+from ortools.sat.python import cp_model
+
+from autotimetabler import CLIQUE_ENCODING, NO_OVERLAP_ENCODING, build_timetable_model, synthetic_term
+
+
+class StopAfterSolutions(cp_model.CpSolverSolutionCallback):
+    def __init__(self, solution_limit):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self.__solution_limit = solution_limit
+        self.solution_count = 0
+
+    def on_solution_callback(self):
+        self.solution_count += 1
+        if self.solution_count >= self.__solution_limit:
+            self.StopSearch()
+
+
+def benchmark(data: dict, clash_encoding: str, solution_limit: int) -> dict:
+    build_start = time.perf_counter()
+    model, _, _ = build_timetable_model(data, clash_encoding)
+    build_time = time.perf_counter() - build_start
+
+    solver = cp_model.CpSolver()
+    solver.parameters.num_workers = 1
+    status = solver.Solve(model)
+    solve_time = solver.WallTime()
+
+    solver = cp_model.CpSolver()
+    solver.parameters.enumerate_all_solutions = True
+    solution_limiter = StopAfterSolutions(solution_limit)
+    solver.Solve(model, solution_limiter)
+    return {
+        'status': solver.StatusName(status),
+        'build': build_time,
+        'solve': solve_time,
+        'enumerate': solver.WallTime(),
+        'solutions': solution_limiter.solution_count,
+        'constraints': len(model.Proto().constraints),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--courses', type=int, default=8)
+    parser.add_argument('--classes', type=int, default=300, help='classes per course')
+    parser.add_argument('--periods', type=int, default=2, help='periods per class')
+    parser.add_argument('--solutions', type=int, default=1000, help='solutions to enumerate')
+    parser.add_argument('--part-week-ratio', type=float, default=0.0,
+                        help='the share of the periods only running in some teaching weeks')
+    parser.add_argument('--seed', type=int, default=0)
+    arguments = parser.parse_args()
+
+    data = synthetic_term(arguments.courses, arguments.classes, arguments.periods,
+                          part_week_ratio=arguments.part_week_ratio, seed=arguments.seed)
+    print('%-12s %-10s %10s %10s %12s %10s %12s' % ('encoding', 'status', 'build (s)', 'solve (s)', 'enumerate (s)',
+                                                   'solutions', 'constraints'))
+    for clash_encoding in (NO_OVERLAP_ENCODING, CLIQUE_ENCODING):
+        result = benchmark(data, clash_encoding, arguments.solutions)
+        print('%-12s %-10s %10.3f %10.3f %12.3f %10i %12i' % (clash_encoding, result['status'], result['build'],
+                                                            result['solve'], result['enumerate'],
+                                                            result['solutions'], result['constraints']))
+
+
+if __name__ == '__main__':
+    main()
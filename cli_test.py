@@ -0,0 +1,60 @@
+import io
+import json
+import subprocess
+import sys
+
+from autotimetabler.cli import main
+from conftest import REQUEST
+
+
+def test_importing_the_time_code_does_not_import_ortools():
+    imported_modules = subprocess.run(
+        [sys.executable, '-c', 'import sys, autotimetabler; autotimetabler.MinuteInterval; print(list(sys.modules))'],
+        capture_output=True, text=True, check=True).stdout
+    assert 'autotimetabler' in imported_modules
+    assert 'ortools' not in imported_modules
+
+
+def test_enumerate_from_stdin(monkeypatch, capsys):
+    monkeypatch.setattr('sys.stdin', io.StringIO(json.dumps(REQUEST)))
+    assert main([]) == 0
+    timetables = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert sorted(timetables) == [[0, 1], [1, 0], [1, 1]]
+
+
+def test_optimise_from_a_file(tmp_path, capsys):
+    request_path = tmp_path / 'request.json'
+    request_path.write_text(json.dumps(REQUEST))
+    output_path = tmp_path / 'timetables.json'
+    assert main([str(request_path), '--mode', 'optimise', '--workers', '1', '-o', str(output_path)]) == 0
+    assert capsys.readouterr().out == ''
+    result = json.loads(output_path.read_text())
+    assert result['status'] == 'OPTIMAL'
+    assert result['timetable'] in ([0, 1], [1, 0], [1, 1])
+
+
+def test_infeasible_requests_are_explained(tmp_path, capsys):
+    request_path = tmp_path / 'request.json'
+    request_path.write_text(json.dumps(dict(REQUEST, days='5')))
+    assert main([str(request_path)]) == 1
+    assert capsys.readouterr().err.splitlines() == [
+        'course 0 has no class left: 3 outside the days and hours of the request',
+        'course 1 has no class left: 2 outside the days and hours of the request',
+    ]
+    assert main([str(request_path), '--mode', 'optimise', '--workers', '1']) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert result['status'] == 'INFEASIBLE'
+    assert sorted(result['infeasible_courses']) == ['0', '1']
+
+
+def test_metrics(tmp_path, capsys):
+    request_path = tmp_path / 'request.json'
+    request_path.write_text(json.dumps(REQUEST))
+    metrics_path = tmp_path / 'metrics.jsonl'
+    assert main([str(request_path), '--metrics', str(metrics_path)]) == 0
+    assert main([str(request_path), '--mode', 'optimise', '--workers', '1', '--metrics', str(metrics_path)]) == 0
+    enumerate_metrics, optimise_metrics = [json.loads(line) for line in metrics_path.read_text().splitlines()]
+    assert enumerate_metrics['labels'] == {'mode': 'enumerate'}
+    assert enumerate_metrics['solutions'] == len(capsys.readouterr().out.splitlines()) - 1
+    assert optimise_metrics['solver']['status'] == 'OPTIMAL'
+    assert 'define_timetable_objective' in optimise_metrics['phases']
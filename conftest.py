@@ -0,0 +1,29 @@
+def request_data(periods: list = None, start="9", end="19", days="12345", gap="0", max_days="5", **fields) -> dict:
+    """
+        A request for the periods of its courses, or with courses=[...] for
+        course codes looked up in a term.
+    """
+    data = {
+        "start": start,
+        "end": end,
+        "days": days,
+        "gap": gap,
+        "max_days": max_days,
+    }
+    if periods is not None:
+        data["periods"] = periods
+    data.update(fields)
+    return data
+
+
+REQUEST = request_data([
+    [
+        [[1, 9, 10, 'a']],
+        [[1, 10, 11, 'a'], [3, 10, 11, 'a']],
+        [[1, 9, 10, 'a']],
+    ],
+    [
+        [[1, 9, 10, 'b']],
+        [[2, 9, 10, 'b']],
+    ]
+])
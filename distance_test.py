@@ -0,0 +1,55 @@
+import json
+
+from autotimetabler import (DistanceMatrix, build_timetable_model, define_min_walking_constraint,
+                            find_consecutive_period_pairs, load_distance_matrix, optimise_timetable)
+from conftest import request_data
+
+CAMPUS = DistanceMatrix.from_triples([('a', 'b', 500), ('a', 'c', 50), ('c', 'b', 450)])
+PERIODS = [
+    [
+        [[2, 11, 12, 'a']],
+    ],
+    [
+        [[2, 12, 13, 'b']],
+        [[2, 12, 13, 'c']],
+        [[2, 13, 14, 'b']],
+    ],
+]
+DATA = request_data(PERIODS, start="8", end="20", gap="2")
+
+
+def test_distance_matrix(tmp_path):
+    assert CAMPUS.locations == ['a', 'b', 'c']
+    assert CAMPUS.distance('a', 'c') == CAMPUS.distance('c', 'a') == 50
+    assert CAMPUS.distance('a', 'z') == 0
+    assert CAMPUS.location_ids(['c', 'z', 'a']).tolist() == [2, -1, 0]
+
+    campus_path = tmp_path / 'campus.json'
+    campus_path.write_text(json.dumps({'locations': CAMPUS.locations, 'distances': CAMPUS.distances.tolist()}))
+    campus = load_distance_matrix(str(campus_path))
+    assert campus is load_distance_matrix(str(campus_path))
+    assert campus.distances.tolist() == CAMPUS.distances.tolist()
+
+
+def test_only_back_to_back_classes_are_walked_between():
+    model, global_solution_space, mapped_by_course_data_set = build_timetable_model(DATA)
+    period_pairs = find_consecutive_period_pairs(global_solution_space)
+    assert [(global_solution_space[first].location, global_solution_space[second].location)
+            for first, second in period_pairs] == [('a', 'b'), ('a', 'c')]
+    assert len(find_consecutive_period_pairs(global_solution_space, 120)) == 3
+
+    walking_terms = define_min_walking_constraint(model, global_solution_space, mapped_by_course_data_set, CAMPUS)
+    assert [distance for _, distance in walking_terms] == [500, 50]
+
+
+def test_optimise_walking():
+    """
+        Walking to the back to back class at c costs more than the short gap
+        before the later class at b, and both less than walking to b.
+    """
+    result = optimise_timetable(DATA, num_workers=1, distance_matrix=CAMPUS)
+    assert result.timetable == {0: 0, 1: 2}
+    assert round(result.objective) == 10 + 3
+    result = optimise_timetable(DATA, weights={'gaps': 100}, num_workers=1, distance_matrix=CAMPUS)
+    assert result.timetable == {0: 0, 1: 1}
+    assert round(result.objective) == 10 + 50
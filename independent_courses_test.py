@@ -0,0 +1,36 @@
+from autotimetabler import enumerate_independent_timetables, iter_timetables
+
+
+def test_independent_courses_are_enumerated_separately():
+    data = {
+        "start": "9",
+        "end": "19",
+        "days": "12345",
+        "gap": "0",
+        "max_days": "5",
+        "periods": [
+            [
+                [[1, 9, 11, 'a']],
+                [[1, 12, 13, 'a']],
+            ],
+            [
+                [[2, 9, 10, 'b']],
+                [[2, 10, 11, 'b']],
+                [[2, 11, 12, 'b']],
+            ],
+            [
+                [[1, 10, 11, 'c']],
+                [[1, 12, 13, 'c']],
+                [[1, 13, 14, 'c']],
+            ],
+        ]
+    }
+    timetable_count, timetables = enumerate_independent_timetables(data)
+    timetables = list(timetables)
+    assert timetable_count == len(timetables) == 3 * 4
+    assert sorted(map(str, timetables)) == sorted(map(str, iter_timetables(data)))
+
+    # Only allowing one day ties the courses together again.
+    data['max_days'] = "1"
+    timetable_count, timetables = enumerate_independent_timetables(data)
+    assert timetable_count == len(list(timetables))
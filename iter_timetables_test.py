@@ -0,0 +1,195 @@
+import itertools
+import threading
+import time
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from autotimetabler import (CLIQUE_ENCODING, NO_OVERLAP_ENCODING, build_timetable_model, collect_timetables,
+                            define_min_gap_constraint, find_short_gap_class_pairs, iter_timetables,
+                            stream_solutions)
+from conftest import request_data
+
+
+def test_iter_timetables_yields_every_timetable():
+    data = request_data([
+        [
+            [[1, 9, 10, 'a']],
+            [[1, 10, 11, 'a']],
+            [[1, 9, 10, 'a']],
+        ],
+        [
+            [[1, 9, 10, 'b']],
+            [[2, 9, 10, 'b']],
+        ]
+    ])
+    timetables = list(iter_timetables(data))
+    assert len(timetables) == 3
+    assert {0: 1, 1: 0} in timetables
+    assert {0: 0, 1: 1} in timetables
+    assert {0: 1, 1: 1} in timetables
+    expanded_timetables = list(iter_timetables(data, expand_duplicates=True))
+    assert len(expanded_timetables) == 4
+    assert {0: 2, 1: 1} in expanded_timetables
+
+
+def test_iter_timetables_stops_when_the_consumer_does():
+    """
+        Closing the generator early must stop the search instead of leaving a
+        solver thread blocked on the queue.
+    """
+    data = request_data([[[[day, hour, hour + 1, 'a']] for day in range(1, 6) for hour in range(9, 18)]
+                         for _ in range(4)])
+    threads_before = threading.active_count()
+    timetables = iter_timetables(data, max_queued_timetables=1)
+    assert len(list(itertools.islice(timetables, 3))) == 3
+    timetables.close()
+    assert threading.active_count() == threads_before
+
+
+def test_closing_a_stream_stops_a_search_between_solutions():
+    """
+        12 courses can't all take one of 11 hours on monday, and course 0's
+        tuesday class is searched first: the first timetable is found at once,
+        then the search has to prove there are no others.
+    """
+    periods = [[[[1, 9 + hour, 10 + hour, 'a']] for hour in range(11)] for _ in range(12)]
+    periods[0].append([[2, 9, 10, 'a']])
+    model, _, mapped_by_course_data_set = build_timetable_model(dict(request_data(periods), end="20"))
+    tuesday = mapped_by_course_data_set[0][-1].assigned_bool_var
+    for course_id in range(1, 12):
+        model.AddImplication(tuesday, mapped_by_course_data_set[course_id][course_id - 1].assigned_bool_var)
+    model.AddDecisionStrategy([tuesday], cp_model.CHOOSE_FIRST, cp_model.SELECT_MAX_VALUE)
+    solver = cp_model.CpSolver()
+    solver.parameters.search_branching = cp_model.FIXED_SEARCH
+    solver.parameters.num_workers = 1
+    timetables = stream_solutions(model, mapped_by_course_data_set, solver, 1)
+    assert next(timetables)[0] == 11
+    started = time.perf_counter()
+    timetables.close()
+    assert time.perf_counter() - started < 2
+
+
+def test_clique_encoding_matches_no_overlap():
+    data = request_data([
+        [
+            [[1, 9, 11, 'a'], [3, 9, 10, 'a']],
+            [[1, 10, 12, 'a']],
+            [[1, 12, 13, 'a']],
+        ],
+        [
+            [[1, 10, 11, 'b']],
+            [[1, 11, 13, 'b'], [3, 9, 10, 'b']],
+            [[2, 9, 10, 'b']],
+        ],
+        [
+            [[1, 9, 12, 'c']],
+            [[3, 9, 12, 'c']],
+        ],
+    ])
+    no_overlap_timetables = sorted(map(str, iter_timetables(data, clash_encoding=NO_OVERLAP_ENCODING)))
+    clique_timetables = sorted(map(str, iter_timetables(data, clash_encoding=CLIQUE_ENCODING)))
+    assert no_overlap_timetables
+    assert clique_timetables == no_overlap_timetables
+
+
+def test_periods_of_no_length_clash_with_nothing():
+    data = request_data([
+        [
+            [[1, 10, 10, 'a']],
+            [[1, 11, 12, 'a']],
+        ],
+        [
+            [[1, 10, 11, 'b']],
+        ]
+    ])
+    for clash_encoding in (NO_OVERLAP_ENCODING, CLIQUE_ENCODING):
+        assert sorted(map(str, iter_timetables(data, clash_encoding=clash_encoding, presolve_request=False))) == \
+            [str({0: 0, 1: 0}), str({0: 1, 1: 0})]
+
+
+def test_max_days_limits_the_days_on_campus():
+    data = request_data([
+        [
+            [[1, 9, 10, 'a']],
+            [[2, 9, 10, 'a'], [3, 9, 10, 'a']],
+        ],
+        [
+            [[1, 11, 12, 'b']],
+            [[2, 11, 12, 'b']],
+            [[4, 11, 12, 'b']],
+        ]
+    ])
+    assert len(list(iter_timetables(data))) == 6
+    data['max_days'] = "2"
+    assert sorted(map(str, iter_timetables(data))) == sorted(map(str, [{0: 0, 1: 0}, {0: 0, 1: 1}, {0: 0, 1: 2},
+                                                                       {0: 1, 1: 1}]))
+    data['max_days'] = "1"
+    assert list(iter_timetables(data)) == [{0: 0, 1: 0}]
+
+
+def test_days_on_campus_can_be_minimised():
+    data = request_data([
+        [
+            [[1, 9, 10, 'a'], [3, 9, 10, 'a']],
+            [[2, 9, 10, 'a']],
+        ],
+        [
+            [[1, 11, 12, 'b']],
+            [[2, 11, 12, 'b']],
+        ]
+    ])
+    model, _, mapped_by_course_data_set = build_timetable_model(data, minimise_days=True)
+    solver = cp_model.CpSolver()
+    assert solver.Solve(model) == cp_model.OPTIMAL
+    assert solver.ObjectiveValue() == 1
+    assert solver.Value(mapped_by_course_data_set[0][1].assigned_bool_var)
+
+
+def test_min_gap_between_classes():
+    data = request_data([
+        [
+            [[1, 9, 10, 'a']],
+        ],
+        [
+            [[1, 10, 11, 'b']],
+            [[1, 11, 12, 'b']],
+            [[1, 13, 14, 'b']],
+            [[2, 11, 12, 'b']],
+            [[1, 7, 8, 'b']],
+        ]
+    ])
+    data['start'] = "7"
+    data['gap'] = "2"
+    assert len(list(iter_timetables(data))) == 5
+    assert sorted(timetable[1] for timetable in iter_timetables(data, enforce_gap=True)) == [0, 2, 3]
+
+    model, global_solution_space, mapped_by_course_data_set = build_timetable_model(data)
+    assert find_short_gap_class_pairs(global_solution_space, 120) == [((0, 0), (1, 1)), ((0, 0), (1, 4))]
+    penalty_literals = define_min_gap_constraint(model, global_solution_space, mapped_by_course_data_set, 2,
+                                                 soft=True)
+    assert len(penalty_literals) == 2
+
+
+def test_compact_timetables():
+    data = request_data([
+        [
+            [[1, 9, 10, 'a']],
+            [[1, 10, 11, 'a']],
+            [[1, 9, 10, 'a']],
+        ],
+        [
+            [[1, 9, 10, 'b']],
+            [[2, 9, 10, 'b']],
+        ]
+    ])
+    timetables = [timetable.tolist() for timetable in iter_timetables(data, compact=True)]
+    assert sorted(timetables) == [[0, 1], [1, 0], [1, 1]]
+    expanded_timetables = [timetable.tolist() for timetable in iter_timetables(data, compact=True,
+                                                                               expand_duplicates=True)]
+    assert sorted(expanded_timetables) == [[0, 1], [1, 0], [1, 1], [2, 1]]
+
+    collected_timetables = collect_timetables(data, expand_duplicates=True)
+    assert collected_timetables.dtype == np.uint16
+    assert sorted(collected_timetables.tolist()) == sorted(expanded_timetables)
+    assert collect_timetables(data, limit=2).shape == (2, 2)
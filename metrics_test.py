@@ -0,0 +1,50 @@
+from autotimetabler import CLIQUE_ENCODING, SolveMetrics, iter_timetables
+from conftest import request_data
+
+PERIODS = [
+    [
+        [[1, 9, 10, 'a']],
+        [[1, 10, 11, 'a'], [3, 10, 11, 'a']],
+    ],
+    [
+        [[1, 9, 10, 'b']],
+        [[2, 9, 10, 'b']],
+        [[2, 9, 10, 'b']],
+    ]
+]
+
+
+def test_iter_timetables_metrics():
+    metrics = SolveMetrics({'request': 'test'})
+    timetables = list(iter_timetables(request_data(PERIODS), metrics=metrics))
+    assert list(metrics.phases) == ['presolve', 'canonicalise_classes', 'period_table',
+                                    'define_day_time_constraints_for_variables',
+                                    'define_max_one_class_per_course_constraint', 'define_no_overlap_constraint',
+                                    'define_max_days_constraint', 'solve']
+    assert len(metrics.solution_times) == len(timetables) == 3
+    assert metrics.solution_times == sorted(metrics.solution_times)
+    assert metrics.time_to_first_solution <= metrics.phases['solve']
+    # The duplicate class of course 1 is collapsed, the 4 classes left have 5 periods.
+    assert metrics.model_size['intervals'] == 5
+    assert metrics.model_size['constraint_types']['exactly_one'] == 2
+    assert metrics.solver_stats['status'] == 'OPTIMAL'
+    assert metrics.to_dict()['solutions'] == 3
+
+    metrics = SolveMetrics()
+    list(iter_timetables(request_data(PERIODS), clash_encoding=CLIQUE_ENCODING, metrics=metrics))
+    assert 'define_clash_clique_constraint' in metrics.phases
+    assert 'no_overlap' not in metrics.model_size['constraint_types']
+
+
+def test_prometheus_export():
+    metrics = SolveMetrics({'request': 'a "quoted" id'})
+    with metrics.phase('solve'):
+        pass
+    metrics.model_size = {'variables': 4, 'intervals': 2, 'constraints': 6}
+    metrics.solution_times = [0.5, 1.0]
+    lines = metrics.to_prometheus().splitlines()
+    assert '# TYPE autotimetabler_phase_seconds gauge' in lines
+    assert 'autotimetabler_model_variables{request="a \\"quoted\\" id"} 4.0' in lines
+    assert 'autotimetabler_solutions{request="a \\"quoted\\" id"} 2.0' in lines
+    assert 'autotimetabler_time_to_first_solution_seconds{request="a \\"quoted\\" id"} 0.5' in lines
+    assert not any(line.startswith('autotimetabler_solver_') for line in lines)
@@ -0,0 +1,92 @@
+import itertools
+
+import pytest
+
+from autotimetabler import (InfeasibleRequest, build_optimisation_model, build_timetable_model, greedy_timetable,
+                            optimise_timetable, top_k)
+from conftest import request_data
+
+
+PERIODS = [
+    [
+        [[1, 8, 9, 'a']],
+        [[2, 11, 12, 'a']],
+        [[3, 11, 12, 'a']],
+    ],
+    [
+        [[2, 9, 10, 'b']],
+        [[2, 13, 14, 'b']],
+        [[2, 12, 13, 'b']],
+        [[4, 12, 13, 'b']],
+    ],
+]
+
+
+def test_optimise_timetable():
+    """
+        Both courses on one day, back to back and neither early nor late is the
+        only timetable without a penalty.
+    """
+    result = optimise_timetable(request_data(PERIODS, start="8", end="20", gap="2"), num_workers=1)
+    assert result.status == 'OPTIMAL'
+    assert result.timetable == {0: 1, 1: 2}
+    assert result.objective == result.bound == 10
+    assert result.relative_gap == 0
+
+
+def test_optimise_timetable_with_preferences_and_hint():
+    data = request_data(PERIODS, start="8", end="20", gap="2")
+    data['preferred'] = [[1, 3]]
+    result = optimise_timetable(data, weights={'preferred': 30}, hint={0: 0, 1: 0}, num_workers=1)
+    assert result.timetable == {0: 2, 1: 3} or result.timetable == {0: 1, 1: 3}
+    assert result.objective == 20 - 30
+
+    data['start'] = "15"
+    assert optimise_timetable(data, num_workers=1).timetable is None
+
+
+def test_optimise_explains_infeasible_requests():
+    data = request_data([PERIODS[0], []], start="8", end="20", gap="2")
+    result = optimise_timetable(data, num_workers=1)
+    assert (result.timetable, result.status) == (None, 'INFEASIBLE')
+    assert result.infeasible_courses == {1: 'course 1 has no classes'}
+    with pytest.raises(InfeasibleRequest):
+        next(top_k(data, 5, num_workers=1))
+
+
+def test_max_days_and_objective_share_the_day_literals():
+    model = build_optimisation_model(request_data(PERIODS, start="8", end="20", gap="2", max_days="2"))[0]
+    names = [variable.name for variable in model.Proto().variables]
+    assert len(names) == len(set(names))
+    assert sorted(name for name in names if name.startswith('day_')) == ['day_%d_used' % day for day in range(1, 5)]
+    assert optimise_timetable(request_data(PERIODS, start="8", end="20", gap="2", max_days="2"),
+                              num_workers=1).objective == 10
+
+
+def test_greedy_timetable_picks_classes_that_do_not_clash():
+    _, global_solution_space, mapped_by_course_data_set = build_timetable_model(request_data([
+        [
+            [[1, 9, 11, 'a']],
+            [[1, 12, 13, 'a']],
+        ],
+        [
+            [[1, 10, 11, 'b']],
+        ],
+    ], start="8", end="20", gap="2"))
+    assert greedy_timetable(global_solution_space, mapped_by_course_data_set) == {1: 0, 0: 1}
+
+
+def test_top_k_gives_distinct_timetables_best_first():
+    timetables = list(top_k(request_data(PERIODS, start="8", end="20", gap="2"), 5, num_workers=1))
+    assert len(timetables) == 5
+    assert timetables[0].timetable == {0: 1, 1: 2}
+    assert len({str(result.timetable) for result in timetables}) == 5
+    objectives = [result.objective for result in timetables]
+    assert objectives == sorted(objectives)
+
+    # Both courses have to change between the timetables.
+    data = request_data(PERIODS, start="8", end="20", gap="2")
+    timetables = [result.timetable for result in top_k(data, 10, min_hamming=2, num_workers=1)]
+    assert 0 < len(timetables) < 10
+    for first_timetable, second_timetable in itertools.combinations(timetables, 2):
+        assert all(first_timetable[course_id] != second_timetable[course_id] for course_id in first_timetable)
@@ -0,0 +1,50 @@
+import pytest
+
+from autotimetabler import (decode_cursor, encode_cursor, iter_timetables, request_hash, synthetic_term,
+                            timetable_page)
+
+
+def all_pages(data: dict, page_size: int, **kwargs) -> list:
+    pages = []
+    cursor = None
+    while True:
+        page = timetable_page(data, cursor, page_size, **kwargs)
+        pages.append(page.timetables)
+        if page.cursor is None:
+            return pages
+        cursor = page.cursor
+
+
+def test_pages_give_every_timetable_once():
+    data = synthetic_term(3, 12, 2, duplicate_ratio=0.3, seed=3)
+    timetables = list(iter_timetables(data))
+    pages = all_pages(data, 7)
+    assert [len(page) for page in pages[:-1]] == [7] * (len(pages) - 1)
+    paged_timetables = [timetable for page in pages for timetable in page]
+    assert len(paged_timetables) == len(timetables) > 7
+    assert sorted(paged_timetables, key=str) == sorted(timetables, key=str)
+
+    expanded_timetables = [timetable for page in all_pages(data, 7, expand_duplicates=True) for timetable in page]
+    assert sorted(expanded_timetables, key=str) == sorted(iter_timetables(data, expand_duplicates=True), key=str)
+
+
+def test_cursors():
+    data = synthetic_term(4, 20, 1, seed=1)
+    page = timetable_page(data, page_size=5)
+    # A version byte, 8 bytes of hash and 2 bytes for the count and every course.
+    assert len(page.cursor) <= 28
+    assert timetable_page(data, page.cursor, page_size=5) == timetable_page(data, page.cursor, page_size=5)
+    with pytest.raises(ValueError):
+        timetable_page(dict(data, max_days='4'), page.cursor)
+    with pytest.raises(ValueError):
+        timetable_page(data, 'not a cursor')
+    model_hash = request_hash(data)
+    assert decode_cursor(encode_cursor(model_hash, [3, 0, 65535]), model_hash) == [3, 0, 65535]
+
+
+def test_last_page():
+    data = synthetic_term(2, 3, 1, seed=0)
+    timetable_count = len(list(iter_timetables(data)))
+    page = timetable_page(data, page_size=timetable_count)
+    assert len(page.timetables) == timetable_count
+    assert page.cursor is None
@@ -0,0 +1,39 @@
+import numpy as np
+from ortools.sat.python import cp_model
+
+from autotimetabler import PeriodTable, define_day_time_constraints_for_variables
+
+PERIODS = [
+    [
+        [[1, 9, 10, 'b']],
+        [[2, 9.5, 11, 'a'], [4, 9, 10, 'c']],
+        [],
+    ],
+    [
+        [[5, 18, 20, 'b']],
+    ]
+]
+
+
+def test_period_table_arrays():
+    period_table = PeriodTable(PERIODS)
+    assert len(period_table) == 4
+    assert period_table.class_count() == 4
+    assert period_table.course.tolist() == [0, 0, 0, 1]
+    assert period_table.classes.tolist() == [0, 1, 1, 0]
+    assert period_table.start.tolist() == [540, 1440 + 570, 4320 + 540, 5760 + 1080]
+    assert period_table.end.tolist() == [600, 1440 + 660, 4320 + 600, 5760 + 1200]
+    assert period_table.start.dtype == period_table.location.dtype == np.int32
+    assert period_table.locations == ['a', 'b', 'c']
+    assert period_table.location.tolist() == [1, 0, 2, 1]
+    assert period_table.class_offsets.tolist() == [0, 1, 3, 3, 4]
+    assert period_table.feasible_classes([1, 2, 3, 4, 5], 9, 19).tolist() == [True, True, False, False]
+    assert period_table.feasible_classes([1, 2, 3, 5], 8, 20).tolist() == [True, False, False, True]
+
+
+def test_period_table_gets_the_class_literals():
+    data = {"start": "9", "end": "19", "days": "12345", "periods": PERIODS}
+    period_table = PeriodTable(PERIODS)
+    _, mapped_by_course_data_set = define_day_time_constraints_for_variables(data, cp_model.CpModel(), period_table)
+    assert period_table.class_literals == [mapped_by_course_data_set[0][0].assigned_bool_var.Index(),
+                                           mapped_by_course_data_set[0][1].assigned_bool_var.Index(), -1, -1]
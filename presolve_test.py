@@ -0,0 +1,76 @@
+import pytest
+
+from autotimetabler import InfeasibleRequest, SolveMetrics, iter_timetables, presolve
+from conftest import request_data
+
+
+def test_presolve_propagates_the_only_classes():
+    """
+        Course 0 only has one class in the hours of the request, which rules
+        out the class of course 1 it clashes with and so on to course 2.
+    """
+    data = request_data([
+        [
+            [[1, 9, 10, 'a']],
+            [[1, 7, 8, 'a']],
+        ],
+        [
+            [[1, 9.5, 10.5, 'b']],
+            [[2, 9, 10, 'b']],
+        ],
+        [
+            [[2, 9, 11, 'c']],
+            [[3, 9, 11, 'c']],
+            [[3, 9, 10, 'c'], [3, 9.5, 11, 'c']],
+        ],
+    ])
+    presolved_request = presolve(data)
+    assert presolved_request.infeasible_courses == {}
+    assert presolved_request.class_ids == [[0], [1], [1]]
+    assert presolved_request.data['periods'] == [[[[1, 9, 10, 'a']]], [[[2, 9, 10, 'b']]], [[[3, 9, 11, 'c']]]]
+    assert list(iter_timetables(data)) == [{0: 0, 1: 1, 2: 1}]
+
+
+def test_presolve_explains_infeasible_courses():
+    data = request_data([
+        [
+            [[1, 9, 10, 'a']],
+        ],
+        [
+            [[1, 9, 11, 'b']],
+            [[1, 7, 8, 'b']],
+            [[6, 9, 10, 'b']],
+        ],
+        [],
+    ])
+    presolved_request = presolve(data)
+    assert presolved_request.infeasible_courses == {
+        1: 'course 1 has no class left: 2 outside the days and hours of the request, '
+           '1 clashing with the only class left for course 0',
+        2: 'course 2 has no classes',
+    }
+    metrics = SolveMetrics()
+    with pytest.raises(InfeasibleRequest) as raised:
+        list(iter_timetables(data, metrics=metrics))
+    assert raised.value.infeasible_courses == presolved_request.infeasible_courses
+    # No model was built, let alone solved.
+    assert list(metrics.phases) == ['presolve']
+    assert list(iter_timetables(data, presolve_request=False)) == []
+
+
+def test_presolve_keeps_every_timetable():
+    data = request_data([
+        [
+            [[1, 9, 10, 'a']],
+            [[1, 10, 11, 'a']],
+            [[1, 9, 10, 'a']],
+        ],
+        [
+            [[1, 9, 10, 'b']],
+            [[2, 9, 10, 'b']],
+        ]
+    ])
+    timetables = sorted(iter_timetables(data, expand_duplicates=True), key=str)
+    assert timetables == sorted(iter_timetables(data, expand_duplicates=True, presolve_request=False), key=str)
+    assert sorted(timetable.tolist() for timetable in iter_timetables(data, compact=True, expand_duplicates=True)) == \
+        sorted([timetable[0], timetable[1]] for timetable in timetables)
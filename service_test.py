@@ -0,0 +1,96 @@
+import asyncio
+import contextlib
+
+import pytest
+
+from autotimetabler import InfeasibleRequest, TimetableService, iter_timetables, solve
+from conftest import REQUEST, request_data
+
+
+def large_request() -> dict:
+    data = dict(REQUEST)
+    data['periods'] = [
+        [[[day, start, start + 1, 'a']] for day in range(1, 6) for start in range(9, 18)]
+        for _ in range(6)
+    ]
+    return data
+
+
+def test_solve():
+    timetables = asyncio.run(solve(REQUEST, timeout=5.0))
+    assert sorted(timetables, key=str) == sorted(iter_timetables(REQUEST), key=str)
+    assert len(asyncio.run(solve(REQUEST, limit=1))) == 1
+
+
+def test_cancelled_solve_stops_the_search():
+    service = TimetableService(max_in_flight=1, max_queued_timetables=4)
+
+    async def cancel_and_solve_again():
+        # There are far too many timetables to enumerate them all.
+        task = asyncio.create_task(service.solve(large_request()))
+        await asyncio.sleep(0.5)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        # The cancelled search gave its slot back, so the next request is solved straight away.
+        return await asyncio.wait_for(service.solve(REQUEST), timeout=5.0)
+
+    assert sorted(asyncio.run(cancel_and_solve_again()), key=str) == sorted(iter_timetables(REQUEST), key=str)
+    service.close()
+
+
+def test_cancelled_search_without_timetables_stops():
+    """
+        11 courses can't all take one of 10 hours on monday, which takes the
+        search a long time to prove while it never finds a timetable.
+    """
+    service = TimetableService(max_in_flight=1)
+    data = request_data([[[[1, 9 + hour, 10 + hour, 'a']] for hour in range(10)] for _ in range(11)], end="20")
+
+    async def cancel_and_solve_again():
+        task = asyncio.create_task(service.solve(data))
+        await asyncio.sleep(0.5)
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        return await asyncio.wait_for(service.solve(REQUEST), timeout=5.0)
+
+    assert sorted(asyncio.run(cancel_and_solve_again()), key=str) == sorted(iter_timetables(REQUEST), key=str)
+    service.close()
+
+
+def test_infeasible_requests_are_explained():
+    with pytest.raises(InfeasibleRequest) as raised:
+        asyncio.run(solve(dict(REQUEST, days='5')))
+    assert sorted(raised.value.infeasible_courses) == [0, 1]
+
+
+def test_stream():
+    service = TimetableService(max_queued_timetables=2)
+
+    async def first_timetables():
+        timetables = []
+        async with contextlib.aclosing(service.stream(large_request(), timeout=5.0)) as stream:
+            async for timetable in stream:
+                timetables.append(timetable)
+                if len(timetables) == 10:
+                    break
+        return timetables
+
+    timetables = asyncio.run(first_timetables())
+    assert len(timetables) == 10
+    assert len({str(timetable) for timetable in timetables}) == 10
+    service.close()
+
+
+def test_in_flight_limit():
+    service = TimetableService(max_in_flight=2)
+
+    async def solve_many():
+        return await asyncio.gather(*(service.solve(REQUEST) for _ in range(6)))
+
+    for timetables in asyncio.run(solve_many()):
+        assert len(timetables) == len(list(iter_timetables(REQUEST)))
+    service.close()
@@ -0,0 +1,65 @@
+from autotimetabler import TimetableSession, optimise_timetable, synthetic_term
+from conftest import request_data
+from optimise_timetable_test import PERIODS
+
+
+def test_session_follows_the_changes():
+    data = request_data(PERIODS, start="8", end="20", gap="2")
+    session = TimetableSession(data, num_workers=1)
+    assert session.result.timetable == optimise_timetable(data, num_workers=1).timetable == {0: 1, 1: 2}
+    assert session.result.objective == 10
+
+    # Without Tuesday the best timetable is on two days.
+    result = session.update(days='1345')
+    assert session.last_action == 'hinted'
+    assert result.objective == optimise_timetable(dict(data, days='1345'), num_workers=1).objective == 20
+
+    assert result.timetable == {0: 2, 1: 3}
+
+    # Taking Monday away too keeps the timetable found, which isn't on Monday.
+    solve_count = session.solve_count
+    assert session.update(days='345') == result
+    assert session.last_action == 'kept'
+    assert session.solve_count == solve_count
+
+    result = session.update(days='12345', start='9')
+    assert session.last_action == 'hinted'
+    assert result.objective == optimise_timetable(dict(data, start='9'), num_workers=1).objective
+
+
+def test_session_rebuilds_for_new_courses():
+    data = request_data(PERIODS, start="8", end="20", gap="2")
+    session = TimetableSession(data, num_workers=1)
+    periods = PERIODS + [[[[2, 14, 15, 'c']], [[3, 14, 15, 'c']]]]
+    result = session.update(periods=periods)
+    assert session.last_action == 'built'
+    data = request_data(periods, start="8", end="20", gap="2")
+    assert result.objective == optimise_timetable(data, num_workers=1).objective
+    assert result.timetable[2] == 0
+
+    result = session.update(periods=[periods[1]])
+    assert result.objective == 10
+    assert result.timetable[0] != 0
+
+
+def test_kept_timetables_are_not_solved_again():
+    data = synthetic_term(8, 40, 2, duplicate_ratio=0.3, seed=2)
+    session = TimetableSession(data, num_workers=1)
+    assert session.result.status == 'OPTIMAL'
+    # Only the days of the timetable are left, so it is still allowed and still the best.
+    days = sorted({period[0] for course_id, classes_id in session.result.timetable.items()
+                   for period in data['periods'][course_id][classes_id]})
+    solve_count = session.solve_count
+    session.update(days=''.join(map(str, days)))
+    assert session.last_action == 'kept'
+    assert session.solve_count == solve_count
+    assert session.result.objective == optimise_timetable(session.data, num_workers=1).objective
+
+
+def test_session_explains_infeasible_requests():
+    session = TimetableSession(request_data(PERIODS, start="8", end="20", gap="2"), num_workers=1)
+    result = session.update(days='5')
+    assert result.status == 'INFEASIBLE'
+    assert sorted(result.infeasible_courses) == [0, 1]
+    # Presolving found it without a solve.
+    assert session.solve_count == 1
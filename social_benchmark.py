@@ -0,0 +1,91 @@
+"""
+    Measure how joint and decomposed social timetabling scale with the size
+    of the group, writing json results to compare between commits.
+
+    python social_benchmark.py --students 2 5 10 20 50 100 200 -o results.json
+"""
+
+import argparse
+import json
+import platform
+import time
+
+import ortools
+
+from autotimetabler import social_timetables, synthetic_group
+
+JOINT_MODE = 'joint'
+DECOMPOSED_MODE = 'decomposed'
+
+
+def benchmark(term: dict, requests: list, mode: str, max_time_in_seconds: float) -> dict:
+    """
+        Timetable the group in one mode.
+    :return: The time in seconds, the status and the number of times students are together.
+    """
+    start = time.perf_counter()
+    result = social_timetables(requests, term, decompose=mode == DECOMPOSED_MODE,
+                               max_time_in_seconds=max_time_in_seconds)
+    return {
+        'status': result.status,
+        'time': time.perf_counter() - start,
+        'together': result.together,
+        'shared_courses': len(result.shared_classes),
+    }
+
+
+def run_benchmarks(group_sizes: list, courses: int, courses_per_student: int, classes: int, periods: int,
+                   max_joint_group_size: int, max_time_in_seconds: float, seed: int) -> dict:
+    """
+        Benchmark both modes on a synthetic group of every size, the joint
+        model only up to max_joint_group_size students.
+    :return: The environment and the result of every group size and mode.
+    """
+    results = []
+    for students in group_sizes:
+        term, requests = synthetic_group(students, courses, courses_per_student, classes, periods, seed=seed)
+        modes = [JOINT_MODE, DECOMPOSED_MODE] if students <= max_joint_group_size else [DECOMPOSED_MODE]
+        for mode in modes:
+            result = {'mode': mode, 'students': students}
+            result.update(benchmark(term, requests, mode, max_time_in_seconds))
+            results.append(result)
+    return {
+        'python': platform.python_version(),
+        'ortools': ortools.__version__,
+        'seed': seed,
+        'courses': courses,
+        'courses_per_student': courses_per_student,
+        'classes': classes,
+        'periods': periods,
+        'max_time_in_seconds': max_time_in_seconds,
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, nargs='+', default=[2, 5, 10, 20, 50, 100, 200])
+    parser.add_argument('--courses', type=int, default=12, help='courses of the term')
+    parser.add_argument('--courses-per-student', type=int, default=4)
+    parser.add_argument('--classes', type=int, default=10, help='classes per course')
+    parser.add_argument('--periods', type=int, default=2, help='periods per class')
+    parser.add_argument('--max-joint', type=int, default=20, help='the largest group to solve on the joint model')
+    parser.add_argument('--time-limit', type=float, default=10.0, help='the time limit of every solve in seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', '-o', help='the json file to write the results to')
+    arguments = parser.parse_args()
+
+    benchmarks = run_benchmarks(arguments.students, arguments.courses, arguments.courses_per_student,
+                                arguments.classes, arguments.periods, arguments.max_joint, arguments.time_limit,
+                                arguments.seed)
+    print('%-12s %8s %-10s %10s %10s' % ('mode', 'students', 'status', 'time (s)', 'together'))
+    for result in benchmarks['results']:
+        print('%-12s %8i %-10s %10.3f %10i' % (result['mode'], result['students'], result['status'], result['time'],
+                                               result['together']))
+    if arguments.output:
+        with open(arguments.output, 'w') as output:
+            json.dump(benchmarks, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+import pytest
+
+from ortools.sat.python import cp_model
+
+from autotimetabler import (course_keys, define_social_timetabling, define_timetable_constraints, social_timetables,
+                            synthetic_group)
+from conftest import request_data
+
+# Two courses whose first classes clash, the second course also has a class on another day.
+PERIODS = [
+    [[[1, 10, 12, 'a']], [[2, 10, 12, 'a']]],
+    [[[1, 11, 12, 'b']], [[3, 11, 12, 'b']]],
+]
+
+
+def test_joint_students_share_classes():
+    # The first student can't be in class 1 of the first course, so the others follow them into class 0.
+    requests = [request_data(PERIODS, start="8", end="20", days="13", gap="2"),
+                request_data(PERIODS, start="8", end="20", gap="2"),
+                request_data(PERIODS, start="8", end="20", gap="2")]
+    result = social_timetables(requests, decompose=False, num_workers=1)
+    assert result.status == 'OPTIMAL'
+    assert result.together == 6
+    assert [timetable[0] for timetable in result.timetables] == [0, 0, 0]
+    assert [timetable[1] for timetable in result.timetables] == [1, 1, 1]
+
+    hard_result = social_timetables(requests, hard_together=True, decompose=False, num_workers=1)
+    assert hard_result.timetables == result.timetables
+    with pytest.raises(ValueError):
+        social_timetables(requests, hard_together=True, decompose=True)
+
+
+def test_social_literals_are_named_by_course_index():
+    model = cp_model.CpModel()
+    requests = [request_data(PERIODS, start="8", end="20", gap="2")] * 2
+    student_mapped_by_course_data_sets = [define_timetable_constraints(model, data)[1] for data in requests]
+    shared_literals, together_literals = define_social_timetabling(model, student_mapped_by_course_data_sets,
+                                                                   [course_keys(data) for data in requests])
+    assert [literal.name for literal in together_literals] == ['together_0_0', 'together_0_1', 'together_1_0',
+                                                               'together_1_1']
+    assert [literal.name for classes_literals in shared_literals.values() for literal in classes_literals.values()] \
+        == ['shared_0_0', 'shared_0_1', 'shared_1_0', 'shared_1_1']
+
+
+def test_hard_together_can_be_infeasible():
+    requests = [request_data(PERIODS, start="8", end="20", days="13", gap="2"),
+                request_data(PERIODS, start="8", end="20", days="23", gap="2")]
+    assert social_timetables(requests, decompose=False, num_workers=1).together == 3
+    assert social_timetables(requests, hard_together=True, decompose=False, num_workers=1).status == 'INFEASIBLE'
+
+
+def test_decomposition_finds_the_joint_optimum():
+    term, requests = synthetic_group(12, 6, 3, 6, 1, seed=1)
+    joint_result = social_timetables(requests, term, decompose=False, num_workers=1)
+    decomposed_result = social_timetables(requests, term, decompose=True, num_workers=1)
+    assert joint_result.status == 'OPTIMAL'
+    assert decomposed_result.together == joint_result.together
+    for request, timetable in zip(requests, decomposed_result.timetables):
+        assert sorted(timetable) == list(range(len(request['courses'])))
@@ -0,0 +1,38 @@
+from autotimetabler import canonicalise_classes, iter_timetables, synthetic_term
+from timetable_benchmark import SOLVER_MODES, run_benchmarks
+
+
+def test_synthetic_term_is_reproducible():
+    data = synthetic_term(3, 10, 2, duplicate_ratio=0.5, locations=2, seed=1)
+    assert data == synthetic_term(3, 10, 2, duplicate_ratio=0.5, locations=2, seed=1)
+    assert data != synthetic_term(3, 10, 2, duplicate_ratio=0.5, locations=2, seed=2)
+    assert [len(classes) for classes in data['periods']] == [10, 10, 10]
+    assert {len(periods) for classes in data['periods'] for periods in classes} == {2}
+    assert {period[3] for classes in data['periods'] for periods in classes for period in periods} <= \
+        {'location_0', 'location_1'}
+    _, equivalent_classes = canonicalise_classes(data)
+    assert sum(len(classes) for classes in equivalent_classes) < 30
+    assert next(iter_timetables(data), None) is not None
+
+
+def test_clash_density():
+    data = synthetic_term(2, 10, 1, clash_density=1.0)
+    assert len({tuple(periods[0][:2]) for classes in data['periods'] for periods in classes}) == 1
+    assert next(iter_timetables(data, presolve_request=False), None) is None
+
+
+def test_run_benchmarks():
+    benchmarks = run_benchmarks({'courses': [2], 'classes': [5, 10], 'periods': [1]}, list(SOLVER_MODES), 10, 1.0,
+                                seed=0)
+    assert [(result['mode'], result['classes']) for result in benchmarks['results']] == \
+        [(mode, classes) for classes in (5, 10) for mode in SOLVER_MODES]
+    for result in benchmarks['results']:
+        assert result['solutions'] >= 1
+        assert result['build_time'] > 0 and result['build_memory'] > 0
+
+
+def test_infeasible_benchmarks_are_recorded():
+    benchmarks = run_benchmarks({'courses': [3], 'classes': [5], 'periods': [2], 'clash_density': [0.99]},
+                                list(SOLVER_MODES), 10, 1.0, seed=0)
+    assert [result['status'] for result in benchmarks['results']] == ['INFEASIBLE'] * len(SOLVER_MODES)
+    assert [result['solutions'] for result in benchmarks['results']] == [0] * len(SOLVER_MODES)
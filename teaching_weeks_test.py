@@ -0,0 +1,102 @@
+import itertools
+import json
+
+import pytest
+
+from autotimetabler import (CLIQUE_ENCODING, NO_OVERLAP_ENCODING, MinuteInterval, PeriodTable, TermFile,
+                            build_timetable_model, find_class_clashes, find_consecutive_period_pairs,
+                            find_short_gap_class_pairs, greedy_timetable, iter_timetables, period_weeks,
+                            synthetic_term, to_week_mask)
+from conftest import request_data
+
+ODD_WEEKS = to_week_mask([1, 3, 5, 7, 9])
+EVEN_WEEKS = to_week_mask([2, 4, 6, 8, 10])
+FIRST_WEEKS = to_week_mask([1, 2, 3, 4, 5])
+
+# The first classes of both courses are at the same time in different weeks, the second ones in the same weeks.
+PERIODS = [
+    [
+        [[1, 9, 10, 'a', ODD_WEEKS]],
+        [[2, 9, 10, 'a', ODD_WEEKS]],
+    ],
+    [
+        [[1, 9, 11, 'b', EVEN_WEEKS], [1, 9, 10, 'c', ODD_WEEKS]],
+        [[2, 9.5, 10.5, 'b', FIRST_WEEKS]],
+    ],
+]
+
+
+def test_week_masks():
+    assert to_week_mask([1, 3]) == 0b1010
+    assert period_weeks([1, 9, 10, 'a']) == -1 and period_weeks([1, 9, 10, 'a', 0b10]) == 0b10
+    assert PeriodTable(PERIODS).weeks.tolist() == [ODD_WEEKS, ODD_WEEKS, EVEN_WEEKS, ODD_WEEKS, FIRST_WEEKS]
+
+
+@pytest.mark.parametrize('clash_encoding', [NO_OVERLAP_ENCODING, CLIQUE_ENCODING])
+def test_periods_in_different_weeks_do_not_clash(clash_encoding):
+    # Class 0 of course 1 clashes with class 0 of course 0 in the odd weeks but not with itself, and the classes 1
+    # share weeks 1, 3 and 5.
+    timetables = iter_timetables(request_data(PERIODS), clash_encoding=clash_encoding, presolve_request=False)
+    assert sorted((timetable[0], timetable[1]) for timetable in timetables) == [(0, 1), (1, 0)]
+    periods = [PERIODS[0], [[PERIODS[1][0][0]], PERIODS[1][1]]]
+    timetables = iter_timetables(request_data(periods), clash_encoding=clash_encoding, presolve_request=False)
+    assert sorted((timetable[0], timetable[1]) for timetable in timetables) == [(0, 0), (0, 1), (1, 0)]
+
+
+def test_presolve_and_greedy_timetable_use_the_weeks():
+    period_table = PeriodTable(PERIODS)
+    clashes, self_clashes = find_class_clashes(period_table, period_table.feasible_classes([1, 2], 9, 19))
+    assert self_clashes == set()
+    assert dict(clashes) == {0: {2}, 2: {0}, 1: {3}, 3: {1}}
+
+    periods = [PERIODS[0], [[PERIODS[1][0][0]]]]
+    _, global_solution_space, mapped_by_course_data_set = build_timetable_model(request_data(periods))
+    assert greedy_timetable(global_solution_space, mapped_by_course_data_set) == {1: 0, 0: 0}
+
+
+def test_gaps_and_walks_are_only_between_periods_sharing_a_week():
+    periods = [
+        [[[1, 9, 10, 'a', ODD_WEEKS]]],
+        [
+            [[1, 10, 11, 'b', EVEN_WEEKS]],
+            [[1, 10, 11, 'c', FIRST_WEEKS]],
+            [[1, 10.5, 11.5, 'b', EVEN_WEEKS]],
+            [[1, 10.5, 11.5, 'c', FIRST_WEEKS]],
+        ],
+    ]
+    _, global_solution_space, _ = build_timetable_model(request_data(periods))
+    assert find_short_gap_class_pairs(global_solution_space, 60) == [((0, 0), (1, 3))]
+    assert [(global_solution_space[first].classes, global_solution_space[second].classes)
+            for first, second in find_consecutive_period_pairs(global_solution_space, 30)] == [(0, 1), (0, 3)]
+
+
+@pytest.mark.parametrize('clash_encoding', [NO_OVERLAP_ENCODING, CLIQUE_ENCODING])
+def test_part_week_timetables_are_the_brute_force_ones(clash_encoding):
+    data = synthetic_term(3, 8, 2, clash_density=0.9, part_week_ratio=0.7, seed=4)
+    minute_interval = MinuteInterval()
+
+    def clashes(first_period, second_period) -> bool:
+        first_start, first_end = minute_interval.map_day_hour_to_minute_interval(first_period)
+        second_start, second_end = minute_interval.map_day_hour_to_minute_interval(second_period)
+        return first_start < second_end and second_start < first_end and \
+            bool(period_weeks(first_period) & period_weeks(second_period))
+
+    expected_timetables = set()
+    for timetable in itertools.product(*(range(len(classes)) for classes in data['periods'])):
+        periods = [period for course_id, classes_id in enumerate(timetable)
+                   for period in data['periods'][course_id][classes_id]]
+        if not any(clashes(first_period, second_period)
+                   for first_period, second_period in itertools.combinations(periods, 2)):
+            expected_timetables.add(timetable)
+    timetables = {tuple(timetable[course_id] for course_id in range(3))
+                  for timetable in iter_timetables(data, expand_duplicates=True, clash_encoding=clash_encoding)}
+    assert 0 < len(timetables) < 8 ** 3
+    assert timetables == expected_timetables
+
+
+def test_term_file_keeps_the_weeks(tmp_path):
+    path = tmp_path / 'term.json'
+    path.write_text(json.dumps({'MATH1131': PERIODS[1], 'COMP1511': [[[1, 9, 10, 'a']]]}))
+    term = TermFile(str(path))
+    assert term['MATH1131'] == PERIODS[1]
+    assert term['COMP1511'] == [[[1, 9, 10, 'a']]]
@@ -0,0 +1,30 @@
+from autotimetabler import TermModel, iter_timetables
+from conftest import request_data
+
+PERIODS = [
+    [
+        [[1, 9, 10, 'a']],
+        [[1, 10, 11, 'a'], [3, 15, 16, 'a']],
+        [[2, 8, 9, 'a']],
+        [[1, 9, 10, 'a']],
+    ],
+    [
+        [[1, 9, 10, 'b']],
+        [[2, 17, 19, 'b']],
+        [[4, 12, 13, 'b']],
+    ]
+]
+
+
+def test_term_model_matches_a_model_built_for_the_request():
+    """
+        The term model is built once and reused for requests with different
+        preferences, each giving the same timetables as a model built for it.
+    """
+    term_model = TermModel(PERIODS)
+    for data in (request_data(PERIODS, "9", "19", "12345"), request_data(PERIODS, "9", "18", "1234"),
+                 request_data(PERIODS, "8", "16", "124"), request_data(PERIODS, "10", "19", "3"),
+                 request_data(PERIODS, "8", "19", "12345"), request_data(PERIODS, "8", "19", "12345", max_days="1"),
+                 request_data(PERIODS, "9", "19", "12345", max_days="2")):
+        expected_timetables = sorted(map(str, iter_timetables(data, expand_duplicates=True, presolve_request=False)))
+        assert sorted(map(str, term_model.iter_timetables(data, expand_duplicates=True))) == expected_timetables
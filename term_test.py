@@ -0,0 +1,69 @@
+import json
+import pickle
+
+import pytest
+
+import autotimetabler.term
+from autotimetabler import TermFile, collect_timetables, request_periods
+from autotimetabler.cli import main
+from batch_test import TERM
+from conftest import request_data
+
+UNICODE_TERM = dict(TERM, ÉCON1101=[[[2, 9.5, 10.25, 'Théâtre']], [[5, 18, 20, 'a']]])
+
+
+def write_term(path, json_lines: bool):
+    with open(path, 'w', encoding='utf-8') as term_file:
+        if json_lines:
+            for course_code, classes in UNICODE_TERM.items():
+                term_file.write(json.dumps({'course': course_code, 'classes': classes}) + '\n\n')
+        else:
+            json.dump(UNICODE_TERM, term_file, ensure_ascii=False, indent=1)
+    return str(path)
+
+
+@pytest.mark.parametrize('file_name', ['term.json', 'term.jsonl'])
+def test_term_file_reads_courses_on_demand(tmp_path, monkeypatch, file_name):
+    # Chunks smaller than a course make the index span values over chunks.
+    monkeypatch.setattr(autotimetabler.term, '_CHUNK_SIZE', 7)
+    term = TermFile(write_term(tmp_path / file_name, file_name.endswith('.jsonl')), max_courses=2)
+    assert sorted(term) == sorted(UNICODE_TERM)
+    assert 'COMP1511' in term and 'COMP9999' not in term
+    assert term._courses == {}
+
+    assert term['ÉCON1101'] == UNICODE_TERM['ÉCON1101']
+    assert term.course('ÉCON1101').minutes.tolist() == [[1440 + 570, 1440 + 615], [5760 + 1080, 5760 + 1200]]
+    for course_code in TERM:
+        assert term[course_code] == TERM[course_code]
+    assert list(term._courses) == ['MATH1131', 'PHYS1121']
+    assert term.locations == ['Théâtre', 'a', 'b', 'c']
+    with pytest.raises(KeyError):
+        term['COMP9999']
+
+    unpickled_term = pickle.loads(pickle.dumps(term))
+    assert unpickled_term._courses == {} and unpickled_term.index == term.index
+    data = request_data(courses=['COMP1511', 'MATH1131'])
+    assert collect_timetables(dict(data, periods=request_periods(data, unpickled_term))).tolist() == \
+        collect_timetables(dict(data, periods=request_periods(data, TERM))).tolist()
+
+
+def test_malformed_term(tmp_path):
+    path = tmp_path / 'term.json'
+    path.write_text('{"COMP1511": [[[1, 9, 10, "a"]]], "MATH1131" [')
+    with pytest.raises(ValueError):
+        TermFile(str(path))
+
+
+def test_empty_term(tmp_path):
+    path = tmp_path / 'term.json'
+    path.write_text(' { \n } ')
+    term = TermFile(str(path))
+    assert len(term) == 0 and 'COMP1511' not in term
+
+
+def test_cli_takes_the_courses_from_the_term(tmp_path, capsys):
+    request_path = tmp_path / 'request.json'
+    request_path.write_text(json.dumps(request_data(courses=['COMP1511', 'MATH1131'])))
+    assert main([str(request_path), '--term', write_term(tmp_path / 'term.jsonl', True)]) == 0
+    timetables = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert sorted(timetables) == [[0, 1], [1, 0], [1, 1]]
@@ -0,0 +1,163 @@
+"""
+    Measure how the solver modes scale over a grid of synthetic terms, writing
+    json results to compare between commits.
+
+    python timetable_benchmark.py --courses 4 8 --classes 20 100 --periods 2 -o results.json
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import resource
+import time
+import tracemalloc
+
+import ortools
+from ortools.sat.python import cp_model
+
+from autotimetabler import (CLIQUE_ENCODING, NO_OVERLAP_ENCODING, InfeasibleRequest, build_optimisation_model,
+                            build_timetable_model, canonicalise_classes, solve_for_best_timetable, stream_solutions,
+                            synthetic_term)
+
+ENUMERATE_MODE = 'enumerate'
+ENUMERATE_CLIQUES_MODE = 'enumerate-cliques'
+OPTIMISE_MODE = 'optimise'
+SOLVER_MODES = (ENUMERATE_MODE, ENUMERATE_CLIQUES_MODE, OPTIMISE_MODE)
+
+
+def benchmark(data: dict, mode: str, solution_limit: int, max_time_in_seconds: float) -> dict:
+    """
+        Build and solve the model of the request in one mode.
+    :return: The build and solve times in seconds, the peak memory allocated by Python while building in bytes, the
+             solver status and the number of solutions found. A request the optimise mode's presolve finds
+             infeasible is INFEASIBLE without a model or a solve.
+    """
+    tracemalloc.start()
+    build_start = time.perf_counter()
+    model = None
+    if mode == OPTIMISE_MODE:
+        try:
+            model, _, mapped_by_course_data_set, equivalent_classes, _ = build_optimisation_model(data)
+        except InfeasibleRequest:
+            pass
+    else:
+        reduced_data, _ = canonicalise_classes(data)
+        clash_encoding = CLIQUE_ENCODING if mode == ENUMERATE_CLIQUES_MODE else NO_OVERLAP_ENCODING
+        model, _, mapped_by_course_data_set = build_timetable_model(reduced_data, clash_encoding)
+    build_time = time.perf_counter() - build_start
+    _, build_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if model is None:
+        return {
+            'status': 'INFEASIBLE',
+            'build_time': build_time,
+            'first_solution_time': None,
+            'solve_time': 0.0,
+            'build_memory': build_memory,
+            'solutions': 0,
+            'variables': 0,
+            'constraints': 0,
+        }
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = max_time_in_seconds
+    solve_start = time.perf_counter()
+    first_solution_time = None
+    if mode == OPTIMISE_MODE:
+        solver.parameters.num_workers = 8
+        result, _ = solve_for_best_timetable(model, mapped_by_course_data_set, equivalent_classes, solver)
+        solution_count = int(result.timetable is not None)
+        status = result.status
+    else:
+        solution_count = 0
+        timetables = stream_solutions(model, mapped_by_course_data_set, solver, 64, compact=True)
+        for _ in itertools.islice(timetables, solution_limit):
+            if first_solution_time is None:
+                first_solution_time = time.perf_counter() - solve_start
+            solution_count += 1
+        timetables.close()
+        status = solver.StatusName(solver.ResponseProto().status)
+    return {
+        'status': status,
+        'build_time': build_time,
+        'first_solution_time': first_solution_time,
+        'solve_time': time.perf_counter() - solve_start,
+        'build_memory': build_memory,
+        'solutions': solution_count,
+        'variables': len(model.Proto().variables),
+        'constraints': len(model.Proto().constraints),
+    }
+
+
+def run_benchmarks(grid: dict, modes: list, solution_limit: int, max_time_in_seconds: float, seed: int) -> dict:
+    """
+        Benchmark every mode on the synthetic term of every point of the grid.
+    :param grid:                - The lists of values of the arguments of synthetic_term to take the product of.
+    :param modes:               - SOLVER_MODES to run.
+    :param solution_limit:      - The most solutions to enumerate.
+    :param max_time_in_seconds: - The time limit of every solve.
+    :param seed:
+    :return: The environment and the result of every point and mode.
+    """
+    results = []
+    for values in itertools.product(*grid.values()):
+        term_arguments = dict(zip(grid, values))
+        data = synthetic_term(seed=seed, **term_arguments)
+        for mode in modes:
+            result = {'mode': mode}
+            result.update(term_arguments)
+            result.update(benchmark(data, mode, solution_limit, max_time_in_seconds))
+            results.append(result)
+    return {
+        'python': platform.python_version(),
+        'ortools': ortools.__version__,
+        'seed': seed,
+        'solution_limit': solution_limit,
+        'max_time_in_seconds': max_time_in_seconds,
+        # The peak resident memory of the whole run, the solver's included, in kilobytes on Linux.
+        'max_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--courses', type=int, nargs='+', default=[4, 8])
+    parser.add_argument('--classes', type=int, nargs='+', default=[20, 100], help='classes per course')
+    parser.add_argument('--periods', type=int, nargs='+', default=[2], help='periods per class')
+    parser.add_argument('--duplicate-ratio', type=float, nargs='+', default=[0.2])
+    parser.add_argument('--clash-density', type=float, nargs='+', default=[0.0])
+    parser.add_argument('--locations', type=int, nargs='+', default=[6])
+    parser.add_argument('--part-week-ratio', type=float, nargs='+', default=[0.0],
+                        help='the share of the periods only running in some teaching weeks')
+    parser.add_argument('--modes', nargs='+', choices=SOLVER_MODES, default=list(SOLVER_MODES))
+    parser.add_argument('--solutions', type=int, default=1000, help='solutions to enumerate')
+    parser.add_argument('--time-limit', type=float, default=10.0, help='the time limit of every solve in seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', '-o', help='the json file to write the results to')
+    arguments = parser.parse_args()
+
+    grid = {
+        'courses': arguments.courses,
+        'classes': arguments.classes,
+        'periods': arguments.periods,
+        'duplicate_ratio': arguments.duplicate_ratio,
+        'clash_density': arguments.clash_density,
+        'locations': arguments.locations,
+        'part_week_ratio': arguments.part_week_ratio,
+    }
+    benchmarks = run_benchmarks(grid, arguments.modes, arguments.solutions, arguments.time_limit, arguments.seed)
+    print('%-18s %8s %8s %8s %-10s %10s %10s %12s %10s' % ('mode', 'courses', 'classes', 'periods', 'status',
+                                                           'build (s)', 'solve (s)', 'memory (kB)', 'solutions'))
+    for result in benchmarks['results']:
+        print('%-18s %8i %8i %8i %-10s %10.3f %10.3f %12i %10i' % (
+            result['mode'], result['courses'], result['classes'], result['periods'], result['status'],
+            result['build_time'], result['solve_time'], result['build_memory'] // 1024, result['solutions']))
+    if arguments.output:
+        with open(arguments.output, 'w') as output:
+            json.dump(benchmarks, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
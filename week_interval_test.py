@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 from autotimetabler import MinuteInterval
 
@@ -32,3 +33,21 @@ def test_minute_interval_to_hour_interval(minute_interval_instance):
     assert minute_interval_instance.map_minute_interval_to_day_hour([750, 915]) == [1, 12.5, 15.25]
     assert minute_interval_instance.map_minute_interval_to_day_hour([2172, 2385]) == [2, 12.2, 15.75]
     assert minute_interval_instance.map_minute_interval_to_day_hour([6495, 6690]) == [5, 12.25, 15.50]
+
+
+def test_bulk_conversions_match_the_single_ones(minute_interval_instance):
+    day_hour_intervals = [[1, 12, 15], [2, 12, 15], [3, 12, 15], [4, 12, 15], [5, 12, 15], [1, 12.5, 15.25],
+                          [2, 12.2, 15.75], [5, 12.25, 15.50]]
+    minute_array = minute_interval_instance.to_minute_array([interval + ['a'] for interval in day_hour_intervals])
+    assert minute_array.dtype == np.int32
+    assert minute_array.tolist() == [minute_interval_instance.map_day_hour_to_minute_interval(interval)
+                                     for interval in day_hour_intervals]
+    assert minute_interval_instance.to_day_hour_array(minute_array).tolist() == day_hour_intervals
+    assert minute_interval_instance.to_day_array(minute_array).tolist() == [1, 2, 3, 4, 5, 1, 2, 5]
+    assert minute_interval_instance.to_minute_array([]).shape == (0, 2)
+
+
+def test_bulk_conversions_are_exact_for_every_minute(minute_interval_instance):
+    minute_array = np.column_stack((np.arange(0, 7199), np.arange(1, 7200)))
+    day_hour_array = minute_interval_instance.to_day_hour_array(minute_array)
+    assert minute_interval_instance.to_minute_array(day_hour_array.tolist()).tolist() == minute_array.tolist()